@@ -1,17 +1,52 @@
-from google.adk.agents import SequentialAgent
+import os
 
-from agents.transcript_agent.transcript_agent import transcription_agent
-from agents.url_parser_agent.url_parser_agent import url_parser_agent
-from agents.segmentation_agent.segmentation_agent import segmentation_agent
+from google.adk.agents import ParallelAgent, SequentialAgent
+
+from agents.instrumentation import instrument_agent
+from agents.transcript_agent.transcript_agent import transcript_chunker_agent
+from agents.url_parser_agent.url_parser_stage import url_parser_stage
+from agents.segmentation_agent.segmentation_agent import segmentation_agent, windowed_segmentation_agent
+from agents.video_editor_agent.download_stage import ranged_video_download_stage, video_download_stage
 from agents.video_editor_agent.video_agent import video_processing_agent
 
+# "windowed" scores long transcripts in parallel windows instead of one big prompt
+SEGMENTATION_MODE = os.environ.get("SEGMENTATION_MODE", "single")
+# "ranged" downloads only the segment windows, which needs the segments first
+VIDEO_DOWNLOAD_MODE = os.environ.get("VIDEO_DOWNLOAD_MODE", "full")
+
+analysis_agent = SequentialAgent(
+    name="analysis_agent",
+    sub_agents=[
+        transcript_chunker_agent,
+        windowed_segmentation_agent if SEGMENTATION_MODE == "windowed" else segmentation_agent,
+    ],
+    description="Fetches the transcript and picks the segments to clip.",
+)
+
+if VIDEO_DOWNLOAD_MODE == "ranged":
+    prepare_agent = SequentialAgent(
+        name="prepare_agent",
+        sub_agents=[analysis_agent, ranged_video_download_stage],
+        description="Analyses the transcript, then downloads only the chosen time ranges.",
+    )
+else:
+    # The download only needs the video ID, so it runs while the transcript is fetched and
+    # segmented; clipping starts once both branches are done
+    prepare_agent = ParallelAgent(
+        name="prepare_agent",
+        sub_agents=[video_download_stage, analysis_agent],
+        description="Downloads the video while the transcript is analysed.",
+    )
+
 root_agent = SequentialAgent(
     name="VideoSegmentAgent",
     sub_agents=[
-        url_parser_agent,
-        transcription_agent,
-        segmentation_agent,
+        url_parser_stage,
+        prepare_agent,
         video_processing_agent,
     ],
     description="Extracts the video url and generates the transcripts and breaks the video down into clips and then generates subtitles.",
-)
\ No newline at end of file
+)
+
+# Times every agent run and LLM call (wall/CPU/RSS, token counts) into the stage metrics
+instrument_agent(root_agent)
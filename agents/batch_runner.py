@@ -0,0 +1,322 @@
+"""
+Batch ingestion: runs the download -> transcript -> segment -> clip -> subtitle pipeline
+for many videos (URLs, playlists or channels) as a pipelined job queue and writes one
+JSONL manifest line per video.
+
+Usage:
+    python -m agents.batch_runner URL_OR_ID [URL_OR_ID ...] [--file urls.txt] [--manifest batch_manifest.jsonl]
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+import traceback
+from typing import Awaitable, Callable, Iterable, List, Optional
+
+import yt_dlp
+
+from .instrumentation import timed_stage
+from .job_manifest import JobManifest, media_fingerprint, text_hash
+from .segmentation_agent.prescorer import shortlist_text
+from .segmentation_agent.segmentation_agent import gemini_generate
+from .segmentation_agent.windowed import segment_transcript
+from .subtitles_agent.tools import generate_subtitles
+from .transcript_agent.chunker import chunk_transcript
+from .transcript_agent.tools import TRANSCRIPT_TOKEN_BUDGET, fetch_transcript
+from .url_parser_agent.tools import find_video_id
+from .video_editor_agent.tools import download_video, download_video_ranges, split_video, stored_audio_energy
+
+PLAYLIST_ID_PATTERN = re.compile(r"^(?:PL|UU|LL|FL|OL|RD)[A-Za-z0-9_-]{10,}$")
+CHANNEL_ID_PATTERN = re.compile(r"^UC[A-Za-z0-9_-]{22}$")
+
+# Network-bound stages can run wide, CPU-bound stages should match the core budget
+DEFAULT_CONCURRENCY = {
+    "download": 2,
+    "transcript": 4,
+    "segment": 4,
+    "clip": 1,
+    "subtitle": 1,
+}
+
+
+def _listing_url(value: str, expand_playlists: bool = False) -> Optional[str]:
+    """
+    Returns a yt-dlp listing URL for playlist/channel inputs, or None for anything else.
+    A watch URL that also carries a playlist (`watch?v=...&list=...`) stays a single
+    video unless `expand_playlists` is set.
+    Raises:
+        ValueError: If a playlist URL has no usable playlist ID.
+    """
+    value = value.strip()
+    if PLAYLIST_ID_PATTERN.match(value):
+        return f"https://www.youtube.com/playlist?list={value}"
+    if CHANNEL_ID_PATTERN.match(value):
+        return f"https://www.youtube.com/channel/{value}/videos"
+    if value.startswith("@"):
+        return f"https://www.youtube.com/{value}/videos"
+    if "list=" in value and "youtube.com" in value:
+        if "v=" in value and not expand_playlists:
+            return None
+        match = re.search(r"[?&]list=([A-Za-z0-9_-]+)", value)
+        if match is None:
+            raise ValueError(f"no playlist ID in {value}")
+        return f"https://www.youtube.com/playlist?list={match.group(1)}"
+    match = re.search(r"youtube\.com/(@[\w.-]+|channel/UC[\w-]{22}|c/[\w.-]+|user/[\w.-]+)", value)
+    if match:
+        return f"https://www.youtube.com/{match.group(1)}/videos"
+    return None
+
+
+def _expand_listing(url: str) -> List[str]:
+    with yt_dlp.YoutubeDL({"extract_flat": "in_playlist", "quiet": True, "skip_download": True}) as ydl:
+        info = ydl.extract_info(url, download=False)
+    return [entry["id"] for entry in (info or {}).get("entries") or [] if entry and entry.get("id")]
+
+
+def resolve_video_ids(inputs: Iterable[str], expand_playlists: bool = False) -> List[str]:
+    """
+    Turns video URLs/IDs, playlist URLs/IDs and channel URLs/IDs/handles into a
+    deduplicated list of video IDs, in input order. With `expand_playlists`, a video URL
+    that carries a playlist expands to that whole playlist.
+    """
+    video_ids: List[str] = []
+    seen = set()
+    for value in inputs:
+        value = value.strip()
+        if not value or value.startswith("#"):
+            continue
+        try:
+            listing = _listing_url(value, expand_playlists)
+        except ValueError as e:
+            print(f"Skipping malformed input: {e}")
+            continue
+        if listing:
+            try:
+                found = _expand_listing(listing)
+            except Exception as e:
+                print(f"Failed to expand {value}: {e}")
+                continue
+            print(f"Expanded {value} into {len(found)} videos.")
+        else:
+            video_id = find_video_id(value)
+            if video_id is None:
+                print(f"Skipping unrecognised input: {value}")
+                continue
+            found = [video_id]
+        for video_id in found:
+            if video_id not in seen:
+                seen.add(video_id)
+                video_ids.append(video_id)
+    return video_ids
+
+
+class BatchRunner:
+    """
+    Pipelined job queue over videos. Every video runs its stages in order, but each stage
+    has its own concurrency limit, so while video N is encoding, video N+1 is already
+    downloading and video N+2 is being segmented. The download also overlaps with the
+    transcript and segmentation stages of the same video, since it only needs the ID.
+
+    Every video's stages are checkpointed in its job manifest (see agents/job_manifest.py),
+    so rerunning a batch skips the downloads, segmentation, clips and subtitles that
+    already completed; transcripts come from their cache.
+    """
+
+    def __init__(
+        self,
+        manifest_path: str = "batch_manifest.jsonl",
+        work_dir: str = "downloads",
+        concurrency: Optional[dict] = None,
+        max_in_flight: int = 4,
+        download_mode: str = os.environ.get("VIDEO_DOWNLOAD_MODE", "full"),
+        prescore_top_k: int = int(os.environ.get("SEGMENTATION_PRESCORE_TOP_K", "0")),
+        generate: Optional[Callable[[str], Awaitable[str]]] = None,
+        split_options: Optional[dict] = None,
+        subtitle_options: Optional[dict] = None,
+    ):
+        self.manifest_path = manifest_path
+        self.work_dir = work_dir
+        limits = {**DEFAULT_CONCURRENCY, **(concurrency or {})}
+        self.semaphores = {stage: asyncio.Semaphore(limit) for stage, limit in limits.items()}
+        # Caps how many videos are between download and subtitles, so a long playlist
+        # does not download everything before the first clip is cut
+        self.in_flight = asyncio.Semaphore(max_in_flight)
+        self.prescore_top_k = prescore_top_k
+        self.download_mode = download_mode
+        self.generate = generate
+        self.split_options = split_options or {}
+        self.subtitle_options = subtitle_options or {}
+        self._manifest_lock = asyncio.Lock()
+
+    async def _stage(self, name: str, record: dict, func, *args, **kwargs):
+        async with self.semaphores[name]:
+            started = time.perf_counter()
+            try:
+                with timed_stage(f"batch.{name}", video_id=record["video_id"]):
+                    if asyncio.iscoroutinefunction(func):
+                        return await func(*args, **kwargs)
+                    return await asyncio.to_thread(func, *args, **kwargs)
+            finally:
+                record["stage_seconds"][name] = round(time.perf_counter() - started, 3)
+
+    async def _segments_for(self, video_id: str, record: dict, manifest: Optional[JobManifest]) -> list:
+        transcript = await self._stage("transcript", record, fetch_transcript, video_id)
+        if self.prescore_top_k > 0:
+            # The download runs alongside, so only a video stored by an earlier run has its loudness
+            energy = await asyncio.to_thread(stored_audio_energy, video_id)
+            text = shortlist_text(
+                transcript, top_k=self.prescore_top_k, token_budget=TRANSCRIPT_TOKEN_BUDGET, audio_energy=energy,
+            )
+        else:
+            text = chunk_transcript(transcript, token_budget=TRANSCRIPT_TOKEN_BUDGET)
+
+        inputs = {"video_id": video_id, "transcript": text_hash(text), "prescore_top_k": self.prescore_top_k}
+        checkpoint = manifest.completed("batch.segments", inputs) if manifest else None
+        if checkpoint is not None:
+            print(f"Reusing the checkpointed segments of {video_id}.")
+            return checkpoint["segments"]
+        generate = self.generate or gemini_generate()
+        segments = await self._stage("segment", record, segment_transcript, text, generate)
+        if manifest is not None and segments:
+            manifest.complete("batch.segments", inputs, {"segments": segments, "hash": text_hash(segments)})
+        return segments
+
+    async def _download(
+        self, video_id: str, record: dict, manifest: Optional[JobManifest], segments: Optional[list] = None,
+    ) -> Optional[str]:
+        inputs = {"video_id": video_id, "mode": self.download_mode}
+        if segments is not None:
+            inputs["segments"] = text_hash(segments)
+        checkpoint = manifest.completed("batch.download", inputs) if manifest else None
+        if checkpoint is not None:
+            path = checkpoint.get("path")
+            try:
+                if path and media_fingerprint(path) == checkpoint.get("fingerprint"):
+                    print(f"Reusing the checkpointed download of {video_id}.")
+                    return path
+            except OSError:
+                pass  # Evicted from the media store since
+
+        if segments is not None:
+            source = await self._stage("download", record, download_video_ranges, video_id, segments)
+        else:
+            source = await self._stage("download", record, download_video, video_id)
+        if manifest is not None and source and os.path.isfile(source):
+            manifest.complete("batch.download", inputs, {
+                "path": os.path.abspath(source), "fingerprint": media_fingerprint(source),
+            })
+        return source
+
+    async def _cut(self, video_id: str, record: dict, source: Optional[str], segments: list) -> None:
+        record["source"] = source
+        if source and os.path.isfile(source) and not source.endswith(".json"):
+            record["source_bytes"] = os.path.getsize(source)
+        record["segments"] = segments
+        if not segments:
+            record["status"] = "no_segments"
+            return
+
+        video_dir = os.path.join(self.work_dir, video_id)
+        clips_dir = os.path.join(video_dir, "clips")
+        os.makedirs(clips_dir, exist_ok=True)
+        record["clips"] = await self._stage(
+            "clip", record, split_video, segments,
+            video_path=source, output_dir=clips_dir, video_id=video_id, **self.split_options,
+        )
+        # Outputs stay under the video's own folder: clips of different videos can share a topic name
+        subtitle_options = {**self.subtitle_options, "output_dir": os.path.join(video_dir, "output")}
+        subtitles = await self._stage("subtitle", record, generate_subtitles, clips_dir, **subtitle_options)
+        record["srt_paths"] = (subtitles or {}).get("srt_paths", [])
+
+    async def process(self, video_id: str) -> dict:
+        with timed_stage("batch.video", video_id=video_id) as stage:
+            return await self._process(video_id, stage)
+
+    async def _process(self, video_id: str, stage) -> dict:
+        record = {"video_id": video_id, "status": "ok", "stage_seconds": {}}
+        started = time.perf_counter()
+        manifest = JobManifest.for_job(video_id)
+        if manifest is not None:
+            record["job_manifest"] = manifest.path
+        try:
+            if self.download_mode == "ranged":
+                # Only the segment windows are fetched, so the download waits for segmentation
+                segments = await self._segments_for(video_id, record, manifest)
+                async with self.in_flight:
+                    source = await self._download(video_id, record, manifest, segments) if segments else None
+                    await self._cut(video_id, record, source, segments)
+            else:
+                # Transcript and segmentation need no media, so they run ahead of the in-flight cap
+                segmenting = asyncio.ensure_future(self._segments_for(video_id, record, manifest))
+                try:
+                    async with self.in_flight:
+                        source = await self._download(video_id, record, manifest)
+                        await self._cut(video_id, record, source, await segmenting)
+                finally:
+                    if not segmenting.done():
+                        segmenting.cancel()
+                    await asyncio.gather(segmenting, return_exceptions=True)
+        except Exception as e:
+            traceback.print_exc()
+            record["status"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            record["total_seconds"] = round(time.perf_counter() - started, 3)
+            # Bytes, tokens and media seconds reported by the tools of this video
+            record["counters"] = dict(stage.counters)
+            await self._write_manifest(record)
+        return record
+
+    async def _write_manifest(self, record: dict) -> None:
+        async with self._manifest_lock:
+            with open(self.manifest_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    async def run(self, video_ids: List[str]) -> List[dict]:
+        print(f"Processing {len(video_ids)} videos, manifest: {self.manifest_path}")
+        return list(await asyncio.gather(*(self.process(video_id) for video_id in video_ids)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="*", help="Video URLs/IDs, playlist URLs/IDs or channel URLs/IDs/@handles")
+    parser.add_argument("--file", help="Text file with one input per line")
+    parser.add_argument("--manifest", default="batch_manifest.jsonl")
+    parser.add_argument("--work-dir", default="downloads")
+    for stage, limit in DEFAULT_CONCURRENCY.items():
+        parser.add_argument(f"--{stage}-concurrency", type=int, default=limit)
+    parser.add_argument("--max-in-flight", type=int, default=4, help="Videos processed at the same time")
+    parser.add_argument("--download-mode", default=os.environ.get("VIDEO_DOWNLOAD_MODE", "full"), choices=["full", "ranged"])
+    parser.add_argument("--expand-playlists", action="store_true", help="Expand watch URLs that carry a playlist to the whole playlist")
+    parser.add_argument("--split-mode", default="encode", choices=["encode", "copy"])
+    args = parser.parse_args()
+
+    inputs = list(args.inputs)
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            inputs += f.read().splitlines()
+
+    video_ids = resolve_video_ids(inputs, expand_playlists=args.expand_playlists)
+    if not video_ids:
+        raise SystemExit("No videos to process.")
+
+    async def run():
+        runner = BatchRunner(
+            manifest_path=args.manifest,
+            work_dir=args.work_dir,
+            concurrency={stage: getattr(args, f"{stage}_concurrency") for stage in DEFAULT_CONCURRENCY},
+            max_in_flight=args.max_in_flight,
+            download_mode=args.download_mode,
+            split_options={"mode": args.split_mode},
+        )
+        return await runner.run(video_ids)
+
+    records = asyncio.run(run())
+    failed = [r["video_id"] for r in records if r["status"] == "error"]
+    print(f"Done: {len(records) - len(failed)} ok, {len(failed)} failed.")
+
+
+if __name__ == "__main__":
+    main()
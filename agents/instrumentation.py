@@ -0,0 +1,344 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+import weakref
+from typing import Dict, Optional, Tuple
+
+from opentelemetry import trace
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# One JSON line per finished stage; an empty value turns the local sink off
+STAGE_METRICS_PATH = os.environ.get("STAGE_METRICS_PATH", os.path.join(_project_root, ".cache", "stage_metrics.jsonl"))
+
+# Counters a stage can accumulate with record(); they also add up into every enclosing stage
+COUNTERS = (
+    "bytes_downloaded",
+    "bytes_written",
+    "prompt_tokens",
+    "completion_tokens",
+    "media_seconds",
+    "audio_seconds",
+)
+
+RUN_ID = uuid.uuid4().hex[:12]
+
+tracer = trace.get_tracer("frame_ai")
+
+_current_stage: contextvars.ContextVar[Optional["Stage"]] = contextvars.ContextVar("frame_ai_stage", default=None)
+_sink_lock = threading.Lock()
+
+
+def _rss_mb() -> Optional[float]:
+    """
+    Current resident set size of this process, read from /proc where available.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """
+    High-water mark of this process's resident set size.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def _child_cpu_seconds() -> float:
+    # CPU of finished child processes (ffmpeg), which process_time() does not include
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+def _write_record(data: dict) -> None:
+    if not STAGE_METRICS_PATH:
+        return
+    line = json.dumps(data, ensure_ascii=False)
+    try:
+        with _sink_lock:
+            os.makedirs(os.path.dirname(os.path.abspath(STAGE_METRICS_PATH)), exist_ok=True)
+            with open(STAGE_METRICS_PATH, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    except OSError as e:
+        print(f"Could not write stage metrics to {STAGE_METRICS_PATH}: {e}")
+
+
+class Stage:
+    """
+    One timed unit of work: a tool call, an agent run or a model call.
+
+    Measures wall time, process CPU time (plus the CPU of child processes that finished
+    meanwhile), current and peak RSS, and whatever counters the work reports through
+    record(). Finished stages are written to the JSONL sink and set as attributes on
+    their OpenTelemetry span.
+
+    CPU time and peak RSS are process-wide, so they overlap between stages running
+    concurrently.
+    """
+
+    def __init__(self, name: str, kind: str = "stage", parent: Optional["Stage"] = None, span=None, **attributes):
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.span = span
+        self.attributes = attributes
+        self.id = uuid.uuid4().hex[:12]
+        self.counters: Dict[str, float] = {}
+        self.finished = False
+        self._lock = threading.Lock()
+
+    def start(self) -> "Stage":
+        self.started_at = time.time()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._child_cpu = _child_cpu_seconds()
+        return self
+
+    def add(self, **counters: float) -> None:
+        """
+        Adds to this stage's counters and to those of every enclosing stage.
+        """
+        stage = self
+        while stage is not None:
+            with stage._lock:
+                for key, value in counters.items():
+                    if value:
+                        stage.counters[key] = stage.counters.get(key, 0) + value
+            stage = stage.parent
+
+    def finish(self, error: Optional[BaseException] = None) -> dict:
+        self.finished = True
+        rss, peak = _rss_mb(), _peak_rss_mb()
+        if rss is not None and peak is not None:
+            peak = max(peak, rss)  # ru_maxrss lags behind the live value
+        data = {
+            "run": RUN_ID,
+            "id": self.id,
+            "parent": self.parent.id if self.parent else None,
+            "kind": self.kind,
+            "stage": self.name,
+            "started_at": round(self.started_at, 3),
+            "wall_seconds": round(time.perf_counter() - self._wall, 4),
+            "cpu_seconds": round(time.process_time() - self._cpu, 4),
+            "child_cpu_seconds": round(_child_cpu_seconds() - self._child_cpu, 4),
+            "rss_mb": round(rss, 1) if rss is not None else None,
+            "peak_rss_mb": round(peak, 1) if peak is not None else None,
+            "status": "error" if error else "ok",
+        }
+        if error:
+            data["error"] = f"{type(error).__name__}: {error}"
+        data.update({key: round(value, 3) for key, value in self.counters.items()})
+        data.update(self.attributes)
+
+        if self.span is not None and self.span.is_recording():
+            for key, value in data.items():
+                if value is not None and key not in ("stage", "kind"):
+                    self.span.set_attribute(f"frame_ai.{key}", value if isinstance(value, (bool, int, float, str)) else str(value))
+        _write_record(data)
+        return data
+
+
+def current_stage() -> Optional[Stage]:
+    return _current_stage.get()
+
+
+def record(**counters: float) -> None:
+    """
+    Adds counters (see COUNTERS) to the stage that is running, if any, e.g.
+    `record(bytes_downloaded=n)`.
+    """
+    stage = _current_stage.get()
+    if stage is not None:
+        stage.add(**counters)
+
+
+class timed_stage:
+    """
+    Times a block or a function as a stage, in its own OpenTelemetry span.
+
+        with timed_stage("probe", video_id=video_id):
+            ...
+
+        @timed_stage("download_video", kind="tool")
+        def download_video(...): ...
+
+    Works on sync and async functions; the decorated function keeps its name, signature
+    and docstring, so ADK builds the same tool declaration from it.
+    """
+
+    def __init__(self, name: str, kind: str = "stage", **attributes):
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+
+    def __enter__(self) -> Stage:
+        self._span_cm = tracer.start_as_current_span(self.name)
+        span = self._span_cm.__enter__()
+        self._stage = Stage(self.name, self.kind, parent=_current_stage.get(), span=span, **self.attributes).start()
+        self._token = _current_stage.set(self._stage)
+        return self._stage
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _current_stage.reset(self._token)
+        self._stage.finish(error=exc)
+        self._span_cm.__exit__(exc_type, exc, tb)
+        return False
+
+    def __call__(self, func):
+        name, kind, attributes = self.name, self.kind, self.attributes
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                # A fresh instance per call, so concurrent calls keep their own stage
+                with timed_stage(name, kind, **attributes):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed_stage(name, kind, **attributes):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+# Open agent and model stages of every running invocation: invocation ID ->
+# ("agent" | "model", agent name) -> (stage, context token)
+_invocations: Dict[str, Dict[Tuple[str, str], Tuple[Stage, Optional[contextvars.Token]]]] = {}
+
+
+def _end_invocation(invocation_id: str) -> None:
+    """
+    Drops an invocation's open stages. Stages still open here never got their after
+    callback (an error, a cancelled run, a callback that ended the invocation early) and
+    are recorded as not finished.
+    """
+    for stage, _ in (_invocations.pop(invocation_id, None) or {}).values():
+        stage.finish(error=RuntimeError("the invocation ended before this stage finished"))
+
+
+def _open_stages(callback_context) -> Dict[Tuple[str, str], Tuple[Stage, Optional[contextvars.Token]]]:
+    invocation_id = callback_context.invocation_id
+    stages = _invocations.get(invocation_id)
+    if stages is None:
+        stages = _invocations[invocation_id] = {}
+        # ADK has no hook for the end of an invocation, and after callbacks do not run when
+        # it fails or is cancelled. Its context lives exactly as long as the run, so the
+        # entry goes with it at the latest.
+        weakref.finalize(callback_context._invocation_context, _end_invocation, invocation_id)
+    return stages
+
+
+def _agent_callbacks(parent_name: Optional[str]):
+    def before_agent(callback_context):
+        stages = _open_stages(callback_context)
+        parent = stages.get(("agent", parent_name), (None, None))[0] if parent_name else None
+        if parent is None:
+            # Agents behind an AgentTool run in an invocation of their own. A finished stage
+            # here was left behind by a run that failed before its after callback
+            parent = _current_stage.get()
+            while parent is not None and parent.finished:
+                parent = parent.parent
+        # ADK's own agent_run span is current here; the metrics are attached to it
+        stage = Stage(callback_context.agent_name, "agent", parent=parent, span=trace.get_current_span()).start()
+        # Tools and nested stages of this agent nest under it
+        stages[("agent", callback_context.agent_name)] = (stage, _current_stage.set(stage))
+        return None
+
+    def after_agent(callback_context):
+        stages = _invocations.get(callback_context.invocation_id, {})
+        # A later before_model_callback may have answered without the model (e.g. from
+        # a checkpoint), in which case no after_model_callback ran
+        model, _ = stages.pop(("model", callback_context.agent_name), (None, None))
+        if model is not None:
+            model.finish()
+        stage, token = stages.pop(("agent", callback_context.agent_name), (None, None))
+        if stage is not None:
+            stage.finish()
+            try:
+                _current_stage.reset(token)
+            except ValueError:
+                # Parallel branches resume in a new task for every event: this context is
+                # not the one the stage was set in, so there is nothing to undo
+                pass
+        if parent_name is None:
+            # The invocation's root agent is done
+            _end_invocation(callback_context.invocation_id)
+        return None
+
+    return before_agent, after_agent
+
+
+def _before_model(callback_context, llm_request):
+    stages = _open_stages(callback_context)
+    stage = Stage(
+        f"{callback_context.agent_name}.model",
+        "model",
+        parent=stages.get(("agent", callback_context.agent_name), (None, None))[0],
+        span=trace.get_current_span(),
+        model=getattr(llm_request, "model", None),
+    ).start()
+    stages[("model", callback_context.agent_name)] = (stage, None)
+    return None
+
+
+def _after_model(callback_context, llm_response):
+    stage, _ = _invocations.get(callback_context.invocation_id, {}).pop(("model", callback_context.agent_name), (None, None))
+    if stage is None:
+        return None
+    usage = getattr(llm_response, "usage_metadata", None)
+    if usage is not None:
+        stage.add(
+            prompt_tokens=usage.prompt_token_count or 0,
+            completion_tokens=usage.candidates_token_count or 0,
+        )
+    stage.finish()
+    return None
+
+
+def _prepend(existing, callback) -> list:
+    # First in the list: ADK stops at the first callback that returns something
+    if existing is None:
+        return [callback]
+    return [callback] + (list(existing) if isinstance(existing, list) else [existing])
+
+
+def instrument_agent(agent, parent_name: Optional[str] = None):
+    """
+    Adds timing callbacks to an agent tree (sub-agents and agents wrapped in an AgentTool):
+    every agent run becomes a stage, and every LLM call of an LlmAgent a model stage with
+    its token counts. Returns the agent.
+    """
+    before_agent, after_agent = _agent_callbacks(parent_name)
+    agent.before_agent_callback = _prepend(agent.before_agent_callback, before_agent)
+    agent.after_agent_callback = _prepend(agent.after_agent_callback, after_agent)
+    if hasattr(agent, "before_model_callback"):
+        agent.before_model_callback = _prepend(agent.before_model_callback, _before_model)
+        agent.after_model_callback = _prepend(agent.after_model_callback, _after_model)
+    for sub_agent in agent.sub_agents:
+        instrument_agent(sub_agent, agent.name)
+    for tool in getattr(agent, "tools", None) or []:
+        if hasattr(tool, "agent"):
+            instrument_agent(tool.agent)
+    return agent
@@ -0,0 +1,170 @@
+import functools
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Iterable, Optional
+
+from filelock import FileLock
+
+_project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# One JSON manifest per job (source video); an empty value turns checkpointing off
+JOB_MANIFEST_DIR = os.environ.get("JOB_MANIFEST_DIR", os.path.join(_project_root, ".cache", "jobs"))
+
+# Bytes hashed at each end of a source video by media_fingerprint
+FINGERPRINT_SAMPLE_BYTES = 4 * 1024 ** 2
+
+_lock = threading.Lock()
+
+
+def text_hash(value) -> str:
+    """
+    SHA-256 of a string, or of the canonical JSON of any other JSON-able value.
+    """
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+@functools.lru_cache(maxsize=1024)
+def _file_hash(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 ** 2), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_hash(path: str) -> str:
+    """
+    SHA-256 of a file's content, cached per (path, mtime, size) within the process.
+    """
+    stat = os.stat(path)
+    return _file_hash(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=256)
+def _media_fingerprint(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256(str(size).encode("utf-8"))
+    with open(path, "rb") as f:
+        digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+        if size > 2 * FINGERPRINT_SAMPLE_BYTES:
+            f.seek(size - FINGERPRINT_SAMPLE_BYTES)
+            digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+    return digest.hexdigest()
+
+
+def media_fingerprint(path: str) -> str:
+    """
+    Cheap content key for a (possibly multi-GB) source video: its size plus a hash of
+    the first and last few MB. Two different downloads practically never share both.
+    """
+    stat = os.stat(path)
+    return _media_fingerprint(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+class JobManifest:
+    """
+    On-disk checkpoints of one pipeline job, `<JOB_MANIFEST_DIR>/<job_id>.json`.
+
+    Every completed stage is stored under a name with a hash of its inputs, its outputs
+    and the content hash of every file it produced. A stage counts as completed only
+    while its inputs hash the same and all of its files still exist unchanged, so a
+    rerun after a failure (or of the same job) skips exactly the work that is still
+    valid. Writes are atomic and serialised with a file lock, so parallel stages and
+    processes of the same job can checkpoint concurrently.
+    """
+
+    def __init__(self, path: str, job_id: str):
+        self.path = path
+        self.job_id = job_id
+        self._file_lock = FileLock(f"{path}.lock", timeout=60)
+
+    @classmethod
+    def for_job(cls, job_id: str) -> Optional["JobManifest"]:
+        """
+        Manifest of a job (usually the YouTube video ID), or None when checkpointing is off.
+        """
+        if not JOB_MANIFEST_DIR or not job_id:
+            return None
+        os.makedirs(JOB_MANIFEST_DIR, exist_ok=True)
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", job_id)
+        return cls(os.path.join(JOB_MANIFEST_DIR, f"{name}.json"), job_id)
+
+    def load(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"job": self.job_id, "created": time.time(), "stages": {}}
+
+    def _save(self, data: dict) -> None:
+        data["updated"] = time.time()
+        partial = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(partial, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(partial, self.path)
+
+    def completed(self, stage: str, inputs) -> Optional[dict]:
+        """
+        Outputs of `stage` if it completed with the same inputs and its files are intact,
+        else None.
+        """
+        entry = self.load()["stages"].get(stage)
+        if not entry or entry.get("inputs_hash") != text_hash(inputs):
+            return None
+        for path, digest in entry.get("files", {}).items():
+            try:
+                if file_hash(path) != digest:
+                    return None
+            except OSError:
+                return None
+        return entry.get("outputs") or {}
+
+    def complete(self, stage: str, inputs, outputs: Optional[dict] = None, files: Iterable[str] = ()) -> None:
+        """
+        Checkpoints `stage`: its inputs (hashed), outputs and the content hash of `files`.
+        """
+        entry = {
+            "inputs_hash": text_hash(inputs),
+            "inputs": inputs,
+            "outputs": outputs or {},
+            "files": {os.path.abspath(path): file_hash(path) for path in files},
+            "completed_at": time.time(),
+        }
+        try:
+            with _lock, self._file_lock:
+                data = self.load()
+                data["stages"][stage] = entry
+                self._save(data)
+        except OSError as e:
+            print(f"Could not update job manifest {self.path}: {e}")
+
+    def relocate(self, old_path: str, new_path: str) -> None:
+        """
+        Points every checkpoint that produced `old_path` at the file's new location, e.g.
+        after a later stage moved it. The content hash stays valid.
+        """
+        old_path, new_path = os.path.abspath(old_path), os.path.abspath(new_path)
+        with _lock, self._file_lock:
+            data = self.load()
+            changed = False
+            for entry in data["stages"].values():
+                if old_path in entry.get("files", {}):
+                    entry["files"][new_path] = entry["files"].pop(old_path)
+                    changed = True
+                for key, value in entry.get("outputs", {}).items():
+                    if value == old_path:
+                        entry["outputs"][key] = new_path
+                        changed = True
+            if changed:
+                self._save(data)
+
+    def invalidate(self, stage: str) -> None:
+        with _lock, self._file_lock:
+            data = self.load()
+            if data["stages"].pop(stage, None) is not None:
+                self._save(data)
@@ -3,6 +3,8 @@ SEGMENTATION_AGENT_PROMPT = """You are a viral content segmentation agent specia
 ## Input
 You will receive a transcript from the state key 'transcription_output' containing:
 - Multiple sentences with precise start and end timestamps
+- One paragraph per line in the form "[start-end] text" (e.g. "[1:39-2:14] So we said that...")
+- Possibly only pre-selected candidate passages, separated by blank lines; pick your segments from within them
 - Spoken content from a YouTube video
 
 ## Primary Objective
@@ -83,4 +85,18 @@ Return an array of HIGH-IMPACT segments only:
   "viral_potential": "HIGH/MEDIUM", 
   "content_type": "Educational/Entertainment/Inspirational/Controversial/Relatable/Trending",
 }
-"""
\ No newline at end of file
+"""
+
+WINDOW_SEGMENTATION_PROMPT = SEGMENTATION_AGENT_PROMPT + """
+
+## Windowed Mode
+You are only seeing one window of a longer transcript ({window_start} to {window_end}).
+The full transcript is split into overlapping windows that are scored separately, so:
+- Return at most {max_candidates} candidate segments from THIS window, or an empty array if nothing qualifies
+- Only use timestamps that appear inside this window
+- Add an integer "score" field (5-50): the sum of your five Viral Potential Scoring ratings
+- Respond with the JSON array only, no prose and no code fences
+
+## Transcript Window
+{transcript}
+"""
@@ -0,0 +1,227 @@
+import re
+from typing import List, Optional, Sequence, Tuple
+
+import av
+import numpy as np
+
+from ..transcript_agent.chunker import chunk_transcript
+from ..transcript_agent.transcript import Transcript
+
+# Strong openers and engagement phrases from the segmentation criteria
+HOOK_PATTERN = re.compile(
+    r"\b(?:you won'?t believe|this changed everything|nobody talks about|the truth is|the secret|"
+    r"here'?s why|the biggest mistake|never|always|stop doing|unpopular opinion|"
+    r"what if|imagine|how to|the reason|i was wrong|changed my life|crazy|insane)\b",
+    re.IGNORECASE,
+)
+# A snippet asking a question counts as this much of a hook, however many "?" it has
+QUESTION_CREDIT = 0.5
+FILLER_PATTERN = re.compile(r"\b(?:um+|uh+|erm|hmm+|like|you know|i mean|sort of|kind of|basically|anyway)\b", re.IGNORECASE)
+
+Candidate = Tuple[float, float, float]
+
+# Loudness needs no more than this, and it keeps decoding cheap
+ENERGY_SAMPLE_RATE = 8000
+
+DEFAULT_WEIGHTS = {
+    "speech_rate": 1.0,
+    "pause_density": -0.8,
+    "hook_opening": 1.5,
+    "hook_density": 0.7,
+    "filler_ratio": -1.0,
+    "energy": 0.8,
+}
+
+
+def _zscore(values: np.ndarray) -> np.ndarray:
+    std = values.std()
+    if std < 1e-9:
+        return np.zeros_like(values)
+    return (values - values.mean()) / std
+
+
+def audio_energy_per_second(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """
+    RMS energy of each full second of mono audio.
+    """
+    seconds = len(samples) // sample_rate
+    if seconds == 0:
+        return np.zeros(0, dtype=np.float64)
+    frames = samples[: seconds * sample_rate].astype(np.float64).reshape(seconds, sample_rate)
+    return np.sqrt((frames ** 2).mean(axis=1))
+
+
+def decode_audio_energy(media_path: str, sample_rate: int = ENERGY_SAMPLE_RATE) -> np.ndarray:
+    """
+    Per-second RMS energy of a media file's audio track. The audio is decoded as a
+    stream of low-rate mono frames, so the whole track is never held in memory.
+    Returns:
+        np.ndarray: One value per full second (empty if the file has no audio).
+    """
+    chunks: List[np.ndarray] = []
+    pending = np.zeros(0, dtype=np.float64)
+
+    def add(frames) -> None:
+        nonlocal pending
+        for frame in frames:
+            pending = np.concatenate((pending, frame.to_ndarray().reshape(-1) / 32768.0))
+            whole = len(pending) // sample_rate * sample_rate
+            if whole:
+                chunks.append(audio_energy_per_second(pending[:whole], sample_rate))
+                pending = pending[whole:]
+
+    with av.open(media_path) as container:
+        if not container.streams.audio:
+            return np.zeros(0, dtype=np.float64)
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=sample_rate)
+        for frame in container.decode(container.streams.audio[0]):
+            add(resampler.resample(frame))
+        add(resampler.resample(None))
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float64)
+
+
+def score_windows(
+    transcript: Transcript,
+    window_lengths: Sequence[float] = (30.0, 60.0, 90.0),
+    step: float = 5.0,
+    hook_window: float = 8.0,
+    audio_energy: Optional[np.ndarray] = None,
+    weights: Optional[dict] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Scores every sliding window (all `window_lengths`, every `step` seconds) with cheap
+    transcript signals: speech rate, pause density, hook phrases and questions (weighted
+    towards the opening seconds), filler ratio and optional per-second audio energy.
+
+    Per-snippet counts are computed once; window sums then come from prefix sums and
+    `searchsorted`, so the cost is linear in snippets plus windows.
+    Returns:
+        tuple: (starts, ends, scores) arrays, one entry per window.
+    """
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    if not len(transcript):
+        empty = np.zeros(0)
+        return empty, empty, empty
+
+    starts, durations = transcript.as_numpy()
+    ends = starts + durations
+    texts = transcript.texts
+    words = np.fromiter((len(t.split()) for t in texts), dtype=np.float64, count=len(texts))
+    hooks = np.fromiter(
+        (len(HOOK_PATTERN.findall(t)) + (QUESTION_CREDIT if "?" in t else 0.0) for t in texts),
+        dtype=np.float64,
+        count=len(texts),
+    )
+    fillers = np.fromiter((len(FILLER_PATTERN.findall(t)) for t in texts), dtype=np.float64, count=len(texts))
+    gaps = np.clip(np.append(starts[1:], ends[-1]) - ends, 0.0, None)
+
+    def prefix(values: np.ndarray) -> np.ndarray:
+        return np.concatenate(([0.0], np.cumsum(values)))
+
+    words_sum, hooks_sum, fillers_sum, gaps_sum = prefix(words), prefix(hooks), prefix(fillers), prefix(gaps)
+
+    total = float(ends[-1])
+    window_starts, window_ends = [], []
+    for length in window_lengths:
+        if length > total:
+            grid = np.array([0.0])
+            length = total
+        else:
+            grid = np.arange(0.0, total - length + 1e-9, step)
+        window_starts.append(grid)
+        window_ends.append(grid + length)
+    w_start = np.concatenate(window_starts)
+    w_end = np.concatenate(window_ends)
+    w_len = np.maximum(w_end - w_start, 1e-6)
+
+    # Snippets whose start falls inside each window (and inside its opening seconds)
+    lo = np.searchsorted(starts, w_start, side="left")
+    hi = np.searchsorted(starts, w_end, side="left")
+    hook_hi = np.searchsorted(starts, w_start + hook_window, side="left")
+
+    window_words = words_sum[hi] - words_sum[lo]
+    speech_rate = window_words / w_len
+    pause_density = (gaps_sum[hi] - gaps_sum[lo]) / w_len
+    hook_opening = hooks_sum[hook_hi] - hooks_sum[lo]
+    hook_density = (hooks_sum[hi] - hooks_sum[lo]) / w_len * 60.0
+    filler_ratio = (fillers_sum[hi] - fillers_sum[lo]) / np.maximum(window_words, 1.0)
+
+    score = (
+        weights["speech_rate"] * _zscore(speech_rate)
+        + weights["pause_density"] * _zscore(pause_density)
+        + weights["hook_opening"] * _zscore(hook_opening)
+        + weights["hook_density"] * _zscore(hook_density)
+        + weights["filler_ratio"] * _zscore(filler_ratio)
+    )
+
+    if audio_energy is not None and len(audio_energy):
+        energy_sum = prefix(np.asarray(audio_energy, dtype=np.float64))
+        a = np.clip(w_start.astype(int), 0, len(audio_energy))
+        b = np.clip(w_end.astype(int), 0, len(audio_energy))
+        energy = (energy_sum[b] - energy_sum[a]) / np.maximum(b - a, 1)
+        score = score + weights["energy"] * _zscore(energy)
+
+    # Windows with (almost) no speech are never good candidates
+    score = np.where(window_words < 5, -np.inf, score)
+    return w_start, w_end, score
+
+
+def shortlist_windows(
+    transcript: Transcript,
+    top_k: int = 12,
+    max_overlap: float = 0.3,
+    audio_energy: Optional[np.ndarray] = None,
+    **options,
+) -> List[Candidate]:
+    """
+    Returns the `top_k` best-scoring windows as (start, end, score), best first, skipping
+    windows that overlap an already chosen one by more than `max_overlap` of the shorter.
+    """
+    w_start, w_end, score = score_windows(transcript, audio_energy=audio_energy, **options)
+    chosen: List[Candidate] = []
+    for idx in np.argsort(-score):
+        if len(chosen) >= top_k or not np.isfinite(score[idx]):
+            break
+        start, end = float(w_start[idx]), float(w_end[idx])
+        overlapping = False
+        for c_start, c_end, _ in chosen:
+            shared = min(end, c_end) - max(start, c_start)
+            if shared > max_overlap * min(end - start, c_end - c_start):
+                overlapping = True
+                break
+        if not overlapping:
+            chosen.append((start, end, float(score[idx])))
+    return chosen
+
+
+def slice_transcript(transcript: Transcript, start: float, end: float) -> Transcript:
+    """
+    Rows of `transcript` that start inside [start, end).
+    """
+    starts, _ = transcript.as_numpy()
+    lo = int(np.searchsorted(starts, start, side="left"))
+    hi = int(np.searchsorted(starts, end, side="left"))
+    return Transcript(transcript.starts[lo:hi], transcript.durations[lo:hi], transcript.texts[lo:hi])
+
+
+def shortlist_text(
+    transcript: Transcript,
+    top_k: int = 12,
+    context_seconds: float = 10.0,
+    token_budget: Optional[int] = None,
+    audio_energy: Optional[np.ndarray] = None,
+) -> str:
+    """
+    Condensed transcript of the `top_k` candidate windows only (plus a little context on
+    each side), one blank-line separated block per candidate in timeline order. This is
+    what the segmentation LLM reads instead of the whole transcript.
+    """
+    candidates = sorted(shortlist_windows(transcript, top_k=top_k, audio_energy=audio_energy))
+    if not candidates:
+        return chunk_transcript(transcript, token_budget=token_budget)
+    per_block_budget = token_budget // len(candidates) if token_budget else None
+    blocks = []
+    for start, end, _ in candidates:
+        window = slice_transcript(transcript, max(0.0, start - context_seconds), end + context_seconds)
+        blocks.append(chunk_transcript(window, token_budget=per_block_budget, min_paragraph_seconds=10.0, max_paragraph_seconds=30.0))
+    return "\n\n".join(block for block in blocks if block)
@@ -1,11 +1,143 @@
-from google.adk.agents import LlmAgent
+import json
+import os
+from typing import AsyncGenerator, Optional
+
+from google import genai
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from ..instrumentation import record
+from ..job_manifest import JobManifest, text_hash
+from ..url_parser_agent.tools import find_video_id
+from .instruction import SEGMENTATION_AGENT_PROMPT, WINDOW_SEGMENTATION_PROMPT
+from .windowed import Generate, parse_candidates, segment_transcript
+
+SEGMENTATION_MODEL = "gemini-2.0-flash"
+
+
+def segments_checkpoint(state, **settings):
+    """
+    The job manifest and the inputs of the segmentation stage for the transcript in
+    `state`, or (None, None) when there is no video ID or transcript to key them on.
+    """
+    video_id = find_video_id(str(state.get("parsed_video_id", "")))
+    transcript = str(state.get("transcription_output", ""))
+    if not video_id or not transcript or transcript.startswith("Error:"):
+        return None, None
+    manifest = JobManifest.for_job(video_id)
+    return manifest, {"video_id": video_id, "transcript": text_hash(transcript), "model": SEGMENTATION_MODEL, **settings}
+
+
+def complete_segments(manifest: JobManifest, inputs: dict, text: str) -> None:
+    # Only usable answers are checkpointed; anything else is asked again on the next run
+    count = len(parse_candidates(text))
+    if count:
+        manifest.complete("segments", inputs, {"segments": text, "hash": text_hash(text), "count": count})
+
+
+def _reuse_segments(callback_context, llm_request):
+    # Answers the model call from the job manifest when this transcript was segmented before
+    manifest, inputs = segments_checkpoint(callback_context.state, prompt=text_hash(SEGMENTATION_AGENT_PROMPT))
+    checkpoint = manifest.completed("segments", inputs) if manifest else None
+    if checkpoint is None:
+        return None
+    print(f"Reusing the checkpointed segments of {manifest.job_id}.")
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=checkpoint["segments"])]))
+
+
+def _checkpoint_segments(callback_context, llm_response):
+    manifest, inputs = segments_checkpoint(callback_context.state, prompt=text_hash(SEGMENTATION_AGENT_PROMPT))
+    if manifest is not None and llm_response.content and llm_response.content.parts:
+        complete_segments(manifest, inputs, "".join(part.text or "" for part in llm_response.content.parts))
+    return None
 
-from .instruction import SEGMENTATION_AGENT_PROMPT
 
 segmentation_agent = LlmAgent(
     name="segmentation_agent",
-    model="gemini-2.0-flash",
+    model=SEGMENTATION_MODEL,
     description="Segmentation agent that segments transcript into topics",
     instruction=SEGMENTATION_AGENT_PROMPT,
     output_key="segments",
-)
\ No newline at end of file
+    before_model_callback=_reuse_segments,
+    after_model_callback=_checkpoint_segments,
+)
+
+
+def gemini_generate(model: str = SEGMENTATION_MODEL) -> Generate:
+    """
+    Returns an async prompt -> text callable backed by the Gemini API.
+    """
+    client = genai.Client()
+
+    async def generate(prompt: str) -> str:
+        response = await client.aio.models.generate_content(model=model, contents=prompt)
+        usage = response.usage_metadata
+        if usage is not None:
+            record(prompt_tokens=usage.prompt_token_count or 0, completion_tokens=usage.candidates_token_count or 0)
+        return response.text or ""
+
+    return generate
+
+
+class WindowedSegmentationAgent(BaseAgent):
+    """
+    Map-reduce segmentation for long transcripts: scores overlapping windows of
+    'transcription_output' concurrently and writes the global top segments to the
+    'segments' state key, in the same schema as `segmentation_agent`. The result is
+    checkpointed in the job manifest and reused for the same transcript and settings.
+    """
+
+    window_seconds: float = 600.0
+    overlap_seconds: float = 90.0
+    concurrency: int = 4
+    min_segments: int = 3
+    max_segments: int = 8
+    generate: Optional[Generate] = None
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        transcript_text = ctx.session.state.get("transcription_output", "")
+        manifest, inputs = segments_checkpoint(
+            ctx.session.state,
+            prompt=text_hash(WINDOW_SEGMENTATION_PROMPT),
+            window_seconds=self.window_seconds,
+            overlap_seconds=self.overlap_seconds,
+            min_segments=self.min_segments,
+            max_segments=self.max_segments,
+        )
+        checkpoint = manifest.completed("segments", inputs) if manifest else None
+        if checkpoint is not None:
+            print(f"Reusing the checkpointed segments of {manifest.job_id}.")
+            text = checkpoint["segments"]
+        else:
+            generate = self.generate or gemini_generate()
+            segments = await segment_transcript(
+                transcript_text,
+                generate,
+                window_seconds=self.window_seconds,
+                overlap_seconds=self.overlap_seconds,
+                concurrency=self.concurrency,
+                min_segments=self.min_segments,
+                max_segments=self.max_segments,
+            )
+            text = json.dumps(segments, ensure_ascii=False, indent=2)
+            if manifest is not None:
+                complete_segments(manifest, inputs, text)
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=EventActions(state_delta={"segments": text}),
+        )
+
+
+windowed_segmentation_agent = WindowedSegmentationAgent(
+    name="windowed_segmentation_agent",
+    description="Segments long transcripts by scoring overlapping windows in parallel and keeping the global best.",
+    window_seconds=float(os.environ.get("SEGMENTATION_WINDOW_SECONDS", 600)),
+    overlap_seconds=float(os.environ.get("SEGMENTATION_WINDOW_OVERLAP", 90)),
+    concurrency=int(os.environ.get("SEGMENTATION_CONCURRENCY", 4)),
+)
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import re
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from .instruction import WINDOW_SEGMENTATION_PROMPT
+
+Generate = Callable[[str], Awaitable[str]]
+Paragraph = Tuple[float, float, str]
+
+LINE_PATTERN = re.compile(r"^\[(\d{1,2}(?::\d{2}){1,2})-(\d{1,2}(?::\d{2}){1,2})\]\s*(.*)$")
+
+
+def clock_to_seconds(value: str) -> float:
+    parts = [int(p) for p in value.strip().split(":")]
+    seconds = 0
+    for part in parts:
+        seconds = seconds * 60 + part
+    return float(seconds)
+
+
+def seconds_to_clock(seconds: float) -> str:
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+def parse_condensed(text: str) -> List[Paragraph]:
+    """
+    Parses the "[start-end] text" lines produced by the transcript chunker.
+    """
+    paragraphs = []
+    for line in text.splitlines():
+        match = LINE_PATTERN.match(line.strip())
+        if match:
+            paragraphs.append((clock_to_seconds(match.group(1)), clock_to_seconds(match.group(2)), match.group(3)))
+    return paragraphs
+
+
+def split_blocks(text: str) -> List[List[Paragraph]]:
+    """
+    Parses a shortlisted transcript (blank-line separated candidate blocks) into one
+    window per block.
+    """
+    blocks = [parse_condensed(block) for block in re.split(r"\n\s*\n", text)]
+    return [block for block in blocks if block]
+
+
+def make_windows(paragraphs: List[Paragraph], window_seconds: float = 600.0, overlap_seconds: float = 90.0) -> List[List[Paragraph]]:
+    """
+    Groups paragraphs into time windows of about `window_seconds` that overlap by
+    `overlap_seconds`, so a segment near a window edge is fully visible in one of them.
+    """
+    if not paragraphs:
+        return []
+    step = max(1.0, window_seconds - overlap_seconds)
+    total_end = paragraphs[-1][1]
+    windows = []
+    window_start = paragraphs[0][0]
+    while True:
+        window_end = window_start + window_seconds
+        window = [p for p in paragraphs if p[1] > window_start and p[0] < window_end]
+        if window:
+            windows.append(window)
+        if window_end >= total_end:
+            break
+        window_start += step
+    return windows
+
+
+def parse_candidates(response: str) -> List[dict]:
+    """
+    Extracts the JSON array of candidate segments from a model response.
+    """
+    text = response.strip()
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1).strip()
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end == -1:
+        return []
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return []
+    candidates = []
+    for item in data if isinstance(data, list) else []:
+        if not isinstance(item, dict):
+            continue
+        try:
+            item["_start"] = clock_to_seconds(item["start_time"])
+            item["_end"] = clock_to_seconds(item["end_time"])
+            item["score"] = float(item.get("score", 0))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if item["_end"] > item["_start"]:
+            candidates.append(item)
+    return candidates
+
+
+async def score_window(generate: Generate, window: List[Paragraph], semaphore: asyncio.Semaphore, max_candidates: int = 3) -> List[dict]:
+    """
+    Map step: asks the model for the best candidate segments inside one window.
+    A failing window is logged and contributes no candidates.
+    """
+    # The base prompt contains literal JSON braces, so fill placeholders by name
+    prompt = (
+        WINDOW_SEGMENTATION_PROMPT
+        .replace("{window_start}", seconds_to_clock(window[0][0]))
+        .replace("{window_end}", seconds_to_clock(window[-1][1]))
+        .replace("{max_candidates}", str(max_candidates))
+        .replace("{transcript}", "\n".join(f"[{seconds_to_clock(s)}-{seconds_to_clock(e)}] {t}" for s, e, t in window))
+    )
+    async with semaphore:
+        try:
+            response = await generate(prompt)
+        except Exception as e:
+            print(f"Window {seconds_to_clock(window[0][0])}-{seconds_to_clock(window[-1][1])} failed: {e}")
+            return []
+    return parse_candidates(response)
+
+
+def _overlap_ratio(a: dict, b: dict) -> float:
+    shared = min(a["_end"], b["_end"]) - max(a["_start"], b["_start"])
+    if shared <= 0:
+        return 0.0
+    return shared / min(a["_end"] - a["_start"], b["_end"] - b["_start"])
+
+
+def reduce_candidates(
+    candidates: List[dict],
+    min_segments: int = 3,
+    max_segments: int = 8,
+    max_overlap: float = 0.5,
+    min_score: float = 30.0,
+) -> List[dict]:
+    """
+    Reduce step: keeps the globally best candidates, dropping any that overlap an already
+    selected segment by more than `max_overlap` of the shorter one (windows overlap, so
+    the same moment is often proposed twice). Candidates under `min_score` are only used
+    to reach `min_segments`. The result is in timeline order without internal fields.
+    """
+    selected: List[dict] = []
+    for candidate in sorted(candidates, key=lambda c: c["score"], reverse=True):
+        if len(selected) >= max_segments:
+            break
+        if candidate["score"] < min_score and len(selected) >= min_segments:
+            break
+        if any(_overlap_ratio(candidate, kept) > max_overlap for kept in selected):
+            continue
+        selected.append(candidate)
+
+    selected.sort(key=lambda c: c["_start"])
+    return [{k: v for k, v in c.items() if not k.startswith("_")} for c in selected]
+
+
+async def segment_transcript(
+    transcript_text: str,
+    generate: Generate,
+    window_seconds: float = 600.0,
+    overlap_seconds: float = 90.0,
+    concurrency: int = 4,
+    windows: Optional[List[List[Paragraph]]] = None,
+    **reduce_options,
+) -> List[dict]:
+    """
+    Map-reduce segmentation: scores overlapping transcript windows concurrently (at most
+    `concurrency` model calls in flight) and reduces them to the global top segments.
+
+    `generate` is any async prompt -> text callable, so a stub can stand in for the model.
+    """
+    if windows is None:
+        blocks = split_blocks(transcript_text)
+        if len(blocks) > 1:
+            # Pre-scored candidate windows: score each candidate on its own
+            windows = blocks
+        else:
+            windows = make_windows(parse_condensed(transcript_text), window_seconds, overlap_seconds)
+    semaphore = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(*(score_window(generate, window, semaphore) for window in windows))
+    candidates = [candidate for window_candidates in results for candidate in window_candidates]
+    return reduce_candidates(candidates, **reduce_options)
@@ -0,0 +1,114 @@
+from typing import List, Optional, Sequence, Tuple
+
+Word = Tuple[float, float, str]
+CaptionSegment = Tuple[float, float, str, Sequence[Word]]
+
+# ASS colours are &HAABBGGRR
+WHITE = "&H00FFFFFF"
+YELLOW = "&H0000FFFF"
+BLACK = "&H00000000"
+SHADOW = "&H80000000"
+
+
+def _ass_time(seconds: float) -> str:
+    """
+    Formats seconds as an ASS timestamp (H:MM:SS.cc).
+    """
+    centiseconds = max(0, round(seconds * 100))
+    hours, centiseconds = divmod(centiseconds, 360_000)
+    minutes, centiseconds = divmod(centiseconds, 6_000)
+    seconds, centiseconds = divmod(centiseconds, 100)
+    return f"{hours}:{minutes:02}:{seconds:02}.{centiseconds:02}"
+
+
+def _escape(text: str) -> str:
+    # Braces start override blocks and backslashes start escapes in ASS dialogue text
+    return text.replace("\\", "/").replace("{", "(").replace("}", ")").replace("\n", " ")
+
+
+def _karaoke_text(start: float, end: float, words: Sequence[Word]) -> str:
+    """
+    Dialogue text with one \\k tag per word, so each word switches from the secondary
+    (not yet spoken) to the primary (spoken) colour when it is said.
+    """
+    parts = []
+    cursor = start
+    for word_start, word_end, word in words:
+        if word_start > cursor + 0.01:
+            # Silence before the word: an empty syllable keeps the timing in sync
+            parts.append(f"{{\\k{round((word_start - cursor) * 100)}}}")
+            cursor = word_start
+        duration = max(word_end, cursor) - cursor
+        parts.append(f"{{\\k{max(1, round(duration * 100))}}}{_escape(word)}")
+        cursor = max(word_end, cursor)
+    return "".join(parts).strip()
+
+
+def build_ass(
+    segments: List[CaptionSegment],
+    width: int,
+    height: int,
+    word_highlight: bool = False,
+    font: str = "Arial",
+    font_scale: float = 0.045,
+    bottom_margin: float = 0.18,
+) -> str:
+    """
+    Renders caption segments as an ASS script sized for a `width`x`height` video.
+
+    Captions are bold white with a black outline, centred above the bottom `bottom_margin`
+    of the frame (clear of the Shorts/Reels UI). With `word_highlight` every word turns
+    yellow as it is spoken, using the word timestamps of each segment.
+    """
+    font_size = max(12, round(height * font_scale))
+    outline = max(1, round(font_size / 12))
+    margin_v = round(height * bottom_margin)
+    margin_h = round(width * 0.06)
+    # Karaoke fills from SecondaryColour to PrimaryColour
+    primary, secondary = (YELLOW, WHITE) if word_highlight else (WHITE, WHITE)
+
+    lines = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {width}",
+        f"PlayResY: {height}",
+        "WrapStyle: 0",
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+        "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
+        "Alignment, MarginL, MarginR, MarginV, Encoding",
+        f"Style: Default,{font},{font_size},{primary},{secondary},{BLACK},{SHADOW},"
+        f"-1,0,0,0,100,100,0,0,1,{outline},1,2,{margin_h},{margin_h},{margin_v},1",
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ]
+    for start, end, text, words in segments:
+        if end <= start or not text.strip():
+            continue
+        if word_highlight and words:
+            body = _karaoke_text(start, end, words)
+        else:
+            body = _escape(text.strip())
+        lines.append(f"Dialogue: 0,{_ass_time(start)},{_ass_time(end)},Default,,0,0,0,,{body}")
+    return "\n".join(lines) + "\n"
+
+
+def write_ass(segments: List[CaptionSegment], path: str, width: int, height: int, **options) -> str:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(build_ass(segments, width, height, **options))
+    return path
+
+
+def subtitles_filter(ass_path: str, fonts_dir: Optional[str] = None) -> str:
+    """
+    ffmpeg `ass` filter that burns the script in, for appending to a clip's filter chain.
+    """
+    from ..video_editor_agent.reframe import filter_path
+
+    options = f"ass=filename={filter_path(ass_path)}"
+    if fonts_dir:
+        options += f":fontsdir={filter_path(fonts_dir)}"
+    return options
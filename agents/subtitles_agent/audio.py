@@ -0,0 +1,11 @@
+import numpy as np
+from faster_whisper.audio import decode_audio
+
+WHISPER_SAMPLE_RATE = 16000
+
+def load_audio(video_path: str) -> np.ndarray:
+    """
+    Decodes the audio track of a video straight into a 16 kHz mono float32 buffer with PyAV,
+    so nothing is written to disk before transcription.
+    """
+    return decode_audio(video_path, sampling_rate=WHISPER_SAMPLE_RATE)
@@ -0,0 +1,81 @@
+import bisect
+from typing import Dict, List
+
+import numpy as np
+from faster_whisper import BatchedInferencePipeline
+
+from .audio import WHISPER_SAMPLE_RATE
+from .source_index import Cue
+
+# Silence inserted between clips so VAD never joins speech from two different clips
+CLIP_GAP_SECONDS = 1.0
+
+
+def transcribe_batched(
+    model,
+    audio_by_clip: Dict[str, np.ndarray],
+    batch_size: int = 8,
+    beam_size: int = 5,
+) -> Dict[str, List[Cue]]:
+    """
+    Transcribes the audio of many clips in one batched faster-whisper run.
+
+    The clips are laid out back to back (separated by silence) in one buffer, which
+    BatchedInferencePipeline VAD-chunks and decodes `batch_size` chunks at a time, so
+    short clips fill batches together instead of each running its own sequential decode.
+    Words are mapped back to their clip by timestamp and rebased to the clip start.
+
+    Returns:
+        dict: Clip key -> list of (start, end, text) cues.
+    """
+    keys = list(audio_by_clip)
+    if not keys:
+        return {}
+
+    gap = np.zeros(int(CLIP_GAP_SECONDS * WHISPER_SAMPLE_RATE), dtype=np.float32)
+    pieces, clip_starts, clip_ends = [], [], []
+    cursor = 0
+    for key in keys:
+        audio = audio_by_clip[key]
+        clip_starts.append(cursor / WHISPER_SAMPLE_RATE)
+        clip_ends.append((cursor + len(audio)) / WHISPER_SAMPLE_RATE)
+        pieces += [audio, gap]
+        cursor += len(audio) + len(gap)
+
+    pipeline = BatchedInferencePipeline(model)
+    segments, _ = pipeline.transcribe(
+        np.concatenate(pieces),
+        batch_size=batch_size,
+        beam_size=beam_size,
+        word_timestamps=True,
+        without_timestamps=False,
+    )
+
+    def clip_of(t: float) -> int:
+        return max(0, bisect.bisect_right(clip_starts, t) - 1)
+
+    cues: Dict[str, List[Cue]] = {key: [] for key in keys}
+    for segment in segments:
+        words = segment.words or []
+        if not words:
+            idx = clip_of((segment.start + segment.end) / 2)
+            offset = clip_starts[idx]
+            cues[keys[idx]].append((
+                max(0.0, segment.start - offset),
+                min(segment.end, clip_ends[idx]) - offset,
+                segment.text.strip(),
+            ))
+            continue
+
+        # A chunk can straddle the silence between two clips, so split it by word
+        groups: Dict[int, list] = {}
+        for word in words:
+            groups.setdefault(clip_of((word.start + word.end) / 2), []).append(word)
+        for idx, group in groups.items():
+            offset = clip_starts[idx]
+            cues[keys[idx]].append((
+                max(0.0, group[0].start - offset),
+                min(group[-1].end, clip_ends[idx]) - offset,
+                "".join(w.word for w in group).strip(),
+            ))
+    return cues
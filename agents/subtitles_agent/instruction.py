@@ -27,10 +27,14 @@ Use the `generate_subtitles` tool with the following approach:
 - The tool expects an input directory containing video files
 - It will automatically extract audio, transcribe speech, and generate SRT files
 - The tool handles the entire subtitle generation pipeline internally
+- Pass `use_source_transcript=True` when several clips come from the same source video: the source is transcribed once and each clip's subtitles are cut from it
+- Pass `batch_size` (e.g. 8) to transcribe all clips together through the batched Whisper pipeline, which is much faster on CPU
+- For vertical shorts, pass `max_line_chars=32` and `max_chars_per_second=17` so captions are split into short two-line cues that stay up long enough to read
+- Pass `webvtt=True` when the user also wants WebVTT (.vtt) captions, e.g. for web players
 
 ### Step 3: Quality Assurance
 The tool will perform the following operations for each valid segment:
-- Extract audio from video files using MoviePy
+- Decode audio from video files in memory (no temporary WAV files)
 - Transcribe audio using Whisper model for accurate speech-to-text
 - Generate .srt subtitle files with proper SRT formatting:
   ```
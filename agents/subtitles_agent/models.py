@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from faster_whisper import WhisperModel
+
+WHISPER_MODEL_SIZE = os.environ.get("WHISPER_MODEL_SIZE", "base")
+WHISPER_DEVICE = os.environ.get("WHISPER_DEVICE", "cpu") # Try "cuda" if you have GPU
+WHISPER_COMPUTE_TYPE = os.environ.get("WHISPER_COMPUTE_TYPE", "int8")
+WHISPER_CPU_THREADS = int(os.environ.get("WHISPER_CPU_THREADS", "0"))
+WHISPER_NUM_WORKERS = int(os.environ.get("WHISPER_NUM_WORKERS", "1"))
+
+ModelKey = Tuple[str, str, str, int, int]
+
+
+class WhisperModelRegistry:
+    """
+    Process-wide cache of loaded faster-whisper models keyed by
+    (size, device, compute_type, cpu_threads, num_workers).
+
+    Models load lazily on first use and concurrent requests for the same key share a
+    single load. Memory stays bounded by keeping at most `max_models` models (least
+    recently used goes first) and dropping models idle for longer than `idle_timeout`
+    seconds. Idle models are dropped by a background sweeper thread that runs while any
+    model is loaded, so an idle server releases them without another request. Callers
+    that still hold an evicted model keep using it safely; it is freed once the last
+    reference goes away.
+    """
+
+    def __init__(self, max_models: int = 2, idle_timeout: Optional[float] = 900.0):
+        self.max_models = max_models
+        self.idle_timeout = idle_timeout
+        self._models: "OrderedDict[ModelKey, Tuple[WhisperModel, float]]" = OrderedDict()
+        self._load_locks: dict = {}
+        self._lock = threading.Lock()
+        self._sweeper: Optional[threading.Thread] = None
+
+    def get(
+        self,
+        size: str = WHISPER_MODEL_SIZE,
+        device: str = WHISPER_DEVICE,
+        compute_type: str = WHISPER_COMPUTE_TYPE,
+        cpu_threads: int = WHISPER_CPU_THREADS,
+        num_workers: int = WHISPER_NUM_WORKERS,
+    ) -> WhisperModel:
+        key = (size, device, compute_type, cpu_threads, num_workers)
+        with self._lock:
+            self._evict_idle()
+            model = self._touch(key)
+            if model is not None:
+                return model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Another thread may have finished loading while we waited
+            with self._lock:
+                model = self._touch(key)
+                if model is not None:
+                    return model
+
+            print(f"Loading Whisper model {key} (this may take a moment)...")
+            model = WhisperModel(
+                size,
+                device=device,
+                compute_type=compute_type,
+                cpu_threads=cpu_threads,
+                num_workers=num_workers,
+            )
+            print("Whisper model loaded.")
+
+            with self._lock:
+                self._models[key] = (model, time.monotonic())
+                while len(self._models) > self.max_models:
+                    evicted, _ = self._models.popitem(last=False)
+                    print(f"Evicted Whisper model {evicted} (LRU).")
+                self._load_locks.pop(key, None)
+                self._start_sweeper()
+        return model
+
+    def warmup(self, *keys: ModelKey) -> None:
+        """
+        Loads the given models (or the configured default) ahead of the first request.
+        """
+        for key in keys or [(WHISPER_MODEL_SIZE, WHISPER_DEVICE, WHISPER_COMPUTE_TYPE, WHISPER_CPU_THREADS, WHISPER_NUM_WORKERS)]:
+            self.get(*key)
+
+    def warmup_in_background(self, *keys: ModelKey) -> threading.Thread:
+        thread = threading.Thread(target=self.warmup, args=keys, name="whisper-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def evict_idle(self) -> None:
+        with self._lock:
+            self._evict_idle()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def _touch(self, key: ModelKey) -> Optional[WhisperModel]:
+        entry = self._models.get(key)
+        if entry is None:
+            return None
+        self._models[key] = (entry[0], time.monotonic())
+        self._models.move_to_end(key)
+        return entry[0]
+
+    def _start_sweeper(self) -> None:
+        # Called with self._lock held
+        if not self.idle_timeout or self._sweeper is not None:
+            return
+        self._sweeper = threading.Thread(target=self._sweep, name="whisper-idle-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def _sweep(self) -> None:
+        """
+        Evicts idle models as they expire and exits once none are left; the next load
+        starts a new sweeper.
+        """
+        while True:
+            with self._lock:
+                self._evict_idle()
+                if not self._models:
+                    self._sweeper = None
+                    return
+                next_expiry = min(last_used for _, last_used in self._models.values()) + self.idle_timeout
+            # A little past the expiry, since a model is only idle once it is strictly over
+            time.sleep(max(0.0, next_expiry - time.monotonic()) + 0.5)
+
+    def _evict_idle(self) -> None:
+        if not self.idle_timeout:
+            return
+        now = time.monotonic()
+        for key, (_, last_used) in list(self._models.items()):
+            if now - last_used > self.idle_timeout:
+                del self._models[key]
+                print(f"Evicted Whisper model {key} (idle).")
+
+
+whisper_models = WhisperModelRegistry(
+    max_models=int(os.environ.get("WHISPER_MAX_MODELS", "2")),
+    idle_timeout=float(os.environ.get("WHISPER_IDLE_TIMEOUT", "900")),
+)
+
+
+def get_whisper_model(
+    size: str = WHISPER_MODEL_SIZE,
+    device: str = WHISPER_DEVICE,
+    compute_type: str = WHISPER_COMPUTE_TYPE,
+    cpu_threads: int = WHISPER_CPU_THREADS,
+    num_workers: int = WHISPER_NUM_WORKERS,
+) -> WhisperModel:
+    """
+    Returns a shared Whisper model from the process-wide registry, loading it on first use.
+    """
+    return whisper_models.get(size, device, compute_type, cpu_threads, num_workers)
@@ -0,0 +1,165 @@
+import bisect
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+Cue = Tuple[float, float, str]
+Word = Tuple[float, float, str]
+
+# Source indexes kept in memory, least recently used dropped first (they stay on disk)
+SOURCE_INDEX_CACHE_SIZE = max(1, int(os.environ.get("SOURCE_INDEX_CACHE_SIZE", "8")))
+
+
+class SourceTranscript:
+    """
+    Word-timestamped transcription of a full source video, indexed by time.
+
+    Segments are kept in parallel lists sorted by start time so the segments overlapping
+    a clip window are found with a binary search instead of a scan. Clip subtitles are
+    cut out of the index and rebased to the clip start, so the source audio only has to
+    be transcribed once no matter how many (overlapping) clips are made from it.
+    """
+
+    def __init__(self, segments: Iterable[Tuple[float, float, str, List[Word]]]):
+        ordered = sorted(segments, key=lambda s: s[0])
+        self.starts = [s[0] for s in ordered]
+        self.ends = [s[1] for s in ordered]
+        self.texts = [s[2] for s in ordered]
+        self.words = [list(s[3]) for s in ordered]
+        # Running maximum of segment ends, so the first segment that can overlap a
+        # window is found by bisecting even when segments overlap each other
+        self._max_ends = []
+        running = float("-inf")
+        for end in self.ends:
+            running = max(running, end)
+            self._max_ends.append(running)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @classmethod
+    def from_whisper(cls, segments) -> "SourceTranscript":
+        """
+        Builds the index from faster-whisper segments transcribed with word_timestamps=True.
+        """
+        return cls(
+            (
+                segment.start,
+                segment.end,
+                segment.text.strip(),
+                [(w.start, w.end, w.word) for w in (segment.words or [])],
+            )
+            for segment in segments
+        )
+
+    def cues_between(self, start: float, end: float) -> List[Cue]:
+        """
+        Returns the cues that fall inside [start, end], rebased so `start` becomes 0.
+        Segments cut by the window edges keep only the words whose midpoint is inside it.
+        """
+        return [(cue_start, cue_end, text) for cue_start, cue_end, text, _ in self.segments_between(start, end)]
+
+    def segments_between(self, start: float, end: float) -> List[Tuple[float, float, str, List[Word]]]:
+        """
+        Like `cues_between`, but every cue also carries its rebased word timings, for
+        word-level caption styling.
+        """
+        segments = []
+        first = bisect.bisect_right(self._max_ends, start)
+        last = bisect.bisect_left(self.starts, end)
+        for idx in range(first, last):
+            seg_start, seg_end = self.starts[idx], self.ends[idx]
+            if seg_end <= start:
+                continue
+            if seg_start >= start and seg_end <= end:
+                words = [(w[0] - start, w[1] - start, w[2]) for w in self.words[idx]]
+                segments.append((seg_start - start, seg_end - start, self.texts[idx], words))
+                continue
+            words = [w for w in self.words[idx] if start <= (w[0] + w[1]) / 2 < end]
+            if not words:
+                continue
+            text = "".join(w[2] for w in words).strip()
+            rebased = [(max(0.0, w[0] - start), min(end, w[1]) - start, w[2]) for w in words]
+            segments.append((rebased[0][0], rebased[-1][1], text, rebased))
+        return segments
+
+    def to_dict(self) -> dict:
+        return {
+            "segments": [
+                [s, e, t, [list(w) for w in words]]
+                for s, e, t, words in zip(self.starts, self.ends, self.texts, self.words)
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SourceTranscript":
+        return cls((s, e, t, [tuple(w) for w in words]) for s, e, t, words in data["segments"])
+
+
+_index_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_index_locks: dict = {}
+_index_lock = threading.Lock()
+
+
+def _index_path(source_path: str) -> str:
+    return f"{os.path.splitext(source_path)[0]}.transcript.json"
+
+
+def _remember(version: list, transcript: SourceTranscript) -> None:
+    with _index_lock:
+        _index_cache[version[0]] = (version, transcript)
+        _index_cache.move_to_end(version[0])
+        while len(_index_cache) > SOURCE_INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+
+
+def load_source_transcript(source_path: str, model, model_key: Optional[tuple] = None, beam_size: int = 5) -> SourceTranscript:
+    """
+    Returns the word-level transcript of `source_path`, transcribing it at most once.
+    The index is kept in a small in-memory LRU and persisted next to the source, both
+    keyed by the file version and the Whisper model that produced it.
+    """
+    stat = os.stat(source_path)
+    version = [os.path.abspath(source_path), stat.st_mtime_ns, stat.st_size, list(model_key or [])]
+
+    with _index_lock:
+        source_lock = _index_locks.setdefault(version[0], threading.Lock())
+
+    # One lock per source: clips of the same video wait for a single transcription,
+    # other sources are not blocked
+    with source_lock:
+        with _index_lock:
+            cached = _index_cache.get(version[0])
+            if cached and cached[0] == version:
+                _index_cache.move_to_end(version[0])
+                return cached[1]
+
+        index_path = _index_path(source_path)
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == version:
+                    transcript = SourceTranscript.from_dict(data)
+                    _remember(version, transcript)
+                    print(f"Loaded source transcript index: {index_path}")
+                    return transcript
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Ignoring unreadable transcript index {index_path}: {e}")
+
+        print(f"Transcribing full source once: {source_path}")
+        # Given the path, faster-whisper decodes the audio itself
+        segments, _ = model.transcribe(source_path, beam_size=beam_size, word_timestamps=True)
+        transcript = SourceTranscript.from_whisper(segments)
+
+        data = transcript.to_dict()
+        data["version"] = version
+        tmp_path = f"{index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, index_path)
+
+        _remember(version, transcript)
+        return transcript
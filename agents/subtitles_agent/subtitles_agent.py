@@ -1,12 +1,21 @@
+import os
+from dotenv import load_dotenv
+load_dotenv()
+
 from google.adk.agents import Agent
 
-from .tools import generate_subtitles
+from .models import whisper_models
+from .tools import generate_subtitles_async
 from .instruction import SUBTITLES_PROMPT
 
+# Load the Whisper weights at server start instead of on the first request
+if os.environ.get("WHISPER_WARMUP", "").lower() in ("1", "true", "yes"):
+    whisper_models.warmup_in_background()
+
 subtitles_agent = Agent(
     name="subtitles_agent",
     model="gemini-2.5-flash",
     description="Generates subtitles for each segment and attach it to the video.",
     instruction=SUBTITLES_PROMPT,
-    tools=[generate_subtitles]
+    tools=[generate_subtitles_async]
 )
\ No newline at end of file
@@ -1,22 +1,46 @@
 import os
 import shutil
-from moviepy.editor import VideoFileClip
-from faster_whisper import WhisperModel
+import time
+from typing import Optional
 
-def _format_timestamp(seconds: float) -> str:
+from ..instrumentation import record, timed_stage
+from ..job_manifest import JobManifest, file_hash
+from ..tool_runtime import async_tool, check_cancelled, report_progress
+from ..video_editor_agent.clipper import clip_metadata_path, read_clip_metadata
+from .audio import WHISPER_SAMPLE_RATE, load_audio
+from .batched import transcribe_batched
+from .models import (
+    WHISPER_COMPUTE_TYPE,
+    WHISPER_CPU_THREADS,
+    WHISPER_DEVICE,
+    WHISPER_MODEL_SIZE,
+    WHISPER_NUM_WORKERS,
+    get_whisper_model,
+)
+from .source_index import load_source_transcript
+from .writer import SubtitleWriter, format_timestamp, reflow, segment_cues, srt_to_vtt, vtt_path_for
+
+def _write_srt(cues, srt_path: str, vtt_path: Optional[str] = None, **reflow_options) -> int:
     """
-    Formats a time in seconds to SRT timestamp format (HH:MM:SS,ms).
+    Writes (start, end, text) cues to an SRT file (and a WebVTT file if `vtt_path` is
+    set) and returns the number of cues written.
     """
-    milliseconds = round(seconds * 1000.0)
-    hours = milliseconds // 3_600_000
-    milliseconds %= 3_600_000
-    minutes = milliseconds // 60_000
-    milliseconds %= 60_000
-    seconds = milliseconds // 1_000
-    milliseconds %= 1_000
-    return f"{hours:02}:{minutes:02}:{seconds:02},{milliseconds:03}"
-
-def generate_subtitles(input_shorts_dir: str = "temp_shorts"):
+    with SubtitleWriter(srt_path, vtt_path) as writer:
+        return writer.write_all(reflow(cues, **reflow_options))
+
+@timed_stage("generate_subtitles", kind="tool")
+def generate_subtitles(
+    input_shorts_dir: str = "temp_shorts",
+    use_source_transcript: bool = False,
+    batch_size: int = 0,
+    beam_size: int = 5,
+    cpu_threads: int = WHISPER_CPU_THREADS,
+    num_workers: int = WHISPER_NUM_WORKERS,
+    webvtt: bool = False,
+    max_line_chars: int = 0,
+    max_chars_per_second: float = 0.0,
+    output_dir: str = "",
+):
     """
     This agent processes short video files, generates SRT subtitles,
     and moves the video and SRT file into new, dedicated folders
@@ -25,15 +49,39 @@ def generate_subtitles(input_shorts_dir: str = "temp_shorts"):
     Args:
         input_shorts_dir (str): The directory where the short video files
                                  (generated by another agent) are located.
+        use_source_transcript (bool): Transcribe each source video once with word
+                                 timestamps and cut every clip's subtitles out of it,
+                                 instead of transcribing every clip. Clips without
+                                 source metadata from split_video, or whose source fails
+                                 to transcribe, are transcribed directly.
+        batch_size (int): When above 0, the audio of all pending clips is VAD-chunked and
+                                 decoded together through faster-whisper's batched pipeline.
+        beam_size (int): Beam size used for decoding.
+        cpu_threads (int): CTranslate2 threads per model (0 uses the library default).
+        num_workers (int): Number of model workers for concurrent transcription.
+        webvtt (bool): Also write a WebVTT (.vtt) file next to every SRT.
+        max_line_chars (int): When above 0, captions are reflowed for short-form video:
+                                 wrapped into lines of at most this many characters
+                                 (about 32 suits 9:16) and split into cues of two lines.
+        max_chars_per_second (float): When above 0, captions that would have to be read
+                                 faster than this (about 17) stay on screen longer, up to
+                                 the next caption.
+        output_dir (str): The directory that receives the per-short folders. Defaults to
+                                 the downloads directory of the project.
+    Returns:
+        dict: The generated SRT paths plus audio seconds, wall seconds and throughput.
+
+    Clips transcribed on their own are written cue by cue while Whisper decodes them.
+    Clips cut by split_video are checkpointed in their job manifest: a clip whose
+    content was subtitled before with the same settings reuses its SRT.
     """
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(os.path.dirname(script_dir))
-    output_downloads_dir = os.path.join(project_root, "downloads")
+    output_downloads_dir = output_dir or os.path.join(project_root, "downloads")
+    model_key = (WHISPER_MODEL_SIZE, WHISPER_DEVICE, WHISPER_COMPUTE_TYPE, cpu_threads, num_workers)
 
-    print("Loading Whisper model (this may take a moment)...")
     try:
-        model = WhisperModel("base", device="cpu", compute_type="int8") # Try "cuda" if you have GPU
-        print("Whisper model loaded.")
+        model = get_whisper_model(*model_key)
     except Exception as e:
         print(f"Error loading Whisper model: {e}. Please ensure you have the necessary dependencies.")
         print("For GPU support, ensure CUDA is installed and configure faster-whisper correctly.")
@@ -52,62 +100,156 @@ def generate_subtitles(input_shorts_dir: str = "temp_shorts"):
         print(f"No video files found in {input_shorts_dir}.")
         return
 
+    reflow_options = {"max_line_chars": max_line_chars, "max_cps": max_chars_per_second}
+
+    def output_paths(video_file: str):
+        # Every short gets its own folder in the output directory, holding the video and its captions
+        name = os.path.splitext(video_file)[0]
+        output_folder_path = os.path.join(output_downloads_dir, f"{name}_output")
+        return output_folder_path, os.path.join(output_folder_path, f"{name}.srt")
+
+    started = time.perf_counter()
+    audio_seconds = 0.0
+    cues_by_clip = {}
+    sidecar_srts = {}
+    reused_srts = {}
+    streamed_srts = {}
+    checkpoints = {}
+    pending_audio = {}
+    failed_sources = set()
+
+    # 1. Resolve cues from the source transcript where possible, decode the rest in memory
+    for done, video_file in enumerate(video_files, start=1):
+        check_cancelled()
+        report_progress(f"transcribing clip {done}/{len(video_files)}", done=done, total=len(video_files))
+        video_path = os.path.join(input_shorts_dir, video_file)
+        sidecar_srt = f"{os.path.splitext(video_path)[0]}.srt"
+        try:
+            metadata = read_clip_metadata(video_path)
+            manifest = JobManifest.for_job(metadata.get("job")) if metadata else None
+            if manifest is not None:
+                # Keyed by the clip's content, so a re-cut identical clip finds it too
+                inputs = {
+                    "clip": file_hash(video_path),
+                    "model": WHISPER_MODEL_SIZE,
+                    "use_source_transcript": use_source_transcript,
+                    "beam_size": beam_size,
+                    "webvtt": webvtt,
+                    "max_line_chars": max_line_chars,
+                    "max_chars_per_second": max_chars_per_second,
+                }
+                checkpoints[video_file] = (manifest, f"subtitles:{inputs['clip'][:16]}", inputs)
+
+            if os.path.exists(sidecar_srt):
+                # Written by split_video together with burned-in captions: nothing to transcribe
+                sidecar_srts[video_file] = sidecar_srt
+                continue
+            if manifest is not None:
+                checkpoint = manifest.completed(*checkpoints[video_file][1:])
+                if checkpoint is not None:
+                    print(f"Reusing the checkpointed subtitles of '{video_file}'.")
+                    reused_srts[video_file] = checkpoint["srt_path"]
+                    continue
+
+            clip_info = metadata if use_source_transcript else None
+            if clip_info and os.path.exists(clip_info["source"]) and clip_info["source"] not in failed_sources:
+                try:
+                    transcript = load_source_transcript(clip_info["source"], model, model_key=model_key, beam_size=beam_size)
+                except Exception as e:
+                    # Tried once per source; its clips are transcribed on their own instead
+                    print(f"Error transcribing the source of '{video_file}': {e}. Transcribing its clips directly.")
+                    failed_sources.add(clip_info["source"])
+                else:
+                    cues_by_clip[video_file] = transcript.cues_between(clip_info["start"], clip_info["end"])
+                    audio_seconds += clip_info["end"] - clip_info["start"]
+                    continue
+
+            print(f"Decoding audio for '{video_file}'...")
+            audio = load_audio(video_path)
+            audio_seconds += len(audio) / WHISPER_SAMPLE_RATE
+            if batch_size > 0:
+                pending_audio[video_file] = audio
+                continue
+
+            # 2. Transcribe this clip on its own, writing every cue as soon as it is decoded
+            print(f"Transcribing '{video_file}'...")
+            output_folder_path, srt_path = output_paths(video_file)
+            os.makedirs(output_folder_path, exist_ok=True)
+            segments, info = model.transcribe(audio, beam_size=beam_size)
+            with SubtitleWriter(srt_path, vtt_path_for(srt_path) if webvtt else None) as writer:
+                for start, end, text in reflow(segment_cues(segments), **reflow_options):
+                    check_cancelled()
+                    writer.write(start, end, text)
+                    report_progress(
+                        f"'{video_file}' {format_timestamp(end)}: {text}",
+                        clip=video_file, cue=writer.count, start=start, end=end, text=text,
+                    )
+            streamed_srts[video_file] = srt_path
+        except Exception as e:
+            print(f"Error transcribing {video_file}: {e}")
+
+    # 2. Transcribe every pending clip together in batches
+    if pending_audio:
+        print(f"Batch-transcribing {len(pending_audio)} clips (batch_size={batch_size})...")
+        try:
+            cues_by_clip.update(transcribe_batched(model, pending_audio, batch_size=batch_size, beam_size=beam_size))
+        except Exception as e:
+            print(f"Error during batched transcription: {e}")
+        pending_audio.clear()
+
+    # 3. Write the remaining SRTs and move each short video into its output folder
+    srt_paths = []
     for video_file in video_files:
+        if not any(video_file in found for found in (cues_by_clip, sidecar_srts, reused_srts, streamed_srts)):
+            continue
         video_path = os.path.join(input_shorts_dir, video_file)
-        video_name_without_ext = os.path.splitext(video_file)[0]
-        
-        # Define paths for audio, SRT, and new output folder
-        audio_path = os.path.join(input_shorts_dir, f"{video_name_without_ext}.wav")
-        srt_filename = f"{video_name_without_ext}.srt"
-        
-        output_folder_name = f"{video_name_without_ext}_output"
-        output_folder_path = os.path.join(output_downloads_dir, output_folder_name)
-        
+        output_folder_path, srt_path = output_paths(video_file)
+        vtt_path = vtt_path_for(srt_path) if webvtt else None
+
         os.makedirs(output_folder_path, exist_ok=True)
         print(f"\nProcessing '{video_file}'...")
         print(f"Created output folder: {output_folder_path}")
 
         try:
-            # 1. Extract audio from video
-            print("Extracting audio...")
-            video_clip = VideoFileClip(video_path)
-            video_clip.audio.write_audiofile(audio_path) # type: ignore
-            video_clip.close()
-            print("Audio extraction complete.")
-
-            # 2. Transcribe audio and generate SRT
-            print("Transcribing audio...")
-            segments, info = model.transcribe(audio_path, beam_size=5) # You can adjust beam_size
-
-            srt_content = []
-            segment_id = 1
-            for segment in segments:
-                start_time_str = _format_timestamp(segment.start)
-                end_time_str = _format_timestamp(segment.end)
-                text = segment.text.strip()
-                
-                srt_content.append(str(segment_id))
-                srt_content.append(f"{start_time_str} --> {end_time_str}")
-                srt_content.append(text)
-                srt_content.append("")
-                segment_id += 1
-
-            srt_path = os.path.join(output_folder_path, srt_filename)
-            with open(srt_path, "w", encoding="utf-8") as f:
-                f.write("\n".join(srt_content))
+            if video_file in sidecar_srts:
+                shutil.move(sidecar_srts[video_file], srt_path)
+            elif video_file in reused_srts:
+                if os.path.abspath(reused_srts[video_file]) != os.path.abspath(srt_path):
+                    shutil.copy2(reused_srts[video_file], srt_path)
+            elif video_file in cues_by_clip:
+                _write_srt(cues_by_clip[video_file], srt_path, vtt_path, **reflow_options)
+            if vtt_path and (video_file in sidecar_srts or video_file in reused_srts):
+                srt_to_vtt(srt_path, vtt_path)
             print(f"SRT file generated: {srt_path}")
+            srt_paths.append(srt_path)
 
-            # 3. Move the original short video to the new folder
             destination_video_path = os.path.join(output_folder_path, video_file)
             shutil.move(video_path, destination_video_path)
             print(f"Moved video to: {destination_video_path}")
+            if os.path.exists(clip_metadata_path(video_path)):
+                shutil.move(clip_metadata_path(video_path), clip_metadata_path(destination_video_path))
+            if video_file in checkpoints:
+                manifest, stage, inputs = checkpoints[video_file]
+                # The clip checkpoint follows the clip, so split_video can still reuse it
+                manifest.relocate(video_path, destination_video_path)
+                outputs = {"srt_path": os.path.abspath(srt_path), "video_path": os.path.abspath(destination_video_path)}
+                manifest.complete(stage, inputs, outputs, files=[srt_path, vtt_path] if vtt_path else [srt_path])
 
         except Exception as e:
             print(f"Error processing {video_file}: {e}")
-        finally:
-            # Clean up temporary audio file
-            if os.path.exists(audio_path):
-                os.remove(audio_path)
-                print(f"Removed temporary audio file: {audio_path}")
 
-    print("\nSubtitles Agent finished processing all shorts.")
\ No newline at end of file
+    wall_seconds = time.perf_counter() - started
+    throughput = audio_seconds / wall_seconds if wall_seconds > 0 else 0.0
+    record(audio_seconds=audio_seconds)
+    print(f"\nTranscribed {audio_seconds:.1f}s of audio in {wall_seconds:.1f}s ({throughput:.2f} audio-s per wall-s).")
+    print("Subtitles Agent finished processing all shorts.")
+    return {
+        "srt_paths": srt_paths,
+        "audio_seconds": round(audio_seconds, 2),
+        "wall_seconds": round(wall_seconds, 2),
+        "audio_seconds_per_wall_second": round(throughput, 2),
+    }
+
+
+# Non-blocking version for the ADK runtime (see agents/tool_runtime.py)
+generate_subtitles_async = async_tool(generate_subtitles)
@@ -0,0 +1,217 @@
+import asyncio
+import os
+import threading
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Tuple
+
+Cue = Tuple[float, float, str]
+
+
+def _clock(seconds: float) -> tuple:
+    milliseconds = int(seconds * 1000.0 + 0.5) if seconds > 0 else 0
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return hours, minutes, seconds, milliseconds
+
+
+def format_timestamp(seconds: float, separator: str = ",") -> str:
+    """
+    Formats a time in seconds as HH:MM:SS,mmm (SRT) or, with separator=".", HH:MM:SS.mmm (WebVTT).
+    """
+    hours, minutes, seconds, milliseconds = _clock(seconds)
+    return "%02d:%02d:%02d%s%03d" % (hours, minutes, seconds, separator, milliseconds)
+
+
+def srt_block(index: int, start: float, end: float, text: str) -> str:
+    # One formatting operation per cue instead of per timestamp plus a join
+    return "%d\n%02d:%02d:%02d,%03d --> %02d:%02d:%02d,%03d\n%s\n\n" % (index, *_clock(start), *_clock(end), text)
+
+
+def vtt_block(start: float, end: float, text: str) -> str:
+    return "%02d:%02d:%02d.%03d --> %02d:%02d:%02d.%03d\n%s\n\n" % (*_clock(start), *_clock(end), text)
+
+
+def wrap_lines(text: str, max_chars: int) -> List[str]:
+    """
+    Greedy word wrap to lines of at most `max_chars` (a longer single word gets its own line).
+    """
+    lines: List[str] = []
+    line = ""
+    for word in text.split():
+        if line and len(line) + 1 + len(word) > max_chars:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    if line:
+        lines.append(line)
+    return lines
+
+
+def reflow(
+    cues: Iterable[Cue],
+    max_line_chars: int = 0,
+    max_lines: int = 2,
+    max_cps: float = 0.0,
+) -> Iterator[Cue]:
+    """
+    Reflows cues for short-form captions, lazily.
+
+    With `max_line_chars`, every cue is wrapped into lines of that length and split into
+    cues of at most `max_lines` lines, each getting a share of the cue's time by its
+    number of characters. With `max_cps`, a cue that would be read faster than `max_cps`
+    characters per second stays on screen longer, up to the start of the next cue (so
+    cues are emitted one cue late).
+    """
+    def split(cues: Iterable[Cue]) -> Iterator[Cue]:
+        for start, end, text in cues:
+            text = " ".join(text.split())
+            if not text:
+                continue
+            if not max_line_chars or len(text) <= max_line_chars:
+                yield start, end, text
+                continue
+            lines = wrap_lines(text, max_line_chars)
+            chunks = [lines[i:i + max_lines] for i in range(0, len(lines), max_lines)]
+            total = sum(len(line) for line in lines)
+            offset = start
+            for chunk in chunks:
+                length = end - start if len(chunks) == 1 else (end - start) * sum(len(line) for line in chunk) / total
+                yield offset, offset + length, "\n".join(chunk)
+                offset += length
+
+    if not max_cps:
+        yield from split(cues)
+        return
+
+    pending: Optional[Cue] = None
+    for cue in split(cues):
+        if pending is not None:
+            start, end, text = pending
+            needed = start + len(text.replace("\n", " ")) / max_cps
+            yield start, max(end, min(needed, cue[0])), text
+        pending = cue
+    if pending is not None:
+        yield pending
+
+
+class SubtitleWriter:
+    """
+    Writes cues to an SRT file (and optionally a WebVTT file) as they arrive, so a
+    caption file grows while Whisper is still decoding instead of appearing at the end.
+    Each cue is flushed, so other processes can read the file as it is written.
+
+        with SubtitleWriter(srt_path, vtt_path) as writer:
+            for cue in reflow(cues, max_line_chars=32):
+                writer.write(*cue)
+    """
+
+    def __init__(self, srt_path: str, vtt_path: Optional[str] = None):
+        self.srt_path = srt_path
+        self.vtt_path = vtt_path
+        self.count = 0
+        self._srt = open(srt_path, "w", encoding="utf-8")
+        self._vtt = open(vtt_path, "w", encoding="utf-8") if vtt_path else None
+        if self._vtt is not None:
+            self._vtt.write("WEBVTT\n\n")
+
+    def write(self, start: float, end: float, text: str) -> None:
+        self.count += 1
+        self._srt.write(srt_block(self.count, start, end, text))
+        self._srt.flush()
+        if self._vtt is not None:
+            self._vtt.write(vtt_block(start, end, text))
+            self._vtt.flush()
+
+    def write_all(self, cues: Iterable[Cue]) -> int:
+        for cue in cues:
+            self.write(*cue)
+        return self.count
+
+    def close(self) -> None:
+        self._srt.close()
+        if self._vtt is not None:
+            self._vtt.close()
+
+    def __enter__(self) -> "SubtitleWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+
+def segment_cues(segments) -> Iterator[Cue]:
+    """
+    (start, end, text) cues from faster-whisper's lazy segments generator, without
+    consuming it ahead of time.
+    """
+    for segment in segments:
+        yield segment.start, segment.end, segment.text.strip()
+
+
+async def stream_subtitles(
+    cues: Iterable[Cue],
+    srt_path: str,
+    vtt_path: Optional[str] = None,
+    **reflow_options,
+) -> AsyncIterator[Cue]:
+    """
+    Async iterator over the cues as they are written, e.g. to show live captions.
+
+    `cues` is usually `segment_cues(segments)` for a faster-whisper generator: decoding
+    happens while it is iterated, so it is consumed on a worker thread and the event loop
+    only receives finished cues. Stopping the iteration early stops the decoding at the
+    next cue.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+    done = object()
+
+    def produce() -> None:
+        try:
+            with SubtitleWriter(srt_path, vtt_path) as writer:
+                for cue in reflow(cues, **reflow_options):
+                    if stop.is_set():
+                        break
+                    writer.write(*cue)
+                    loop.call_soon_threadsafe(queue.put_nowait, cue)
+        except BaseException as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+
+    producer = loop.run_in_executor(None, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        await asyncio.shield(producer)
+
+
+def vtt_path_for(srt_path: str) -> str:
+    return f"{os.path.splitext(srt_path)[0]}.vtt"
+
+
+def srt_to_vtt(srt_path: str, vtt_path: str) -> int:
+    """
+    Converts an existing SRT file to WebVTT and returns the number of cues.
+    """
+    with open(srt_path, "r", encoding="utf-8") as f:
+        blocks = f.read().strip().split("\n\n")
+    count = 0
+    with open(vtt_path, "w", encoding="utf-8") as f:
+        f.write("WEBVTT\n\n")
+        for block in blocks:
+            lines = block.strip().split("\n")
+            if len(lines) >= 2 and "-->" in lines[1]:
+                f.write(lines[1].replace(",", ".") + "\n" + "\n".join(lines[2:]) + "\n\n")
+                count += 1
+    return count
@@ -0,0 +1,285 @@
+import asyncio
+import contextvars
+import functools
+import os
+import subprocess
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set
+
+from opentelemetry import trace
+
+# Tools that may run at the same time per process; override with TOOL_CONCURRENCY_<TOOL>
+DEFAULT_TOOL_CONCURRENCY = {
+    "download_video": 2,
+    "download_video_ranges": 2,
+    "split_video": 1,
+    "generate_subtitles": 1,
+}
+
+# Progress events of one job closer together than this are dropped (unless forced)
+PROGRESS_INTERVAL = 1.0
+
+
+class ToolCancelled(BaseException):
+    """
+    Raised inside a tool whose job was cancelled. A BaseException, like
+    asyncio.CancelledError, so the `except Exception` fallbacks of the tools do not
+    swallow it and start the next engine.
+    """
+
+
+_current_job: contextvars.ContextVar[Optional["ToolJob"]] = contextvars.ContextVar("frame_ai_tool_job", default=None)
+_running_jobs: Dict[str, "ToolJob"] = {}
+_listeners: List[Callable[[dict], None]] = []
+_registry_lock = threading.Lock()
+
+
+def tool_concurrency(name: str) -> int:
+    default = DEFAULT_TOOL_CONCURRENCY.get(name, 1)
+    return max(1, int(os.environ.get(f"TOOL_CONCURRENCY_{name.upper()}", default)))
+
+
+class ToolJob:
+    """
+    One running call of an async tool: carries its cancellation flag, the subprocesses it
+    started (so they can be killed) and publishes its progress events.
+    """
+
+    def __init__(self, tool: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.tool = tool
+        self.started_at = time.time()
+        self.cancelled = threading.Event()
+        self._processes: Set[subprocess.Popen] = set()
+        self._lock = threading.Lock()
+        self._last_progress = 0.0
+
+    def check(self) -> None:
+        if self.cancelled.is_set():
+            raise ToolCancelled(f"{self.tool} was cancelled.")
+
+    def cancel(self) -> None:
+        """
+        Flags the job and kills its running subprocesses (killed, not terminated: on
+        SIGTERM ffmpeg first drains its encoders, which can take seconds). The tool itself
+        stops at its next check, or when its subprocess dies.
+        """
+        self.cancelled.set()
+        with self._lock:
+            processes = list(self._processes)
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+        self.progress("cancelled", force=True)
+
+    def run(self, cmd: list, check: bool = True, **kwargs) -> subprocess.CompletedProcess:
+        """
+        subprocess.run(cmd, check=check, capture_output=True) that cancel() can kill.
+        """
+        self.check()
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs)
+        with self._lock:
+            self._processes.add(process)
+        if self.cancelled.is_set():
+            process.kill()  # cancel() ran between the check and the registration
+        try:
+            try:
+                stdout, stderr = process.communicate()
+            except BaseException:
+                process.kill()
+                process.wait()
+                raise
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+        self.check()
+        if check and process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, cmd, stdout, stderr)
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+    def progress(self, message: str, force: bool = False, **fields) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_progress < PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        event = {
+            "job": self.id,
+            "tool": self.tool,
+            "message": message,
+            "elapsed_seconds": round(time.time() - self.started_at, 2),
+            **fields,
+        }
+        print(f"[{self.tool}] {message}")
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.add_event("progress", {key: value for key, value in event.items() if isinstance(value, (bool, int, float, str))})
+        with _registry_lock:
+            listeners = list(_listeners)
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                print(f"Progress listener failed: {e}")
+
+
+def current_job() -> Optional[ToolJob]:
+    return _current_job.get()
+
+
+def report_progress(message: str, force: bool = False, **fields) -> None:
+    """
+    Publishes a progress event for the async tool call this code runs in (no-op when the
+    tool was called synchronously).
+    """
+    job = _current_job.get()
+    if job is not None:
+        job.progress(message, force=force, **fields)
+
+
+def check_cancelled() -> None:
+    """
+    Raises ToolCancelled if the async tool call this code runs in was cancelled.
+    """
+    job = _current_job.get()
+    if job is not None:
+        job.check()
+
+
+def run_process(cmd: list, check: bool = True, **kwargs) -> subprocess.CompletedProcess:
+    """
+    Runs a subprocess with captured output, killable by the current job's cancellation.
+    """
+    job = _current_job.get()
+    if job is not None:
+        return job.run(cmd, check=check, **kwargs)
+    return subprocess.run(cmd, check=check, capture_output=True, **kwargs)
+
+
+def add_progress_listener(listener: Callable[[dict], None]) -> None:
+    """
+    Registers a callback for every progress event. It is called from the tool's worker
+    thread; see subscribe_progress for an asyncio queue.
+    """
+    with _registry_lock:
+        _listeners.append(listener)
+
+
+def remove_progress_listener(listener: Callable[[dict], None]) -> None:
+    with _registry_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def subscribe_progress(
+    loop: Optional[asyncio.AbstractEventLoop] = None,
+    job_id: Optional[str] = None,
+) -> "asyncio.Queue[dict]":
+    """
+    Returns an asyncio queue that receives the progress events, e.g. to stream them to
+    a client over SSE. Pass it to unsubscribe_progress when done.
+
+    Args:
+        loop: Event loop the queue belongs to (the running one by default).
+        job_id: Only receive the events of this job (every job by default).
+    """
+    loop = loop or asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def listener(event: dict) -> None:
+        if job_id is None or event["job"] == job_id:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    queue._progress_listener = listener
+    add_progress_listener(listener)
+    return queue
+
+
+def unsubscribe_progress(queue: "asyncio.Queue[dict]") -> None:
+    remove_progress_listener(getattr(queue, "_progress_listener", None))
+
+
+def running_jobs() -> List[ToolJob]:
+    with _registry_lock:
+        return list(_running_jobs.values())
+
+
+def get_job(job_id: str) -> Optional[ToolJob]:
+    """
+    The running job with this ID (the "job" field of its progress events), or None once
+    it has finished.
+    """
+    with _registry_lock:
+        return _running_jobs.get(job_id)
+
+
+def cancel_job(job_id: str) -> bool:
+    """
+    Cancels one running job, e.g. when its client asks to stop. Returns False if no job
+    with this ID is running.
+    """
+    job = get_job(job_id)
+    if job is None:
+        return False
+    job.cancel()
+    return True
+
+
+def cancel_all() -> int:
+    """
+    Cancels every running tool job (e.g. on server shutdown). Returns how many.
+    """
+    jobs = running_jobs()
+    for job in jobs:
+        job.cancel()
+    return len(jobs)
+
+
+def async_tool(func: Callable, concurrency: Optional[int] = None) -> Callable:
+    """
+    Wraps a blocking tool into a coroutine function for the ADK runtime.
+
+    The work runs on a thread pool of its own, so the event loop (and every other session
+    of an api_server process) keeps running. Calls beyond the tool's concurrency limit
+    wait on an asyncio semaphore. When the awaiting task is cancelled (e.g. the client
+    disconnected), the job is cancelled: its subprocesses are killed and the tool
+    stops at its next check; the slot is freed once the work has actually stopped.
+
+    The wrapper keeps the tool's name, signature and docstring, so the model sees the
+    same tool.
+    """
+    name = func.__name__
+    limit = concurrency or tool_concurrency(name)
+    executor = ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"tool-{name}")
+    # asyncio primitives belong to one event loop
+    semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+    @functools.wraps(func)
+    async def run(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        semaphore = semaphores.setdefault(loop, asyncio.Semaphore(limit))
+        async with semaphore:
+            job = ToolJob(name)
+            context = contextvars.copy_context()
+            context.run(_current_job.set, job)
+            with _registry_lock:
+                _running_jobs[job.id] = job
+            future = loop.run_in_executor(executor, functools.partial(context.run, func, *args, **kwargs))
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                job.cancel()
+                try:
+                    await future
+                except BaseException:
+                    pass
+                raise
+            finally:
+                with _registry_lock:
+                    _running_jobs.pop(job.id, None)
+
+    run.executor = executor
+    return run
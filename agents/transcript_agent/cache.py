@@ -0,0 +1,197 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from importlib.metadata import PackageNotFoundError, version
+from typing import Dict, List, Optional
+
+from youtube_transcript_api import ( # type: ignore
+    InvalidVideoId,
+    NoTranscriptFound,
+    TranscriptsDisabled,
+    VideoUnavailable,
+    YouTubeTranscriptApi,
+)
+
+try:
+    API_VERSION = version("youtube-transcript-api")
+except PackageNotFoundError:
+    API_VERSION = "unknown"
+
+# Errors that will not go away by retrying soon, so they are cached as "no transcript"
+PERMANENT_ERRORS = (InvalidVideoId, NoTranscriptFound, TranscriptsDisabled, VideoUnavailable)
+
+
+class TranscriptUnavailable(Exception):
+    """
+    Raised when a video has no transcript for the requested language (also served from
+    the negative cache).
+    """
+
+
+class YouTubeTranscriptFetcher:
+    """
+    Fetches raw transcript snippets from YouTube.
+    """
+
+    api_version = API_VERSION
+
+    def fetch(self, video_id: str, language: str = "en") -> List[dict]:
+        try:
+            result = YouTubeTranscriptApi().fetch(video_id, languages=(language,))
+        except PERMANENT_ERRORS as e:
+            raise TranscriptUnavailable(str(e)) from e
+        return [
+            {"text": snippet.text, "start": snippet.start, "duration": snippet.duration}
+            for snippet in result.snippets
+        ]
+
+
+class StaticTranscriptFetcher:
+    """
+    Offline stand-in for YouTubeTranscriptFetcher. Serves canned snippets from memory and
+    counts calls so cache hits and misses can be checked without network access.
+    Videos missing from `transcripts` raise TranscriptUnavailable.
+    """
+
+    api_version = "static"
+
+    def __init__(self, transcripts: Optional[Dict[str, List[dict]]] = None):
+        self.transcripts = transcripts or {}
+        self.calls: List[tuple] = []
+
+    def fetch(self, video_id: str, language: str = "en") -> List[dict]:
+        self.calls.append((video_id, language))
+        if video_id not in self.transcripts:
+            raise TranscriptUnavailable(f"No transcript for {video_id} ({language})")
+        return [dict(snippet) for snippet in self.transcripts[video_id]]
+
+
+class TranscriptCache:
+    """
+    SQLite-backed transcript store keyed by (video_id, language, api_version).
+
+    Entries expire after `ttl` seconds (`negative_ttl` for cached "no transcript" results)
+    and the store is kept to `max_entries` rows by evicting the least recently read ones.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: Optional[float] = 7 * 24 * 3600,
+        negative_ttl: Optional[float] = 6 * 3600,
+        max_entries: int = 2000,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS transcripts (
+                video_id TEXT NOT NULL,
+                language TEXT NOT NULL,
+                api_version TEXT NOT NULL,
+                payload TEXT,
+                error TEXT,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                PRIMARY KEY (video_id, language, api_version)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS transcripts_accessed ON transcripts (accessed)")
+        self._conn.commit()
+
+    def get(self, video_id: str, language: str, api_version: str) -> Optional[dict]:
+        """
+        Returns {"payload": ...} for a hit, {"error": ...} for a negative hit, or None.
+        """
+        key = (video_id, language, api_version)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, error, created FROM transcripts WHERE video_id = ? AND language = ? AND api_version = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            payload, error, created = row
+            ttl = self.ttl if error is None else self.negative_ttl
+            if ttl is not None and now - created > ttl:
+                self._conn.execute(
+                    "DELETE FROM transcripts WHERE video_id = ? AND language = ? AND api_version = ?", key
+                )
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE transcripts SET accessed = ? WHERE video_id = ? AND language = ? AND api_version = ?",
+                (now, *key),
+            )
+            self._conn.commit()
+        if error is not None:
+            return {"error": error}
+        return {"payload": json.loads(payload)}
+
+    def put(self, video_id: str, language: str, api_version: str, payload=None, error: Optional[str] = None) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    video_id, language, api_version,
+                    None if payload is None else json.dumps(payload, separators=(",", ":")),
+                    error, now, now,
+                ),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM transcripts")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+
+    def _evict(self) -> None:
+        overflow = self._conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM transcripts WHERE rowid IN (SELECT rowid FROM transcripts ORDER BY accessed ASC LIMIT ?)",
+                (overflow,),
+            )
+
+
+class CachedTranscriptFetcher:
+    """
+    Serves transcripts from a TranscriptCache and only calls `fetcher` on a miss.
+    "No transcript" results are cached too and re-raised as TranscriptUnavailable.
+    """
+
+    def __init__(self, fetcher, cache: TranscriptCache):
+        self.fetcher = fetcher
+        self.cache = cache
+
+    def fetch(self, video_id: str, language: str = "en") -> List[dict]:
+        api_version = getattr(self.fetcher, "api_version", API_VERSION)
+        cached = self.cache.get(video_id, language, api_version)
+        if cached is not None:
+            if "error" in cached:
+                raise TranscriptUnavailable(cached["error"])
+            return cached["payload"]
+
+        try:
+            snippets = self.fetcher.fetch(video_id, language)
+        except TranscriptUnavailable as e:
+            self.cache.put(video_id, language, api_version, error=str(e) or "No transcript available")
+            raise
+        self.cache.put(video_id, language, api_version, payload=snippets)
+        return snippets
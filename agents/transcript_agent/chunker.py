@@ -0,0 +1,148 @@
+import math
+import re
+from typing import List, Optional, Tuple
+
+from .transcript import Transcript
+
+SENTENCE_END = re.compile(r"[.!?…][\"')\]]*$")
+# Only pure disfluencies: phrases like "kind of" or "i mean" often carry meaning
+FILLERS = re.compile(r"\b(?:um+|uh+|erm+|hmm+)\b[,]?\s*", re.IGNORECASE)
+NOISE = re.compile(r"\[(?:music|applause|laughter|inaudible)\]", re.IGNORECASE)
+REPEATS = re.compile(r"\b(\w+)(?:\s+\1\b)+", re.IGNORECASE)
+
+# Rough size of a token for English text, used to enforce the budget without a tokenizer
+CHARS_PER_TOKEN = 4
+
+Paragraph = Tuple[float, float, str]
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _clock(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def merge_snippets(
+    transcript: Transcript,
+    pause_gap: float = 1.2,
+    min_paragraph_seconds: float = 15.0,
+    max_paragraph_seconds: float = 45.0,
+) -> List[Paragraph]:
+    """
+    Merges caption snippets into paragraphs.
+
+    A paragraph closes at a sentence end (or a pause of at least `pause_gap` seconds, for
+    auto-captions without punctuation) once it is `min_paragraph_seconds` long, and is
+    force-closed at `max_paragraph_seconds`.
+    """
+    paragraphs: List[Paragraph] = []
+    parts: List[str] = []
+    start = end = 0.0
+    count = len(transcript)
+
+    for idx in range(count):
+        text = NOISE.sub("", transcript.texts[idx]).replace("\n", " ").strip()
+        snippet_start = transcript.starts[idx]
+        snippet_end = snippet_start + transcript.durations[idx]
+        if not text:
+            continue
+        if not parts:
+            start = snippet_start
+        parts.append(text)
+        end = max(end, snippet_end)
+
+        next_start = transcript.starts[idx + 1] if idx + 1 < count else None
+        gap = (next_start - snippet_end) if next_start is not None else float("inf")
+        length = end - start
+        boundary = SENTENCE_END.search(text) is not None or gap >= pause_gap
+
+        if (boundary and length >= min_paragraph_seconds) or length >= max_paragraph_seconds:
+            paragraphs.append((start, end, " ".join(parts)))
+            parts = []
+
+    if parts:
+        paragraphs.append((start, end, " ".join(parts)))
+    return paragraphs
+
+
+def format_paragraphs(paragraphs: List[Paragraph]) -> str:
+    """
+    Compact timestamped format: one "[start-end] text" line per paragraph.
+    """
+    return "\n".join(f"[{_clock(start)}-{_clock(end)}] {text}" for start, end, text in paragraphs)
+
+
+def _condense(text: str) -> str:
+    text = FILLERS.sub("", text)
+    text = REPEATS.sub(r"\1", text)
+    return re.sub(r"\s{2,}", " ", text).strip()
+
+
+def _paragraph_score(paragraph: Paragraph) -> float:
+    """
+    How much a paragraph is worth keeping: words per second, minus the share of them
+    that are disfluencies. Dense speech outranks pauses, music and hesitation.
+    """
+    start, end, text = paragraph
+    words = len(text.split())
+    if not words:
+        return 0.0
+    return words / max(end - start, 1.0) - len(FILLERS.findall(text)) / words
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(" ", 1)[0]
+    return f"{cut}…"
+
+
+def chunk_transcript(
+    transcript: Transcript,
+    token_budget: Optional[int] = None,
+    pause_gap: float = 1.2,
+    min_paragraph_seconds: float = 15.0,
+    max_paragraph_seconds: float = 45.0,
+) -> str:
+    """
+    Deterministic, non-LLM pre-chunker: merges snippets into timestamped paragraphs and
+    squeezes the result under `token_budget` (estimated tokens).
+
+    Over budget, fillers and stutters are dropped first; if that is not enough, whole
+    paragraphs are dropped, lowest score first (see `_paragraph_score`), and the rest
+    stay intact and in timeline order. A single paragraph larger than the budget on its
+    own is cut off at the budget.
+    """
+    paragraphs = merge_snippets(transcript, pause_gap, min_paragraph_seconds, max_paragraph_seconds)
+    output = format_paragraphs(paragraphs)
+    if token_budget is None or estimate_tokens(output) <= token_budget:
+        return output
+
+    scores = [_paragraph_score(paragraph) for paragraph in paragraphs]
+    paragraphs = [(start, end, _condense(text)) for start, end, text in paragraphs]
+    output = format_paragraphs(paragraphs)
+    if estimate_tokens(output) <= token_budget:
+        return output
+
+    max_chars = token_budget * CHARS_PER_TOKEN
+    # Line lengths plus the newline joining them
+    sizes = [len(format_paragraphs([paragraph])) + 1 for paragraph in paragraphs]
+    total = sum(sizes) - 1
+    kept = set(range(len(paragraphs)))
+    for idx in sorted(kept, key=lambda i: scores[i]):
+        if total <= max_chars or len(kept) == 1:
+            break
+        kept.discard(idx)
+        total -= sizes[idx]
+    paragraphs = [paragraphs[idx] for idx in sorted(kept)]
+
+    if total > max_chars:
+        start, end, text = paragraphs[0]
+        overhead = len(format_paragraphs([(start, end, "")]))
+        paragraphs = [(start, end, _truncate(text, max(0, max_chars - overhead)))]
+    return format_paragraphs(paragraphs)
@@ -1,36 +1,54 @@
-from youtube_transcript_api import YouTubeTranscriptApi # type: ignore
+import os
 
-def youtube_transcript(video_id: str) -> list | None:
+from ..instrumentation import record, timed_stage
+from .chunker import chunk_transcript
+from .cache import CachedTranscriptFetcher, TranscriptCache, YouTubeTranscriptFetcher
+from .transcript import Transcript
+
+_project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+transcript_fetcher = CachedTranscriptFetcher(
+    YouTubeTranscriptFetcher(),
+    TranscriptCache(
+        os.environ.get("TRANSCRIPT_CACHE_PATH", os.path.join(_project_root, ".cache", "transcripts.sqlite3")),
+        ttl=float(os.environ.get("TRANSCRIPT_CACHE_TTL", 7 * 24 * 3600)),
+        negative_ttl=float(os.environ.get("TRANSCRIPT_CACHE_NEGATIVE_TTL", 6 * 3600)),
+        max_entries=int(os.environ.get("TRANSCRIPT_CACHE_MAX_ENTRIES", 2000)),
+    ),
+)
+
+TRANSCRIPT_TOKEN_BUDGET = int(os.environ.get("TRANSCRIPT_TOKEN_BUDGET", 8000))
+
+def fetch_transcript(video_id: str, language: str = "en") -> Transcript:
+    """
+    Returns the (cached) transcript of a YouTube video as a columnar Transcript.
+    """
+    transcript = Transcript.from_snippets(transcript_fetcher.fetch(video_id, language))
+    record(media_seconds=transcript.duration)
+    return transcript
+
+@timed_stage("youtube_transcript", kind="tool")
+def youtube_transcript(video_id: str, language: str = "en") -> dict:
     """
     Fetches the transcript of a YouTube video given its video ID.
     This tool is used to retrieve the raw transcript data from a YouTube video link.
+    Transcripts (and "no transcript" results) are served from a local cache when available.
     Args:
         video_id: The YouTube video ID.
+        language: The transcript language code, "en" by default.
+    Returns:
+        dict: Parallel columns "start" and "duration" (seconds) and "text", one entry per snippet.
     """
-       
-    ytt_api = YouTubeTranscriptApi()
-    result = ytt_api.fetch(video_id).snippets
-
-    output = []
+    return fetch_transcript(video_id, language).to_dict()
 
-    for snippet in result:
-        start_time = snippet.start
-        end_time = start_time + snippet.duration
-        
-        start_minutes = int(start_time // 60)
-        start_seconds = int(start_time % 60)
-        end_minutes = int(end_time // 60)
-        end_seconds = int(end_time % 60)
-        
-        formatted_snippet = {
-            "text": snippet.text.strip(),
-            "start_time": start_time,
-            "end_time": end_time,
-            "duration": snippet.duration,
-            "timestamp": f"{start_minutes}:{start_seconds:02d}",
-            "time_range": f"{start_minutes}:{start_seconds:02d} - {end_minutes}:{end_seconds:02d}"
-        }
-        
-        output.append(formatted_snippet)
-        
-    return output
\ No newline at end of file
+@timed_stage("condensed_transcript", kind="tool")
+def condensed_transcript(video_id: str, token_budget: int = TRANSCRIPT_TOKEN_BUDGET, language: str = "en") -> str:
+    """
+    Fetches the transcript of a YouTube video and condenses it locally into timestamped
+    paragraphs, one "[start-end] text" line each, kept under the given token budget.
+    Args:
+        video_id: The YouTube video ID.
+        token_budget: Approximate maximum number of tokens of the returned text.
+        language: The transcript language code, "en" by default.
+    """
+    return chunk_transcript(fetch_transcript(video_id, language), token_budget=token_budget)
@@ -0,0 +1,147 @@
+import json
+from array import array
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+
+
+def _format_clock(seconds: float) -> str:
+    return f"{int(seconds // 60)}:{int(seconds % 60):02d}"
+
+
+class SnippetView:
+    """
+    Read-only view of one transcript row. Nothing is copied or formatted until an
+    attribute is accessed.
+    """
+
+    __slots__ = ("_transcript", "_index")
+
+    def __init__(self, transcript: "Transcript", index: int):
+        self._transcript = transcript
+        self._index = index
+
+    @property
+    def text(self) -> str:
+        return self._transcript.texts[self._index]
+
+    @property
+    def start_time(self) -> float:
+        return self._transcript.starts[self._index]
+
+    @property
+    def duration(self) -> float:
+        return self._transcript.durations[self._index]
+
+    @property
+    def end_time(self) -> float:
+        return self.start_time + self.duration
+
+    @property
+    def timestamp(self) -> str:
+        return _format_clock(self.start_time)
+
+    @property
+    def time_range(self) -> str:
+        return f"{_format_clock(self.start_time)} - {_format_clock(self.end_time)}"
+
+    def to_dict(self) -> dict:
+        """
+        The legacy per-snippet dict, for callers that still expect it.
+        """
+        return {
+            "text": self.text,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "duration": self.duration,
+            "timestamp": self.timestamp,
+            "time_range": self.time_range,
+        }
+
+    def __repr__(self) -> str:
+        return f"SnippetView({self.time_range!r}, {self.text!r})"
+
+
+class Transcript:
+    """
+    Columnar transcript: start/duration in parallel `array('d')` columns plus a text column.
+
+    Compared to a list of per-snippet dicts this keeps one float per value instead of a
+    dict with six boxed entries and two preformatted strings, and serializes to three
+    flat JSON arrays.
+    """
+
+    __slots__ = ("starts", "durations", "texts")
+
+    def __init__(
+        self,
+        starts: Optional[Iterable[float]] = None,
+        durations: Optional[Iterable[float]] = None,
+        texts: Optional[Iterable[str]] = None,
+    ):
+        # `is not None` rather than `or`: numpy arrays have no truth value
+        self.starts = array("d", starts if starts is not None else [])
+        self.durations = array("d", durations if durations is not None else [])
+        self.texts: List[str] = list(texts if texts is not None else [])
+        if not len(self.starts) == len(self.durations) == len(self.texts):
+            raise ValueError("Transcript columns must have the same length.")
+
+    @classmethod
+    def from_snippets(cls, snippets: Iterable[dict]) -> "Transcript":
+        """
+        Builds a transcript from raw {"text", "start", "duration"} snippets.
+        """
+        transcript = cls()
+        for snippet in snippets:
+            transcript.starts.append(snippet["start"])
+            transcript.durations.append(snippet["duration"])
+            transcript.texts.append(snippet["text"].strip())
+        return transcript
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __getitem__(self, index: int) -> SnippetView:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transcript index out of range")
+        return SnippetView(self, index)
+
+    def __iter__(self) -> Iterator[SnippetView]:
+        for index in range(len(self)):
+            yield SnippetView(self, index)
+
+    @property
+    def duration(self) -> float:
+        if not len(self):
+            return 0.0
+        return self.starts[-1] + self.durations[-1]
+
+    def as_numpy(self):
+        """
+        Zero-copy NumPy views of the (starts, durations) columns.
+        """
+        return np.frombuffer(self.starts, dtype=np.float64), np.frombuffer(self.durations, dtype=np.float64)
+
+    def to_dict(self) -> dict:
+        """
+        Compact columnar form used as the tool result and in session state.
+        Times are rounded to milliseconds.
+        """
+        return {
+            "start": [round(value, 3) for value in self.starts],
+            "duration": [round(value, 3) for value in self.durations],
+            "text": self.texts,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Transcript":
+        return cls(data["start"], data["duration"], data["text"])
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, payload: str) -> "Transcript":
+        return cls.from_dict(json.loads(payload))
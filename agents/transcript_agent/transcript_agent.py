@@ -1,44 +1,74 @@
-from google.adk.agents import Agent
-
-from .tools import youtube_transcript
-
-TRANSCRIPTION_PROMPT = """
-You are a transcription agent that processes YouTube video transcripts.
-
-CRITICAL INSTRUCTION: You MUST ONLY use the `youtube_transcript` tool that has been provided to you. Do NOT attempt to use any other tools, functions, or methods for transcript extraction.
-
-Your task is to:
-1. Take the raw youtube link URL and extract the video ID.
-2. **MANDATORY**: Use ONLY the `youtube_transcript` tool with the video ID to extract the transcript from the video.
-3. Take the raw transcript data with timestamps
-4. Clean up and format the text for better readability
-5. Combine broken sentences and fragments into coherent paragraphs
-6. Preserve important timestamp information
-7. Return a well-formatted transcript with timestamps
-
-IMPORTANT RULES:
-- NEVER use web search, web scraping, or any other method to get transcripts
-- NEVER try to find alternative tools or methods
-- ALWAYS and ONLY use the provided `youtube_transcript` tool
-- If the `youtube_transcript` tool fails, report the error - do not try other methods
-- The `youtube_transcript` tool is the ONLY authorized way to extract transcripts
-
-WORKFLOW:
-1. Extract video ID from the YouTube URL
-2. Call `youtube_transcript` tool with the video ID
-3. Process the returned transcript data
-4. Format the output with timestamps at logical paragraph breaks
-
-Format your output as a clean, readable transcript with timestamps at logical paragraph breaks.
-
-Remember: You have ONE tool available - `youtube_transcript`. Use it and only it.
-"""
-
-transcription_agent = Agent(
-    name="transcription_agent",
-    model="gemini-2.5-flash",
-    description="Transcription agent that converts broken down sentences into a combined text with timestamp using ONLY the youtube_transcript tool.",
-    instruction=TRANSCRIPTION_PROMPT,
-    tools=[youtube_transcript],
-    output_key="transcription_output"
-)
\ No newline at end of file
+import asyncio
+import os
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from ..url_parser_agent.tools import find_video_id
+from ..segmentation_agent.prescorer import shortlist_text
+from ..video_editor_agent.tools import stored_audio_energy
+from .tools import TRANSCRIPT_TOKEN_BUDGET, condensed_transcript, fetch_transcript
+
+
+def _resolve_video_id(ctx: InvocationContext) -> Optional[str]:
+    """
+    Reads the video ID written by the url parser stage, falling back to the user's message.
+    """
+    parsed = ctx.session.state.get("parsed_video_id")
+    if isinstance(parsed, str):
+        video_id = find_video_id(parsed)
+        if video_id:
+            return video_id
+    if ctx.user_content and ctx.user_content.parts:
+        return find_video_id(" ".join(part.text for part in ctx.user_content.parts if part.text))
+    return None
+
+
+class TranscriptChunkerAgent(BaseAgent):
+    """
+    Deterministic replacement for the LLM transcription step: fetches the transcript and
+    merges it into timestamped paragraphs locally, so the segmentation LLM only reads the
+    condensed text. Writes the result to the 'transcription_output' state key.
+
+    With `top_k` above 0 the transcript is pre-scored locally and only the `top_k`
+    candidate windows are passed on, one blank-line separated block each.
+    """
+
+    top_k: int = 0
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        video_id = _resolve_video_id(ctx)
+        if not video_id:
+            text = "Error: could not find a YouTube video ID in the request."
+        else:
+            try:
+                # Off the event loop, so a download running in parallel keeps making progress
+                if self.top_k > 0:
+                    transcript = await asyncio.to_thread(fetch_transcript, video_id)
+                    # Loudness only helps when the video was downloaded before
+                    energy = await asyncio.to_thread(stored_audio_energy, video_id)
+                    text = shortlist_text(
+                        transcript, top_k=self.top_k, token_budget=TRANSCRIPT_TOKEN_BUDGET, audio_energy=energy,
+                    )
+                else:
+                    text = await asyncio.to_thread(condensed_transcript, video_id)
+            except Exception as e:
+                text = f"Error: failed to fetch the transcript for {video_id}: {e}"
+
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=EventActions(state_delta={"transcription_output": text}),
+        )
+
+
+transcript_chunker_agent = TranscriptChunkerAgent(
+    name="transcript_chunker_agent",
+    description="Fetches the transcript and condenses it into timestamped paragraphs without an LLM call.",
+    top_k=int(os.environ.get("SEGMENTATION_PRESCORE_TOP_K", 0)),
+)
@@ -1 +1 @@
-from . import url_parser_agent
\ No newline at end of file
+from . import url_parser_stage
\ No newline at end of file
@@ -1,29 +1,63 @@
+import re
 from urllib.parse import urlparse, parse_qs
 
+VIDEO_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{11}$")
+URL_PATTERN = re.compile(r"(?:https?://)?(?:[\w-]+\.)*(?:youtube(?:-nocookie)?\.com|youtu\.be)/\S+", re.IGNORECASE)
+PATH_PREFIXES = ('/embed/', '/shorts/', '/live/', '/v/', '/e/')
+
 def extract_video_id(url: str) -> str | None:
     """Extracts the video ID from a YouTube URL.
+    Supports watch, embed, shorts, live and youtu.be links on youtube.com, m.youtube.com,
+    music.youtube.com and youtube-nocookie.com, with or without a scheme, and ignores
+    extra parameters such as timestamps (t=) and playlists (list=).
     Args:
         url (str): The YouTube URL.
     Returns:
         str: The video ID, or None if the URL is invalid or doesn't contain a video ID.
     """
     try:
+        # Brackets, quotes and sentence punctuation around a link pasted into a message
+        url = url.strip().strip('<>()[]"\',.;:!?')
+        if '://' not in url:
+            url = f"https://{url}"
         parsed_url = urlparse(url)
-        youtube_domains = ['youtube.com', 'www.youtube.com', 'm.youtube.com', 'youtu.be']
-        if parsed_url.netloc not in youtube_domains and \
-           not any(domain in parsed_url.netloc for domain in ['youtube.com', 'youtu.be']):
+        host = (parsed_url.hostname or '').lower()
+        if host not in ('youtu.be', 'youtube.com', 'youtube-nocookie.com') and \
+           not host.endswith(('.youtube.com', '.youtube-nocookie.com')):
             return None
 
-        if parsed_url.path == '/watch':
+        video_id = None
+        path = parsed_url.path.rstrip('/')
+        if host == 'youtu.be':
+            video_id = path.lstrip('/').split('/')[0]
+        elif path == '/watch':
             query_params = parse_qs(parsed_url.query)
             if 'v' in query_params:
-                return query_params['v'][0]
-        elif parsed_url.path.startswith('/embed/') or parsed_url.path.startswith('/shorts/'):
-            return parsed_url.path.split('/')[-1]
-        elif parsed_url.netloc == 'youtu.be':
-            return parsed_url.path[1:]
+                video_id = query_params['v'][0]
+        elif path.startswith(PATH_PREFIXES):
+            video_id = path.split('/')[2]
+
+        if video_id and VIDEO_ID_PATTERN.match(video_id):
+            return video_id
 
     except Exception:
         return None
 
-    return None
\ No newline at end of file
+    return None
+
+def find_video_id(text: str) -> str | None:
+    """Finds the first YouTube video ID in free text (e.g. a chat message containing a URL).
+    A bare 11-character video ID is accepted as well.
+    Args:
+        text (str): The text to search.
+    Returns:
+        str: The video ID, or None if no YouTube video link is found.
+    """
+    for match in URL_PATTERN.finditer(text or ''):
+        video_id = extract_video_id(match.group(0))
+        if video_id:
+            return video_id
+    stripped = (text or '').strip()
+    if VIDEO_ID_PATTERN.match(stripped):
+        return stripped
+    return None
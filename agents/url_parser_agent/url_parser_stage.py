@@ -0,0 +1,46 @@
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from .tools import find_video_id
+
+
+class UrlParserStage(BaseAgent):
+    """
+    Deterministic URL parsing stage: extracts the video ID from the user's message with
+    plain code and writes it to the 'parsed_video_id' state key, with no LLM round-trip.
+    Ends the invocation when the message contains no YouTube video link.
+    """
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        text = ""
+        if ctx.user_content and ctx.user_content.parts:
+            text = " ".join(part.text for part in ctx.user_content.parts if part.text)
+        video_id = find_video_id(text)
+
+        if video_id is None:
+            ctx.end_invocation = True
+            yield Event(
+                author=self.name,
+                invocation_id=ctx.invocation_id,
+                branch=ctx.branch,
+                content=types.Content(role="model", parts=[types.Part(text="Error: no YouTube video link found in the request.")]),
+            )
+            return
+
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=video_id)]),
+            actions=EventActions(state_delta={"parsed_video_id": video_id}),
+        )
+
+
+url_parser_stage = UrlParserStage(
+    name="url_parser_stage",
+    description="Extracts the YouTube video ID from the request URL without an LLM call.",
+)
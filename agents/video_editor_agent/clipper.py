@@ -0,0 +1,353 @@
+import bisect
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import av
+from pydantic import BaseModel
+
+from ..tool_runtime import check_cancelled, report_progress, run_process
+
+
+class ClipJob(BaseModel):
+    index: int
+    topic: str
+    start: float
+    end: float
+    output_path: str
+    # Extra filter chain applied to the clip's video in the same encode (e.g. reframing)
+    video_filter: Optional[str] = None
+
+
+def clip_metadata_path(clip_path: str) -> str:
+    return f"{os.path.splitext(clip_path)[0]}.clip.json"
+
+
+def write_clip_metadata(job: ClipJob, video_path: str, job_id: Optional[str] = None) -> str:
+    """
+    Writes a sidecar next to the clip recording its source file, offsets in seconds and
+    the job manifest it is checkpointed in.
+    """
+    path = clip_metadata_path(job.output_path)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "source": os.path.abspath(video_path),
+            "start": job.start,
+            "end": job.end,
+            "topic": job.topic,
+            "job": job_id,
+        }, f)
+    return path
+
+
+def read_clip_metadata(clip_path: str) -> Optional[dict]:
+    """
+    Returns the sidecar written by `write_clip_metadata`, or None if the clip has none.
+    """
+    path = clip_metadata_path(clip_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def find_ffmpeg() -> Optional[str]:
+    """
+    Locates a working ffmpeg binary, falling back to the one bundled with imageio-ffmpeg.
+    """
+    candidates = ['ffmpeg', 'C:\\ffmpeg\\bin\\ffmpeg.exe', '/usr/bin/ffmpeg', '/usr/local/bin/ffmpeg']
+    try:
+        import imageio_ffmpeg
+        candidates.append(imageio_ffmpeg.get_ffmpeg_exe())
+    except Exception:
+        pass
+
+    for path in candidates:
+        try:
+            subprocess.run([path, "-version"], capture_output=True, timeout=5, check=True)
+            return path
+        except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
+            continue
+    return None
+
+
+def probe_media(video_path: str) -> dict:
+    """
+    Reads the container duration and stream layout with PyAV without decoding any frames.
+    Returns:
+        dict: {"duration": float, "has_audio": bool, "video_codec": str | None,
+               "width": int | None, "height": int | None}
+    """
+    with av.open(video_path) as container:
+        duration = None
+        if container.duration is not None:
+            duration = container.duration / av.time_base
+        elif container.streams.video and container.streams.video[0].duration is not None:
+            stream = container.streams.video[0]
+            duration = float(stream.duration * stream.time_base)
+        if duration is None:
+            raise ValueError(f"Could not determine duration of {video_path}")
+        video = container.streams.video[0].codec_context if container.streams.video else None
+        return {
+            "duration": duration,
+            "has_audio": len(container.streams.audio) > 0,
+            "video_codec": video.name if video else None,
+            "width": video.width if video else None,
+            "height": video.height if video else None,
+        }
+
+
+def probe_keyframes(video_path: str) -> List[float]:
+    """
+    Returns the sorted keyframe timestamps (seconds) of the first video stream.
+    Only packets are demuxed, nothing is decoded. Results are cached per file version.
+    """
+    stat = os.stat(video_path)
+    return list(_probe_keyframes_cached(os.path.abspath(video_path), stat.st_mtime_ns, stat.st_size))
+
+
+@lru_cache(maxsize=16)
+def _probe_keyframes_cached(video_path: str, mtime_ns: int, size: int) -> Tuple[float, ...]:
+    keyframes = []
+    with av.open(video_path) as container:
+        stream = container.streams.video[0]
+        for packet in container.demux(stream):
+            if packet.is_keyframe and packet.pts is not None:
+                keyframes.append(float(packet.pts * stream.time_base))
+    keyframes.sort()
+    return tuple(keyframes)
+
+
+def snap_to_keyframe(keyframes: List[float], t: float) -> float:
+    """
+    Returns the nearest keyframe at or before `t` (or 0.0 when there is none).
+    """
+    idx = bisect.bisect_right(keyframes, t + 1e-6) - 1
+    return keyframes[idx] if idx >= 0 else 0.0
+
+
+def next_keyframe(keyframes: List[float], t: float) -> Optional[float]:
+    """
+    Returns the first keyframe at or after `t`, or None past the last keyframe.
+    """
+    idx = bisect.bisect_left(keyframes, t - 1e-6)
+    return keyframes[idx] if idx < len(keyframes) else None
+
+
+def plan_smart_cut(keyframes: List[float], start: float, end: float) -> Tuple[str, Optional[float]]:
+    """
+    Decides how a frame-accurate cut of [start, end) is made from the keyframe list.
+    Returns:
+        tuple: ("copy", None) when `start` is a keyframe, ("encode", None) when the clip
+        sits inside one GOP, else ("split", boundary): re-encode up to the next keyframe
+        `boundary` and stream-copy from there.
+    """
+    # A keyframe less than a millisecond from the start, on either side, counts as on it
+    boundary = next_keyframe(keyframes, start - 1e-3)
+    if boundary is not None and boundary - start < 1e-3:
+        return "copy", None
+    if boundary is None or boundary >= end:
+        return "encode", None
+    return "split", boundary
+
+
+def build_single_pass_command(ffmpeg: str, video_path: str, jobs: List[ClipJob], has_audio: bool, threads: int = 0) -> list:
+    """
+    Builds one ffmpeg command that encodes every clip. Each clip is opened as its own
+    input, seeked to its start and bounded by its length, so only the clip ranges are
+    decoded and every encoder is fed by its own decoder.
+
+    (A single decode fanned out with split/trim has no backpressure between the outputs:
+    decoded frames pile up in memory faster than the encoders drain them, several GB for
+    a handful of 1080x1920 clips.)
+    `threads` caps libx264 threads per output (0 lets ffmpeg decide).
+    """
+    cmd = [ffmpeg, '-hide_banner', '-loglevel', 'error']
+    for job in jobs:
+        cmd += ['-ss', f"{job.start:.3f}", '-t', f"{job.end - job.start:.3f}", '-i', video_path]
+
+    graph = []
+    for n, job in enumerate(jobs):
+        if job.video_filter:
+            graph.append(f"[{n}:v:0]setpts=PTS-STARTPTS,{job.video_filter}[vout{n}]")
+    if graph:
+        cmd += ['-filter_complex', ";".join(graph)]
+
+    for n, job in enumerate(jobs):
+        cmd += ['-map', f"[vout{n}]" if job.video_filter else f"{n}:v:0"]
+        if has_audio:
+            cmd += ['-map', f"{n}:a:0", '-c:a', 'aac']
+        cmd += ['-c:v', 'libx264']
+        if threads:
+            cmd += ['-threads', str(threads)]
+        cmd += ['-y', job.output_path]
+    return cmd
+
+
+def cut_segments(ffmpeg: str, video_path: str, jobs: List[ClipJob], has_audio: bool, threads: int = 0) -> List[str]:
+    """
+    Cuts every clip in `jobs` with a single ffmpeg invocation: one process with one
+    seeked input per clip, not one demux pass shared by all clips.
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg exits with a non-zero status.
+    """
+    if not jobs:
+        return []
+    cmd = build_single_pass_command(ffmpeg, video_path, jobs, has_audio, threads)
+    run_process(cmd)
+    missing = [job.output_path for job in jobs if not os.path.exists(job.output_path)]
+    if missing:
+        raise RuntimeError(f"ffmpeg finished without writing: {missing}")
+    return [job.output_path for job in jobs]
+
+
+def build_copy_command(ffmpeg: str, video_path: str, jobs: List[ClipJob]) -> list:
+    """
+    Builds one ffmpeg command that stream-copies every clip. Each clip is opened as its
+    own input seeked to its (keyframe-aligned) start so no frame is decoded.
+    """
+    cmd = [ffmpeg, '-hide_banner', '-loglevel', 'error']
+    for job in jobs:
+        cmd += ['-ss', f"{job.start:.3f}", '-t', f"{job.end - job.start:.3f}", '-i', video_path]
+    for n, job in enumerate(jobs):
+        cmd += [
+            '-map', f"{n}:v:0", '-map', f"{n}:a?",
+            '-c', 'copy', '-avoid_negative_ts', 'make_zero',
+            '-y', job.output_path,
+        ]
+    return cmd
+
+
+def copy_segments(ffmpeg: str, video_path: str, jobs: List[ClipJob], keyframes: Optional[List[float]] = None) -> List[str]:
+    """
+    Stream-copies every clip in `jobs`. Clip starts are snapped to the preceding keyframe,
+    which the caller's padding absorbs.
+    """
+    if not jobs:
+        return []
+    if keyframes is None:
+        keyframes = probe_keyframes(video_path)
+    snapped = [job.model_copy(update={"start": snap_to_keyframe(keyframes, job.start)}) for job in jobs]
+    run_process(build_copy_command(ffmpeg, video_path, snapped))
+    return [job.output_path for job in jobs]
+
+
+def smart_cut_segment(ffmpeg: str, video_path: str, job: ClipJob, keyframes: List[float], has_audio: bool) -> str:
+    """
+    Frame-accurate cut that only re-encodes the GOP head between the exact start and the
+    next keyframe, stream-copies the rest and joins both with the concat demuxer.
+    Audio is re-encoded in both parts so the codec parameters line up at the join.
+    """
+    plan, boundary = plan_smart_cut(keyframes, job.start, job.end)
+    if plan == "copy":
+        copy_segments(ffmpeg, video_path, [job], keyframes)
+        return job.output_path
+    if plan == "encode":
+        # The whole clip sits inside one GOP: nothing to copy, encode it directly
+        cut_segments(ffmpeg, video_path, [job], has_audio)
+        return job.output_path
+
+    audio_args = ['-map', '0:a?', '-c:a', 'aac']
+    work_dir = tempfile.mkdtemp(prefix="smartcut_", dir=os.path.dirname(job.output_path) or None)
+    try:
+        head_path = os.path.join(work_dir, "head.mp4")
+        tail_path = os.path.join(work_dir, "tail.mp4")
+        list_path = os.path.join(work_dir, "parts.txt")
+
+        run_process([
+            ffmpeg, '-hide_banner', '-loglevel', 'error',
+            '-ss', f"{job.start:.3f}", '-t', f"{boundary - job.start:.3f}", '-i', video_path,
+            '-map', '0:v:0', '-c:v', 'libx264', *audio_args, '-y', head_path,
+        ])
+        run_process([
+            ffmpeg, '-hide_banner', '-loglevel', 'error',
+            '-ss', f"{boundary:.3f}", '-t', f"{job.end - boundary:.3f}", '-i', video_path,
+            '-map', '0:v:0', '-c:v', 'copy', *audio_args,
+            '-avoid_negative_ts', 'make_zero', '-y', tail_path,
+        ])
+
+        with open(list_path, "w", encoding="utf-8") as f:
+            f.write(f"file '{head_path}'\nfile '{tail_path}'\n")
+        run_process([
+            ffmpeg, '-hide_banner', '-loglevel', 'error',
+            '-f', 'concat', '-safe', '0', '-i', list_path,
+            '-c', 'copy', '-y', job.output_path,
+        ])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return job.output_path
+
+
+def render_clip(
+    ffmpeg: str,
+    video_path: str,
+    job: ClipJob,
+    has_audio: bool,
+    mode: str = "encode",
+    frame_accurate: bool = False,
+    keyframes: Optional[List[float]] = None,
+    threads: int = 0,
+) -> str:
+    """
+    Produces a single clip with its own ffmpeg process. This is the unit of work
+    dispatched to the worker threads of `run_clip_jobs`.
+    """
+    if mode == "copy":
+        if keyframes is None:
+            keyframes = probe_keyframes(video_path)
+        if frame_accurate:
+            return smart_cut_segment(ffmpeg, video_path, job, keyframes, has_audio)
+        copy_segments(ffmpeg, video_path, [job], keyframes)
+        return job.output_path
+    cut_segments(ffmpeg, video_path, [job], has_audio, threads)
+    return job.output_path
+
+
+def run_clip_jobs(
+    ffmpeg: str,
+    video_path: str,
+    jobs: List[ClipJob],
+    has_audio: bool,
+    max_workers: int,
+    **options,
+) -> List[Tuple[ClipJob, Optional[str], Optional[str]]]:
+    """
+    Renders clips concurrently, at most `max_workers` ffmpeg processes at a time. Every
+    clip is its own ffmpeg process, so a thread per running clip is enough, and the
+    processes stay visible to the async tool runtime, which can cancel them.
+    Returns:
+        list: One (job, output_path, error) tuple per job, in the same order as `jobs`.
+              Exactly one of output_path and error is set, so a failing clip never
+              discards the ones that finished.
+    """
+    outcomes = []
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="clip") as pool:
+        futures = [
+            pool.submit(contextvars.copy_context().run, render_clip, ffmpeg, video_path, job, has_audio, **options)
+            for job in jobs
+        ]
+        try:
+            for done, (job, future) in enumerate(zip(jobs, futures), start=1):
+                try:
+                    outcomes.append((job, future.result(), None))
+                except subprocess.CalledProcessError as err:
+                    stderr = err.stderr.decode(errors='replace') if err.stderr else str(err)
+                    outcomes.append((job, None, stderr))
+                except Exception as err:
+                    outcomes.append((job, None, str(err)))
+                report_progress(f"rendered {done}/{len(jobs)} clips", force=True, done=done, total=len(jobs))
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    check_cancelled()
+    return outcomes
@@ -0,0 +1,72 @@
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from ..segmentation_agent.windowed import parse_candidates
+from ..url_parser_agent.tools import find_video_id
+from .tools import download_video_async, download_video_ranges_async
+
+
+class VideoDownloadStage(BaseAgent):
+    """
+    Deterministic download stage: downloads the video named by the 'parsed_video_id' state
+    key with yt-dlp and writes the file path to the 'video_data' state key.
+
+    The download only needs the video ID, so this stage runs next to the transcript and
+    segmentation stages instead of after them. The download itself runs on the download
+    tool's executor so it does not block the other branch. Failures are written to
+    'video_download_error' instead of ending the invocation.
+
+    With `ranged` set, only the padded segment windows from the 'segments' state key are
+    downloaded and 'video_data' holds the fragment index instead. That needs the
+    segments, so a ranged stage has to run after segmentation rather than next to it.
+    """
+
+    ranged: bool = False
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        video_id = find_video_id(str(ctx.session.state.get("parsed_video_id", "")))
+        state_delta = {}
+        if not video_id:
+            text = "Error: could not find a YouTube video ID to download."
+            state_delta["video_download_error"] = text
+        else:
+            try:
+                if self.ranged:
+                    segments = [
+                        {k: v for k, v in candidate.items() if not k.startswith("_")}
+                        for candidate in parse_candidates(str(ctx.session.state.get("segments", "")))
+                    ]
+                    if not segments:
+                        raise ValueError("no segments to download")
+                    path = await download_video_ranges_async(video_id, segments)
+                else:
+                    path = await download_video_async(video_id)
+                text = path
+                state_delta["video_data"] = path
+            except Exception as e:
+                text = f"Error: failed to download {video_id}: {e}"
+                state_delta["video_download_error"] = text
+
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=EventActions(state_delta=state_delta),
+        )
+
+
+video_download_stage = VideoDownloadStage(
+    name="video_download_stage",
+    description="Downloads the source video with yt-dlp without an LLM call.",
+)
+
+ranged_video_download_stage = VideoDownloadStage(
+    name="ranged_video_download_stage",
+    description="Downloads only the segment time ranges of the source video.",
+    ranged=True,
+)
@@ -0,0 +1,169 @@
+import math
+import os
+import re
+from typing import Callable, Iterator, List, Optional
+
+from pydantic import BaseModel
+
+# Codecs the clipper can stream-copy into mp4 (and smart-cut, for H.264)
+COPYABLE_VIDEO_CODECS = ("avc1", "h264")
+COPYABLE_AUDIO_CODECS = ("mp4a", "aac")
+
+PROFILE_PATTERN = re.compile(r"^(\d+)x(\d+)(?:@(\d+(?:\.\d+)?))?$")
+
+
+class OutputProfile(BaseModel):
+    """
+    Target spec of the generated shorts.
+
+    `fit` is how a landscape source ends up in the frame: "crop" cuts a full-height
+    vertical slice (so the source height is what matters), "pad" scales the whole
+    frame to the output width. `max_upscale` is how much the source may be scaled up
+    to reach the target.
+    """
+    width: int = 1080
+    height: int = 1920
+    fps: float = 30.0
+    fit: str = "crop"
+    max_upscale: float = 2.0
+
+    @classmethod
+    def parse(cls, spec: str, **options) -> "OutputProfile":
+        """
+        Parses "WIDTHxHEIGHT" or "WIDTHxHEIGHT@FPS", e.g. "1080x1920@30".
+        """
+        match = PROFILE_PATTERN.match(spec.strip())
+        if not match:
+            raise ValueError(f"Invalid output profile: {spec!r}. Expected e.g. '1080x1920@30'.")
+        width, height, fps = match.groups()
+        return cls(width=int(width), height=int(height), fps=float(fps or 30), **options)
+
+    @classmethod
+    def from_env(cls) -> "OutputProfile":
+        return cls.parse(
+            os.environ.get("SHORT_PROFILE", "1080x1920@30"),
+            fit=os.environ.get("SHORT_FIT", "crop"),
+            max_upscale=float(os.environ.get("SHORT_MAX_UPSCALE", 2.0)),
+        )
+
+    @property
+    def key(self) -> str:
+        """
+        Stable identifier, used as the media store format key.
+        """
+        return f"profile={self.width}x{self.height}@{self.fps:g}/{self.fit}/x{self.max_upscale:g}"
+
+    def required_source_height(self) -> int:
+        """
+        Smallest source short side (height of a landscape video) that meets the profile.
+        """
+        if self.fit == "crop":
+            needed = max(self.width, self.height)
+        else:
+            needed = self.width * 9 / 16
+        return math.ceil(needed / max(self.max_upscale, 1.0))
+
+
+def _short_side(fmt: dict) -> int:
+    width, height = fmt.get("width") or 0, fmt.get("height") or 0
+    if width and height:
+        return min(width, height)
+    return height or width
+
+
+def _size(fmt: dict) -> float:
+    size = fmt.get("filesize") or fmt.get("filesize_approx")
+    if size:
+        return float(size)
+    # Bitrate in kbit/s is a fine stand-in for comparing sizes of the same video
+    return float(fmt.get("tbr") or fmt.get("vbr") or fmt.get("abr") or 0) * 1e6
+
+
+def _is_copyable(codec: Optional[str], codecs) -> bool:
+    return bool(codec) and codec.split(".")[0].lower() in codecs
+
+
+def _video_rank(fmt: dict, profile: OutputProfile, required_height: int) -> tuple:
+    fps = fmt.get("fps") or profile.fps
+    return (
+        0 if _short_side(fmt) >= required_height else 1,
+        0 if _is_copyable(fmt.get("vcodec"), COPYABLE_VIDEO_CODECS) else 1,
+        0 if fps >= profile.fps - 0.5 else 1,           # Too few frames per second
+        fps > profile.fps * 1.5,                        # 60 fps doubles decode work for nothing
+        # Among streams that meet the spec the smallest wins, otherwise the largest
+        _short_side(fmt) if _short_side(fmt) >= required_height else -_short_side(fmt),
+        _size(fmt),
+    )
+
+
+def _audio_rank(fmt: dict) -> tuple:
+    abr = fmt.get("abr") or fmt.get("tbr") or 0
+    return (
+        0 if _is_copyable(fmt.get("acodec"), COPYABLE_AUDIO_CODECS) else 1,
+        0 if abr >= 96 else 1,                          # Enough for speech and music
+        abr,
+    )
+
+
+def select_formats(formats: List[dict], profile: OutputProfile, allow_merge: bool = True) -> List[dict]:
+    """
+    Picks the cheapest download that still meets `profile`.
+
+    With `allow_merge` (ffmpeg available) a separate video-only and audio-only stream are
+    preferred, since those come in far more sizes than the muxed ones. Streams that can
+    be stream-copied into mp4 (H.264/AAC) win over VP9/AV1/Opus.
+    Returns:
+        list: [video, audio] formats to merge, or [muxed] for a single format.
+    """
+    required_height = profile.required_source_height()
+    video_only = [f for f in formats if f.get("vcodec") not in (None, "none") and f.get("acodec") == "none"]
+    audio_only = [f for f in formats if f.get("acodec") not in (None, "none") and f.get("vcodec") == "none"]
+    muxed = [f for f in formats if f.get("vcodec") not in (None, "none") and f.get("acodec") not in (None, "none")]
+
+    def rank(fmt):
+        return _video_rank(fmt, profile, required_height)
+
+    best_muxed = min(muxed, key=rank) if muxed else None
+    if allow_merge and video_only and audio_only:
+        video = min(video_only, key=rank)
+        # A muxed stream that is just as good saves the merge step (sizes are not
+        # comparable here, the muxed one includes audio)
+        if best_muxed is None or rank(video)[:5] < rank(best_muxed)[:5]:
+            return [video, min(audio_only, key=_audio_rank)]
+    if best_muxed is not None:
+        return [best_muxed]
+    if video_only:
+        return [min(video_only, key=rank)]
+    raise ValueError("No downloadable video format found.")
+
+
+def format_selector(profile: OutputProfile, allow_merge: bool = True) -> Callable[[dict], Iterator[dict]]:
+    """
+    yt-dlp `format` option that downloads what select_formats picks.
+    """
+
+    def selector(ctx: dict) -> Iterator[dict]:
+        chosen = select_formats(ctx.get("formats") or [], profile, allow_merge)
+        if len(chosen) == 1:
+            yield chosen[0]
+            return
+        video, audio = chosen
+        copyable = _is_copyable(video.get("vcodec"), COPYABLE_VIDEO_CODECS) and _is_copyable(audio.get("acodec"), COPYABLE_AUDIO_CODECS)
+        yield {
+            "format_id": f"{video['format_id']}+{audio['format_id']}",
+            "ext": "mp4" if copyable else "mkv",
+            "requested_formats": [video, audio],
+            "protocol": f"{video.get('protocol')}+{audio.get('protocol')}",
+        }
+
+    return selector
+
+
+def describe_formats(formats: List[dict]) -> str:
+    parts = []
+    for fmt in formats:
+        if fmt.get("vcodec") not in (None, "none"):
+            parts.append(f"{fmt.get('format_id')} {fmt.get('width')}x{fmt.get('height')}@{fmt.get('fps')} {fmt.get('vcodec')}")
+        else:
+            parts.append(f"{fmt.get('format_id')} {fmt.get('acodec')} {fmt.get('abr')}k")
+    return " + ".join(parts)
@@ -3,13 +3,13 @@ Use the download_video tool to fetch a YouTube video by its video_id.
 
 Instructions:
 - The video_id is an 11-character string extracted from YouTube URLs (e.g., "OAWl6F_9HJ8")
-- The video_id can be obtained from the output of the url_parser_agent
-- The tool downloads the highest resolution MP4 format available
-- Provide the video_id (required) and optional output_path (defaults to "downloads")
-- The tool creates the output directory if it doesn't exist
+- The video_id is the parsed_video_id written to session state by the URL parser stage
+- The tool downloads the smallest format that still meets the shorts' output profile (e.g. 1080x1920 at 30 fps)
+- Provide the video_id (required)
+- Videos are kept in a local media store, so a video downloaded before is reused instead of fetched again
 - Returns the full file path of the downloaded video for further processing
 - Don't ask for permission, just download the video.
-- Don't ask for download path, download it to 'downloads' folder.
+- Don't ask for a download path.
 
 Error handling:
 - If download fails, the tool will raise an exception with details
@@ -18,8 +18,7 @@ Error handling:
 
 Example usage:
 - video_id: "OAWl6F_9HJ8" 
-- output_path: "downloads" (optional)
-- Returns: "downloads/"Video_Title".mp4"
+- Returns: ".cache/media/OAWl6F_9HJ8/<format>/"Video_Title".mp4"
 """
 
 CLIPPING_PROMPT = """
@@ -33,7 +32,10 @@ You MUST use the `split_video()` function to extract clips from the downloaded v
 This function is robust and includes:
 - Time validation
 - Filename sanitization
-- Fallback to FFmpeg if MoviePy fails
+- Cutting every clip in one FFmpeg process (one seeked input per clip) with a MoviePy fallback
+- An optional `mode="copy"` that stream-copies clips from the nearest keyframe (add `frame_accurate=True` to keep exact starts)
+- Vertical 9:16 reframing that follows the speaker, applied in the same encode (off by default; pass `reframe=True` only when the user asks for vertical/9:16 shorts; not available with `mode="copy"`)
+- Optional burned-in captions (`burn_subtitles=True`, with `word_highlight=True` for word-by-word highlighting), rendered in the same encode; a matching .srt is written next to each clip
 
 ## CRITICAL INSTRUCTIONS
 - You MUST extract only the requested short segments, NOT resize or alter the full video.
@@ -53,6 +55,8 @@ Before doing anything else:
 
 ### STEP 2: **INVOKE THE VIDEO SPLITTING TOOL**
 1. **ONLY IF ALL SEGMENTS ARE VALID**, you MUST generate a tool call to `split_video(segments)`.
+   The source video was downloaded to: {video_data?}
+   If that path is set, pass it as `video_path`; otherwise pass the 11-character YouTube ID as `video_id` and the tool looks the video up in the media store.
 2. This `split_video` tool call will return a list of file paths for the newly created video clips. You **MUST** wait for this tool's output.
 
 ### STEP 3: **PROCESS TOOL OUTPUT AND RETURN FINAL RESULT**
@@ -89,10 +93,14 @@ You are an intelligent video processing orchestrator. Your core responsibility i
 
 ---
 
-## STEP 1: DOWNLOAD VIDEO using 'video_download_agent'
+## STEP 1: DOWNLOAD VIDEO using 'video_download_agent' (only if needed)
 
-**Action:** **FIRST**, you MUST use the `video_download_agent` tool.
-**Goal:** Download the full YouTube video.
+The video is normally downloaded already, in parallel with transcription and segmentation.
+Downloaded video path: {video_data?}
+Download error, if any: {video_download_error?}
+
+**Action:** If the downloaded video path above is set, SKIP this step and use that path. Only if it is empty, use the `video_download_agent` tool.
+**Goal:** Have the full YouTube video on disk.
 **Input:** 
 - `video_id` (11-character string, e.g., "OAWl6F_9HJ8").
 
@@ -172,7 +180,7 @@ organized_videos/
 
 ## EXECUTION REQUIREMENTS:
 
-1. **Sequential Execution:** You MUST complete each step in order (1 → 2 → 3).
+1. **Sequential Execution:** You MUST complete each step in order (1 → 2 → 3), skipping Step 1 when the video is already downloaded.
 2. **Data Flow:** Step 1's output becomes Step 2's input, Step 2's output becomes Step 3's input.
 3. **Error Handling:** If any step fails, stop execution and report the error.
 4. **Validation:** Verify inputs and outputs at each step match expected formats.
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Callable, List, Optional
+
+from filelock import FileLock, Timeout
+
+ENTRY_FILE = "entry.json"
+
+
+def format_key(format_selector: str) -> str:
+    """
+    Short filesystem-safe key for a yt-dlp format selector (or any other variant string).
+    """
+    return hashlib.sha1(format_selector.encode("utf-8")).hexdigest()[:12]
+
+
+class MediaStore:
+    """
+    On-disk media store keyed by (video_id, format).
+
+    Every entry is a directory `<root>/<video_id>/<format_key>/` holding the downloaded
+    file(s) and an `entry.json`. Entries are built in a scratch directory and renamed into
+    place, so a crashed download never looks complete. A per-entry file lock makes
+    concurrent jobs (threads or processes) for the same entry share one download.
+
+    The store is kept under `quota_bytes` by evicting the least recently used entries
+    (the mtime of `entry.json` is bumped on every lookup). Entries locked by another job
+    are never evicted.
+    """
+
+    def __init__(self, root: str, quota_bytes: Optional[int] = 20 * 1024 ** 3, lock_timeout: float = 3600.0):
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self.lock_timeout = lock_timeout
+        os.makedirs(os.path.join(root, ".tmp"), exist_ok=True)
+        os.makedirs(os.path.join(root, ".locks"), exist_ok=True)
+
+    def _entry_dir(self, video_id: str, fmt: str) -> str:
+        return os.path.join(self.root, video_id, format_key(fmt))
+
+    def _lock(self, video_id: str, fmt: str) -> FileLock:
+        return FileLock(os.path.join(self.root, ".locks", f"{video_id}.{format_key(fmt)}.lock"), timeout=self.lock_timeout)
+
+    def _read_entry(self, entry_dir: str) -> Optional[dict]:
+        meta_path = os.path.join(entry_dir, ENTRY_FILE)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        path = os.path.join(entry_dir, entry["file"])
+        if not os.path.exists(path):
+            return None
+        entry["path"] = path
+        entry["dir"] = entry_dir
+        entry["accessed"] = os.path.getmtime(meta_path)
+        return entry
+
+    def lookup(self, video_id: str, fmt: str) -> Optional[str]:
+        """
+        Path of the stored media for (video_id, fmt), or None. Marks the entry as used.
+        """
+        entry_dir = self._entry_dir(video_id, fmt)
+        entry = self._read_entry(entry_dir)
+        if entry is None:
+            return None
+        os.utime(os.path.join(entry_dir, ENTRY_FILE))
+        return entry["path"]
+
+    def fetch(self, video_id: str, fmt: str, download: Callable[[str], str]) -> str:
+        """
+        Returns the stored media for (video_id, fmt), downloading it on a miss.
+
+        `download(scratch_dir)` must write everything into `scratch_dir` and return the
+        path of the main file. Only one job downloads a given entry; the others wait for
+        the lock and then get the stored copy.
+        """
+        path = self.lookup(video_id, fmt)
+        if path is not None:
+            return path
+
+        with self._lock(video_id, fmt):
+            path = self.lookup(video_id, fmt)
+            if path is not None:
+                return path
+
+            scratch = os.path.join(self.root, ".tmp", uuid.uuid4().hex)
+            os.makedirs(scratch)
+            try:
+                main_file = download(scratch)
+                size = sum(
+                    os.path.getsize(os.path.join(dirpath, name))
+                    for dirpath, _, names in os.walk(scratch)
+                    for name in names
+                )
+                entry = {
+                    "video_id": video_id,
+                    "format": fmt,
+                    "file": os.path.relpath(main_file, scratch),
+                    "size": size,
+                    "created": time.time(),
+                }
+                with open(os.path.join(scratch, ENTRY_FILE), "w", encoding="utf-8") as f:
+                    json.dump(entry, f, indent=2)
+
+                entry_dir = self._entry_dir(video_id, fmt)
+                if os.path.exists(entry_dir):
+                    # Leftover from an interrupted run (no valid entry.json, or lookup would have hit)
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+                os.rename(scratch, entry_dir)
+            except BaseException:
+                shutil.rmtree(scratch, ignore_errors=True)
+                raise
+
+        self.evict(keep=(video_id, fmt))
+        return os.path.join(entry_dir, entry["file"])
+
+    def entries(self) -> List[dict]:
+        """
+        All complete entries, least recently used first.
+        """
+        found = []
+        for video_id in os.listdir(self.root):
+            video_dir = os.path.join(self.root, video_id)
+            if video_id.startswith(".") or not os.path.isdir(video_dir):
+                continue
+            for key in os.listdir(video_dir):
+                entry = self._read_entry(os.path.join(video_dir, key))
+                if entry is not None:
+                    found.append(entry)
+        return sorted(found, key=lambda entry: entry["accessed"])
+
+    def evict(self, keep: Optional[tuple] = None) -> int:
+        """
+        Deletes least recently used entries until the store fits `quota_bytes`.
+        Returns:
+            int: Number of bytes freed.
+        """
+        if self.quota_bytes is None:
+            return 0
+        entries = self.entries()
+        total = sum(entry["size"] for entry in entries)
+        freed = 0
+        for entry in entries:
+            if total - freed <= self.quota_bytes:
+                break
+            if keep is not None and (entry["video_id"], entry["format"]) == tuple(keep):
+                continue
+            lock = self._lock(entry["video_id"], entry["format"])
+            try:
+                lock.acquire(timeout=0)
+            except Timeout:
+                continue
+            try:
+                shutil.rmtree(entry["dir"], ignore_errors=True)
+                try:
+                    os.rmdir(os.path.dirname(entry["dir"]))
+                except OSError:
+                    pass  # Other formats of the same video are still stored
+                freed += entry["size"]
+                print(f"Evicted {entry['video_id']} ({entry['size'] / 1024 ** 2:.1f} MB) from the media store.")
+            finally:
+                lock.release()
+        return freed
@@ -0,0 +1,128 @@
+import json
+import math
+import os
+from typing import Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+FRAGMENT_INDEX_SUFFIX = ".fragments.json"
+
+# Same padding split_video adds around every segment, so padded clips stay inside a fragment
+RANGE_PADDING_SECONDS = 3.0
+
+TimeRange = Tuple[float, float]
+
+
+class Fragment(BaseModel):
+    """
+    One downloaded piece of the source video, covering [start, end) in source time.
+    """
+    path: str
+    start: float
+    end: float
+
+
+def merge_ranges(
+    ranges: Iterable[TimeRange],
+    padding: float = RANGE_PADDING_SECONDS,
+    join_gap: float = 10.0,
+    duration: Optional[float] = None,
+) -> List[TimeRange]:
+    """
+    Pads every range, aligns it to whole seconds and merges ranges that overlap or are
+    less than `join_gap` seconds apart, since one extra request costs more than a few
+    seconds of extra media.
+    Returns:
+        list: Sorted, non-overlapping (start, end) ranges.
+    """
+    padded = []
+    for start, end in ranges:
+        start = max(0.0, float(math.floor(start - padding)))
+        end = float(math.ceil(end + padding))
+        if duration is not None:
+            end = min(end, float(math.ceil(duration)))
+        if end > start:
+            padded.append((start, end))
+
+    merged: List[TimeRange] = []
+    for start, end in sorted(padded):
+        if merged and start <= merged[-1][1] + join_gap:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def match_fragments(requested_downloads: List[dict], ranges: List[TimeRange]) -> List[Fragment]:
+    """
+    Pairs the section downloads yt-dlp reports with the ranges that were asked for, by
+    their section start/end, so every fragment is labelled with the range it covers.
+    Returns:
+        list: One fragment per range, in range order, with the file's base name as path.
+    Raises:
+        RuntimeError: If the sections and ranges do not pair up one to one, or a
+            section's file is missing.
+    """
+    if len(requested_downloads) != len(ranges):
+        raise RuntimeError(f"yt-dlp returned {len(requested_downloads)} sections for {len(ranges)} ranges.")
+
+    def bounds(start, end) -> Tuple[float, float]:
+        return round(float(start), 3), round(float(end), 3)
+
+    files = {}
+    for requested in requested_downloads:
+        key = bounds(requested.get("section_start") or 0.0, requested.get("section_end") or 0.0)
+        path = requested.get("filepath") or requested.get("_filename")
+        if key in files:
+            raise RuntimeError(f"yt-dlp returned the section {key[0]:.0f}-{key[1]:.0f}s twice.")
+        if not path or not os.path.exists(path):
+            raise RuntimeError(f"The section {key[0]:.0f}-{key[1]:.0f}s was not downloaded.")
+        files[key] = path
+
+    fragments = []
+    for start, end in ranges:
+        path = files.get(bounds(start, end))
+        if path is None:
+            raise RuntimeError(f"yt-dlp returned no section for {start:.0f}-{end:.0f}s.")
+        # Relative to the index, so the entry can be moved into the store
+        fragments.append(Fragment(path=os.path.basename(path), start=start, end=end))
+    return fragments
+
+
+def fragment_index_path(output_path: str, video_id: str) -> str:
+    return os.path.join(output_path, f"{video_id}{FRAGMENT_INDEX_SUFFIX}")
+
+
+def is_fragment_index(path: str) -> bool:
+    return path.endswith(FRAGMENT_INDEX_SUFFIX)
+
+
+def write_fragment_index(index_path: str, video_id: str, fragments: List[Fragment]) -> None:
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump({"video_id": video_id, "fragments": [fragment.model_dump() for fragment in fragments]}, f, indent=2)
+
+
+def read_fragment_index(index_path: str) -> List[Fragment]:
+    """
+    Loads the fragments listed in an index, resolving paths relative to the index file.
+    """
+    with open(index_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    base = os.path.dirname(os.path.abspath(index_path))
+    fragments = []
+    for item in data.get("fragments", []):
+        fragment = Fragment(**item)
+        if not os.path.isabs(fragment.path):
+            fragment.path = os.path.join(base, fragment.path)
+        fragments.append(fragment)
+    return sorted(fragments, key=lambda fragment: fragment.start)
+
+
+def find_fragment(fragments: List[Fragment], start: float, end: float) -> Optional[Fragment]:
+    """
+    The fragment that fully contains [start, end), or None.
+    """
+    for fragment in fragments:
+        if fragment.start <= start and end <= fragment.end:
+            return fragment
+    return None
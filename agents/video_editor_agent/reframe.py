@@ -0,0 +1,241 @@
+import os
+from typing import List, Optional, Tuple
+
+import av
+import numpy as np
+
+# Width of the grayscale frames the crop track is computed on
+ANALYSIS_WIDTH = 160
+
+# Crop positions are sent to ffmpeg at this rate, linearly interpolated between samples
+COMMAND_RATE = 15.0
+
+Track = List[Tuple[float, float]]
+
+
+def sample_frames(
+    video_path: str,
+    start: float,
+    end: float,
+    sample_fps: float = 2.0,
+    width: int = ANALYSIS_WIDTH,
+    keyframes_only: bool = True,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decodes low-resolution grayscale frames of [start, end) with PyAV.
+
+    With `keyframes_only` the decoder skips every non-key frame, which makes sampling
+    almost free; clips with fewer than 3 keyframes are resampled at `sample_fps` instead.
+    Returns:
+        tuple: (times relative to `start`, frames as a uint8 array of shape (n, h, width)).
+    """
+    with av.open(video_path) as container:
+        stream = container.streams.video[0]
+        height = max(2, int(round(width * stream.codec_context.height / stream.codec_context.width / 2)) * 2)
+        if keyframes_only:
+            stream.codec_context.skip_frame = "NONKEY"
+        container.seek(int(max(0.0, start) / stream.time_base), stream=stream, backward=True)
+
+        times, frames = [], []
+        next_sample = start
+        for frame in container.decode(stream):
+            if frame.time is None or frame.time < start - 1e-3:
+                continue
+            if frame.time >= end:
+                break
+            if not keyframes_only and frame.time < next_sample:
+                continue
+            times.append(frame.time - start)
+            frames.append(frame.reformat(width=width, height=height, format="gray").to_ndarray())
+            next_sample = frame.time + 1.0 / sample_fps
+
+    if keyframes_only and len(frames) < 3:
+        return sample_frames(video_path, start, end, sample_fps, width, keyframes_only=False)
+    if not frames:
+        return np.zeros(0), np.zeros((0, height, width), dtype=np.uint8)
+    return np.asarray(times, dtype=np.float64), np.stack(frames)
+
+
+def _face_centers(frames: np.ndarray) -> List[Optional[float]]:
+    """
+    Horizontal center (in analysis pixels) of the largest face per frame, using OpenCV's
+    bundled Haar cascade when OpenCV is installed. Returns None entries otherwise.
+    """
+    try:
+        import cv2
+    except ImportError:
+        return [None] * len(frames)
+
+    cascade = cv2.CascadeClassifier(os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml"))
+    centers = []
+    for frame in frames:
+        faces = cascade.detectMultiScale(frame, scaleFactor=1.15, minNeighbors=4, minSize=(12, 12))
+        if len(faces):
+            x, _, w, _ = max(faces, key=lambda face: face[2] * face[3])
+            centers.append(x + w / 2.0)
+        else:
+            centers.append(None)
+    return centers
+
+
+def subject_track(frames: np.ndarray, scene_cut: float = 40.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Estimates the horizontal subject position in every sampled frame.
+
+    Motion energy (absolute difference to the previous sample) marks where things move,
+    gradient energy marks detailed regions for static shots; the centroid of their column
+    profile is the subject. A detected face overrides both.
+    Returns:
+        tuple: (centers in analysis pixels, bool array marking scene cuts before a frame).
+    """
+    count, _, width = frames.shape
+    columns = np.arange(width, dtype=np.float64)
+    data = frames.astype(np.float32)
+    faces = _face_centers(frames)
+
+    centers = np.full(count, width / 2.0)
+    cuts = np.zeros(count, dtype=bool)
+    for n in range(count):
+        gradient = np.abs(np.diff(data[n], axis=1)).sum(axis=0)
+        profile = np.append(gradient, gradient[-1]) * 0.5
+        if n > 0:
+            diff = np.abs(data[n] - data[n - 1])
+            cuts[n] = diff.mean() > scene_cut
+            if not cuts[n]:
+                profile = profile + diff.sum(axis=0)
+        if faces[n] is not None:
+            centers[n] = faces[n]
+        elif profile.sum() > 0:
+            centers[n] = float((profile * columns).sum() / profile.sum())
+    return centers, cuts
+
+
+def smooth_track(
+    times: np.ndarray,
+    centers: np.ndarray,
+    cuts: np.ndarray,
+    window: int = 3,
+    max_speed: float = 0.25,
+) -> np.ndarray:
+    """
+    Smooths a center track into a steady virtual camera: moving average within each shot
+    (never across a scene cut) and a pan speed limit of `max_speed` frame widths per
+    second, expressed as a fraction of the analysis width of 1.0.
+    """
+    smoothed = centers.astype(np.float64).copy()
+    shot_starts = [0] + [n for n in range(1, len(centers)) if cuts[n]] + [len(centers)]
+    for a, b in zip(shot_starts[:-1], shot_starts[1:]):
+        shot = centers[a:b]
+        if len(shot) > 1 and window > 1:
+            kernel = np.ones(min(window, len(shot))) / min(window, len(shot))
+            padded = np.pad(shot, (len(kernel) // 2, len(kernel) - 1 - len(kernel) // 2), mode="edge")
+            smoothed[a:b] = np.convolve(padded, kernel, mode="valid")
+        for n in range(a + 1, b):
+            limit = max_speed * (times[n] - times[n - 1])
+            smoothed[n] = np.clip(smoothed[n], smoothed[n - 1] - limit, smoothed[n - 1] + limit)
+    return smoothed
+
+
+def crop_window(source_width: int, source_height: int, aspect: float = 9 / 16) -> Tuple[int, int]:
+    """
+    Largest even-sized crop of the given aspect (width / height) that fits the source.
+    """
+    crop_h = source_height
+    crop_w = int(round(crop_h * aspect / 2)) * 2
+    if crop_w > source_width:
+        crop_w = source_width - source_width % 2
+        crop_h = int(round(crop_w / aspect / 2)) * 2
+    return crop_w, crop_h
+
+
+def compute_crop_track(
+    video_path: str,
+    start: float,
+    end: float,
+    source_width: int,
+    source_height: int,
+    crop_width: int,
+) -> Track:
+    """
+    Crop x offsets (source pixels) over the clip as (time relative to start, x) pairs.
+    """
+    times, frames = sample_frames(video_path, start, end)
+    if not len(frames):
+        return [(0.0, (source_width - crop_width) / 2.0)]
+    centers, cuts = subject_track(frames)
+    scale = source_width / frames.shape[2]
+    # The speed limit is in analysis widths per second; convert the track to fractions
+    smoothed = smooth_track(times, centers / frames.shape[2], cuts) * frames.shape[2] * scale
+    xs = np.clip(smoothed - crop_width / 2.0, 0, source_width - crop_width)
+
+    # Hold the first sample until it is reached, and jump (do not pan) at scene cuts
+    track: Track = [(0.0, float(xs[0]))]
+    for n in range(1, len(times)):
+        if cuts[n]:
+            track.append((max(0.0, float(times[n]) - 1e-3), float(xs[n - 1])))
+        track.append((float(times[n]), float(xs[n])))
+    return track
+
+
+def write_sendcmd_file(track: Track, target: str, path: str, duration: float) -> str:
+    """
+    Writes an ffmpeg sendcmd script that moves `target` (a named crop filter) along the
+    track, interpolating linearly at COMMAND_RATE.
+    """
+    lines = []
+    step = 1.0 / COMMAND_RATE
+    times = [t for t, _ in track]
+    xs = [x for _, x in track]
+    t = 0.0
+    last = None
+    while t < duration:
+        x = int(round(float(np.interp(t, times, xs)) / 2)) * 2
+        if x != last:
+            lines.append(f"{t:.3f} {target} x {x};")
+            last = x
+        t += step
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+def filter_path(path: str) -> str:
+    """
+    Escapes a file path for use as a filter option value inside a filter graph.
+    """
+    return path.replace("\\", "/").replace(":", "\\\\:").replace("'", "\\\\'")
+
+
+def reframe_filter(
+    track: Track,
+    crop_width: int,
+    crop_height: int,
+    output_width: int,
+    output_height: int,
+    commands_path: str,
+    duration: float,
+    label: str,
+) -> str:
+    """
+    Filter chain that follows the crop track and scales to the output size, for use in
+    the cut's own encode (no second pass). The crop filter is named `crop@<label>` so the
+    sendcmd script can address it.
+    """
+    target = f"crop@{label}"
+    write_sendcmd_file(track, target, commands_path, duration)
+    x0 = int(round(track[0][1] / 2)) * 2
+    return (
+        f"sendcmd=f={filter_path(commands_path)},"
+        f"{target}=w={crop_width}:h={crop_height}:x={x0}:y=(ih-{crop_height})/2,"
+        f"scale={output_width}:{output_height},setsar=1"
+    )
+
+
+def pad_filter(output_width: int, output_height: int) -> str:
+    """
+    Filter chain that fits the whole frame into the output size with black bars.
+    """
+    return (
+        f"scale={output_width}:{output_height}:force_original_aspect_ratio=decrease,"
+        f"pad={output_width}:{output_height}:(ow-iw)/2:(oh-ih)/2,setsar=1"
+    )
@@ -1,36 +1,149 @@
 from moviepy.editor import VideoFileClip
+import numpy as np
 import os
 import yt_dlp
 import re
+import shutil
 import subprocess
+import tempfile
 from pydantic import BaseModel, Field, ValidationError
-from typing import Optional, List
+from typing import Callable, Optional, List
 import traceback
 
+from ..instrumentation import record, timed_stage
+from ..job_manifest import JobManifest, media_fingerprint, text_hash
+from ..segmentation_agent.prescorer import decode_audio_energy
+from ..tool_runtime import ToolCancelled, async_tool, check_cancelled, report_progress
+from .clipper import (
+    ClipJob,
+    copy_segments,
+    cut_segments,
+    find_ffmpeg,
+    probe_keyframes,
+    probe_media,
+    run_clip_jobs,
+    smart_cut_segment,
+    snap_to_keyframe,
+    write_clip_metadata,
+)
+from .ranged import (
+    RANGE_PADDING_SECONDS,
+    find_fragment,
+    fragment_index_path,
+    is_fragment_index,
+    match_fragments,
+    merge_ranges,
+    read_fragment_index,
+    write_fragment_index,
+)
+from .formats import OutputProfile, describe_formats, format_selector
+from .media_store import MediaStore
+from .reframe import compute_crop_track, crop_window, pad_filter, reframe_filter
 
+
+_project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The smallest streams that still meet the shorts' output spec, instead of the "best" mp4
+DOWNLOAD_PROFILE = OutputProfile.from_env()
+# Off unless asked for: reframing changes the clips' framing and resolution
+SHORT_REFRAME = os.environ.get("SHORT_REFRAME", "false").lower() in ("1", "true", "yes")
+
+media_store = MediaStore(
+    os.environ.get("MEDIA_STORE_DIR", os.path.join(_project_root, ".cache", "media")),
+    quota_bytes=int(float(os.environ.get("MEDIA_STORE_QUOTA_GB", 20)) * 1024 ** 3),
+)
+
+
+@timed_stage("download_video", kind="tool")
 def download_video(video_id: str, output_path: str = "downloads") -> str:
     """
     Download a YouTube video by its video ID using yt-dlp.
+    Videos are kept in the local media store, so a video that was downloaded before is
+    reused instead of fetched again.
+    Args:
+        video_id: The 11-character YouTube video ID.
+        output_path: Unused, kept for compatibility with existing tool calls.
+    Returns:
+        str: Path of the stored video.
     """
     url = f"https://www.youtube.com/watch?v={video_id}"
-    
-    if not os.path.exists(output_path):
-        os.makedirs(output_path)
-    
+
+    def download(scratch_dir: str) -> str:
+        ydl_opts, downloaded = _ydl_options(os.path.join(scratch_dir, '%(title)s.%(ext)s'))
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=True)
+            requested = info.get("requested_downloads") or [{}]
+            filename = requested[0].get("filepath") or ydl.prepare_filename(info)
+        _report_download(video_id, info, downloaded)
+        return filename
+
+    return media_store.fetch(video_id, DOWNLOAD_PROFILE.key, download)
+
+
+def stored_audio_energy(video_id: str) -> Optional[np.ndarray]:
+    """
+    Per-second audio energy of the video's stored download, for the prescorer. It is
+    computed once and kept next to the media, so it goes away with it on eviction.
+    Returns:
+        np.ndarray or None: None if the video is not in the media store (yet) or its
+        audio cannot be decoded.
+    """
+    path = media_store.lookup(video_id, DOWNLOAD_PROFILE.key)
+    if path is None:
+        return None
+    energy_path = f"{path}.energy.npy"
+    try:
+        return np.load(energy_path)
+    except (OSError, ValueError):
+        pass
+    try:
+        energy = decode_audio_energy(path)
+    except Exception as e:
+        print(f"Could not decode the audio of {video_id} for prescoring: {e}")
+        return None
+    tmp_path = f"{energy_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, energy)
+    os.replace(tmp_path, energy_path)
+    return energy
+
+
+def _ydl_options(outtmpl: str):
+    """
+    yt-dlp options shared by full and ranged downloads, plus a counter of bytes received.
+    """
+    ffmpeg = find_ffmpeg()
+    downloaded = {"bytes": 0}
+
+    def on_progress(progress):
+        # Raising here aborts the download when the async tool call is cancelled
+        check_cancelled()
+        if progress.get("status") == "downloading":
+            total = progress.get("total_bytes") or progress.get("total_bytes_estimate") or 0
+            received = progress.get("downloaded_bytes") or 0
+            report_progress(
+                f"downloading {received / 1024 ** 2:.1f}/{total / 1024 ** 2:.1f} MB",
+                downloaded_bytes=received, total_bytes=total,
+            )
+        elif progress.get("status") == "finished":
+            downloaded["bytes"] += progress.get("total_bytes") or progress.get("downloaded_bytes") or 0
+
     ydl_opts = {
-        'format': 'best[ext=mp4]/best',  # Download best quality mp4, fallback to best available
-        'outtmpl': os.path.join(output_path, '%(title)s.%(ext)s'),  # Output filename template
+        # Separate video/audio streams need ffmpeg for the (stream copy) merge
+        'format': format_selector(DOWNLOAD_PROFILE, allow_merge=ffmpeg is not None),
+        'outtmpl': outtmpl,  # Output filename template
+        'progress_hooks': [on_progress],
     }
-    
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        # Get video info first
-        info = ydl.extract_info(url, download=False)
-        filename = ydl.prepare_filename(info)
-        
-        # Download the video
-        ydl.download([url])
-        
-        return filename
+    if ffmpeg:
+        ydl_opts['ffmpeg_location'] = ffmpeg
+    return ydl_opts, downloaded
+
+
+def _report_download(video_id: str, info: dict, downloaded: dict) -> None:
+    formats = info.get("requested_formats") or [info]
+    record(bytes_downloaded=downloaded["bytes"])
+    print(f"Downloaded {video_id}: {describe_formats(formats)}, {downloaded['bytes'] / 1024 ** 2:.1f} MB")
+
 
 class Segment(BaseModel):
     topic: str
@@ -40,11 +153,27 @@ class Segment(BaseModel):
     viral_potential: Optional[str] = None
     content_type: Optional[str] = None
 
-def split_video(segments: List[Segment], base_filename: str = "") -> list:
+
+def time_to_seconds(time_str):
+    parts = [int(p) for p in time_str.split(':')]
+    if len(parts) == 2:
+        return parts[0] * 60 + parts[1]
+    elif len(parts) == 3:
+        return parts[0] * 3600 + parts[1] * 60 + parts[2]
+    return int(time_str)
+
+
+def seconds_to_time(seconds) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+def _validate_segments(segments) -> List[Segment]:
     """
-    Splits video into segments based on start and end times.
+    Explicit Pydantic validation for incoming segments.
     """
-    # Explicit Pydantic validation for incoming segments
     validated_segments: List[Segment] = []
     for i, s in enumerate(segments):
         if isinstance(s, dict):
@@ -60,47 +189,494 @@ def split_video(segments: List[Segment], base_filename: str = "") -> list:
         else:
             print(f"ERROR: Unexpected type for segment {i}: {type(s)}. Expected dict or Segment.")
             raise TypeError(f"Segment {i} is of unexpected type: {type(s)}.")
-    
-    segments = validated_segments
+    return validated_segments
+
+
+@timed_stage("download_video_ranges", kind="tool")
+def download_video_ranges(
+    video_id: str,
+    segments: List[Segment],
+    output_path: str = "downloads",
+    padding: float = RANGE_PADDING_SECONDS,
+) -> str:
+    """
+    Downloads only the parts of a YouTube video that the segments need, using yt-dlp
+    section downloads. Segment windows are padded and merged first, so overlapping or
+    nearby segments share one fragment.
+    Args:
+        video_id: The 11-character YouTube video ID.
+        segments: The segments that will be clipped, each with start/end timestamps.
+        output_path: Unused, kept for compatibility with existing tool calls.
+        padding: Seconds added on both sides of every segment before merging.
+    Returns:
+        str: Path of the fragment index (`<video_id>.fragments.json`) in the media store.
+             Pass it to split_video as `video_path` to cut the clips from the fragments.
+    """
+    segments = _validate_segments(segments)
+    ranges = merge_ranges(
+        [(time_to_seconds(segment.start_time), time_to_seconds(segment.end_time)) for segment in segments],
+        padding=padding,
+    )
+    if not ranges:
+        raise ValueError("No segments to download.")
+
+    url = f"https://www.youtube.com/watch?v={video_id}"
+
+    def download(scratch_dir: str) -> str:
+        ydl_opts, downloaded = _ydl_options(os.path.join(scratch_dir, '%(id)s.%(section_start)d-%(section_end)d.%(ext)s'))
+        ydl_opts.update({
+            'download_ranges': yt_dlp.utils.download_range_func(None, ranges),
+            # Cut exactly at the range bounds so fragment time 0 is exactly `start` in the source
+            'force_keyframes_at_cuts': True,
+        })
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=True)
+        _report_download(video_id, info, downloaded)
+
+        fragments = match_fragments(info.get("requested_downloads") or [], ranges)
+        index_path = fragment_index_path(scratch_dir, video_id)
+        write_fragment_index(index_path, video_id, fragments)
+        return index_path
+
+    index_path = media_store.fetch(video_id, f"{DOWNLOAD_PROFILE.key}|ranges={ranges}", download)
+    total = sum(end - start for start, end in ranges)
+    print(f"Using {len(ranges)} fragments ({total:.0f}s of media) for {video_id}.")
+    return index_path
+
+
+@timed_stage("split_video", kind="tool")
+def split_video(
+    segments: List[Segment],
+    base_filename: str = "",
+    mode: str = "encode",
+    frame_accurate: bool = False,
+    max_workers: int = 1,
+    encoder_threads: int = 0,
+    video_path: str = "",
+    output_dir: str = "",
+    video_id: str = "",
+    reframe: bool = SHORT_REFRAME,
+    burn_subtitles: bool = False,
+    word_highlight: bool = False,
+) -> list:
+    """
+    Splits video into segments based on start and end times.
+    Args:
+        segments: The segments to cut, each with a topic and start/end timestamps.
+        base_filename: Unused, kept for compatibility with existing tool calls.
+        mode: "encode" re-encodes every clip with libx264, "copy" stream-copies clips
+              with their starts snapped to the preceding keyframe.
+        frame_accurate: Only used with mode="copy". Keeps the exact start by re-encoding
+              the GOP head up to the next keyframe ("smart cut") and copying the rest.
+        max_workers: Number of clips rendered concurrently. Above 1 every clip gets its own
+              ffmpeg process, started from a bounded thread pool, and a failing clip no longer aborts the others.
+        encoder_threads: libx264 threads per encoder (0 lets ffmpeg decide). Keep
+              max_workers * encoder_threads close to the core count.
+        video_path: Source video to cut. Defaults to the video found in the downloads folder.
+              A fragment index from download_video_ranges cuts every clip from the
+              fragment that contains it.
+        output_dir: Where clips are written. Defaults to the downloads folder.
+        video_id: YouTube video ID; when set (and video_path is not), the source is
+              looked up in the media store. Also names the job manifest in which
+              rendered clips are checkpointed: clips already rendered from the same
+              source with the same settings are reused instead of encoded again.
+        reframe: Crops clips to the output profile (9:16 by default), following the
+              subject, in the same encode as the cut. Off by default (SHORT_REFRAME),
+              so clips keep the source framing. Ignored with mode="copy".
+        burn_subtitles: Burns captions from the Whisper transcript of the source into the
+              clips in the same encode (after reframing), and writes a matching .srt
+              next to each clip. Ignored with mode="copy".
+        word_highlight: With burn_subtitles, highlights every word as it is spoken.
+    Returns:
+        list: Output paths of the written clips, in segment order.
+    """
+    if mode not in ("encode", "copy"):
+        raise ValueError(f"Unsupported split mode: {mode}. Expected 'encode' or 'copy'.")
+
+    segments = _validate_segments(segments)
+
+    if video_path and is_fragment_index(video_path):
+        return _split_fragments(
+            segments, video_path, mode=mode, frame_accurate=frame_accurate,
+            max_workers=max_workers, encoder_threads=encoder_threads, output_dir=output_dir,
+            video_id=video_id, reframe=reframe, burn_subtitles=burn_subtitles, word_highlight=word_highlight,
+        )
 
     def find_video_file():
+        if video_id:
+            stored = media_store.lookup(video_id, DOWNLOAD_PROFILE.key)
+            if stored:
+                return stored
+            raise FileNotFoundError(f"{video_id} is not in the media store.")
+        # Legacy layout: the most recently written video in the downloads folder
         downloads_dir = os.path.join(os.getcwd(), "downloads")
         video_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm', '.m4v']
-        for file in os.listdir(downloads_dir):
-            if any(file.lower().endswith(ext) for ext in video_extensions):
-                return os.path.join(downloads_dir, file)
-        raise FileNotFoundError("No video file found in downloads folder.")
-
-    def time_to_seconds(time_str):
-        parts = [int(p) for p in time_str.split(':')]
-        if len(parts) == 2:
-            return parts[0] * 60 + parts[1]
-        elif len(parts) == 3:
-            return parts[0] * 3600 + parts[1] * 60 + parts[2]
-        return int(time_str)
+        candidates = [
+            os.path.join(downloads_dir, file)
+            for file in os.listdir(downloads_dir)
+            if any(file.lower().endswith(ext) for ext in video_extensions)
+        ]
+        if not candidates:
+            raise FileNotFoundError("No video file found in downloads folder.")
+        return max(candidates, key=os.path.getmtime)
 
     def sanitize_filename(name):
         name = re.sub(r'[<>:"/\\|?*]', '_', name)
         name = re.sub(r'\s+', '_', name)
         return name.strip('._')[:100]
 
-    def find_ffmpeg():
-        for path in ['ffmpeg', 'C:\\ffmpeg\\bin\\ffmpeg.exe', '/usr/bin/ffmpeg', '/usr/local/bin/ffmpeg']:
-            try:
-                subprocess.run([path, "-version"], capture_output=True, timeout=5, check=True)
-                return path
-            except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
-                continue
-        return None
-
-    # Video loading block with error handling
+    # Source lookup and probing block with error handling
     try:
-        video_path = find_video_file()
-        video_clip = VideoFileClip(video_path)
+        if not video_path:
+            video_path = find_video_file()
+        elif not os.path.exists(video_path):
+            raise FileNotFoundError(f"{video_path} does not exist.")
+        media = probe_media(video_path)
     except FileNotFoundError as e:
         print(f"ERROR: Video file not found: {e}")
         traceback.print_exc()
         raise ValueError(f"Video file not found for splitting: {e}")
+    except Exception as e:
+        print(f"ERROR: Failed to probe video: {e}")
+        traceback.print_exc()
+        raise ValueError(f"Failed to load video for splitting: {e}")
+
+    duration = media["duration"]
+    output_dir = output_dir or os.path.join(os.getcwd(), "downloads")
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    source_key = media_fingerprint(video_path)
+    manifest = JobManifest.for_job(video_id or f"source-{source_key[:16]}")
+
+    jobs: List[ClipJob] = []
+    reserved_paths = set()
+    clip_inputs = {}
+    reused = {}
+
+    for i, segment in enumerate(segments):
+        start = time_to_seconds(segment.start_time)
+        end = time_to_seconds(segment.end_time)
+
+        start = max(0, start - 3)
+        end = end + 3
+
+        # Skip invalid segments
+        if start >= end:
+            print(f"Skipping segment {i+1}: start_time >= end_time (start={start}, end={end})")
+            continue
+
+        if start >= duration:
+            print(f"Skipping segment {i+1}: start_time beyond video length (start={start}, video_duration={duration})")
+            continue
+
+        # Adjust end time if it exceeds video duration
+        if end > duration:
+            print(f"Adjusting end_time to video length (original_end={end}, new_end={duration})")
+            end = duration
+
+        # Create output filename from segment properties
+        filename_parts = [
+            segment.topic,
+            segment.content_type or '',
+            segment.viral_potential or ''
+        ]
+        filename = sanitize_filename("_".join(filter(None, filename_parts)))
+        output_path = os.path.join(output_dir, f"{filename}.mp4")
+
+        # Everything the rendered clip depends on; a checkpoint with the same inputs is reused
+        inputs = {
+            "source": source_key,
+            "start": start,
+            "end": end,
+            "mode": mode,
+            "frame_accurate": frame_accurate,
+            "reframe": reframe,
+            "profile": DOWNLOAD_PROFILE.key,
+            "burn_subtitles": burn_subtitles,
+            "word_highlight": word_highlight,
+        }
+        checkpoint = manifest.completed(_clip_stage(inputs), inputs) if manifest else None
+        in_place = (
+            checkpoint is not None
+            and checkpoint["path"] == os.path.abspath(output_path)
+            and output_path not in reserved_paths
+        )
+
+        # Handle duplicate filenames, including clips planned earlier in this call
+        counter = 1
+        base_output = output_path
+        while not in_place and (os.path.exists(output_path) or output_path in reserved_paths):
+            output_path = f"{os.path.splitext(base_output)[0]}_{counter}.mp4"
+            counter += 1
+        reserved_paths.add(output_path)
+
+        if checkpoint is not None:
+            if not in_place:
+                # Moved on by the subtitles stage since: a copy is far cheaper than an encode
+                shutil.copy2(checkpoint["path"], output_path)
+            job = ClipJob(index=i, topic=segment.topic, start=checkpoint["start"], end=checkpoint["end"], output_path=output_path)
+            write_clip_metadata(job, video_path, manifest.job_id)
+            reused[i] = output_path
+            print(f"Reusing the checkpointed clip for segment {i+1} ('{segment.topic}'): {output_path}")
+            continue
+
+        clip_inputs[i] = inputs
+        jobs.append(ClipJob(index=i, topic=segment.topic, start=start, end=end, output_path=output_path))
+
+    if not jobs:
+        return [reused[i] for i in sorted(reused)]
+
+    ffmpeg = find_ffmpeg()
+
+    use_copy = ffmpeg is not None and mode == "copy"
+    if use_copy and frame_accurate and media["video_codec"] != "h264":
+        print(f"Smart cut needs an H.264 source (got {media['video_codec']}); re-encoding instead.")
+        use_copy = False
+    if use_copy and not frame_accurate:
+        # Snap up front so the recorded clip offsets match what stream copy produces
+        keyframes = probe_keyframes(video_path)
+        jobs = [job.model_copy(update={"start": snap_to_keyframe(keyframes, job.start)}) for job in jobs]
+
+    # Reframing and burned-in captions become part of each clip's filter chain, so the
+    # cut, the crop and the captions all happen in one encode
+    work_dir = None
+    if (reframe or burn_subtitles) and use_copy:
+        print("Reframing and burned-in subtitles need an encode; mode='copy' keeps the clips as they are.")
+    elif (reframe or burn_subtitles) and ffmpeg and media["width"] and media["height"]:
+        work_dir = tempfile.mkdtemp(prefix="render_", dir=output_dir)
+        frame_size = (media["width"], media["height"])
+        filters = {job.index: [] for job in jobs}
+        if reframe:
+            for done, job in enumerate(jobs, start=1):
+                check_cancelled()
+                report_progress(f"tracking subject for clip {done}/{len(jobs)}", done=done, total=len(jobs))
+                filters[job.index].append(_reframe_filter(video_path, job, media, work_dir))
+            frame_size = (DOWNLOAD_PROFILE.width, DOWNLOAD_PROFILE.height)
+        if burn_subtitles:
+            for index, chain in _subtitle_filters(video_path, jobs, frame_size, word_highlight, work_dir).items():
+                filters[index].append(chain)
+        jobs = [
+            job.model_copy(update={"video_filter": ",".join(filters[job.index]) or None})
+            for job in jobs
+        ]
+
+    report_progress(f"rendering {len(jobs)} clips", force=True, total=len(jobs))
+    try:
+        rendered = _render_jobs(
+            ffmpeg, video_path, jobs, media, use_copy,
+            frame_accurate=frame_accurate, max_workers=max_workers, encoder_threads=encoder_threads,
+            manifest=manifest, clip_inputs=clip_inputs,
+        )
+        if not reused:
+            return rendered
+        index_of = {job.output_path: job.index for job in jobs}
+        ordered = sorted([*reused.items(), *((index_of[path], path) for path in rendered)])
+        return [path for _, path in ordered]
+    except ToolCancelled:
+        # Half-written clips must not be picked up by the subtitles stage
+        for job in jobs:
+            if os.path.exists(job.output_path):
+                os.remove(job.output_path)
+        raise
+    finally:
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _clip_stage(inputs: dict) -> str:
+    # Clips are checkpointed by what they were rendered from, not by name or position
+    return f"clip:{text_hash(inputs)[:16]}"
+
+
+def _subtitle_filters(video_path: str, jobs: List[ClipJob], frame_size: tuple, word_highlight: bool, work_dir: str) -> dict:
+    """
+    Writes an ASS script (and a sidecar .srt) per clip from the word-level Whisper
+    transcript of the source, and returns the `ass` filter chain by job index.
+    The source is transcribed once and shared with generate_subtitles.
+    """
+    # Imported here: the subtitles package imports the clipper, and Whisper is heavy
+    from ..subtitles_agent.ass import subtitles_filter, write_ass
+    from ..subtitles_agent.models import (
+        WHISPER_COMPUTE_TYPE,
+        WHISPER_CPU_THREADS,
+        WHISPER_DEVICE,
+        WHISPER_MODEL_SIZE,
+        WHISPER_NUM_WORKERS,
+        get_whisper_model,
+    )
+    from ..subtitles_agent.source_index import load_source_transcript
+    from ..subtitles_agent.tools import _write_srt
+
+    model_key = (WHISPER_MODEL_SIZE, WHISPER_DEVICE, WHISPER_COMPUTE_TYPE, WHISPER_CPU_THREADS, WHISPER_NUM_WORKERS)
+    try:
+        transcript = load_source_transcript(video_path, get_whisper_model(*model_key), model_key=model_key)
+    except Exception as e:
+        print(f"Could not transcribe {video_path} for burned-in subtitles, rendering without them: {e}")
+        traceback.print_exc()
+        return {}
+
+    width, height = frame_size
+    chains = {}
+    for job in jobs:
+        segments = transcript.segments_between(job.start, job.end)
+        ass_path = write_ass(segments, os.path.join(work_dir, f"c{job.index}.ass"), width, height, word_highlight=word_highlight)
+        _write_srt([(start, end, text) for start, end, text, _ in segments], f"{os.path.splitext(job.output_path)[0]}.srt")
+        chains[job.index] = subtitles_filter(ass_path)
+    return chains
+
+
+def _reframe_filter(video_path: str, job: ClipJob, media: dict, work_dir: str) -> str:
+    """
+    Video filter chain that fits a clip to DOWNLOAD_PROFILE: a smoothed subject-following
+    crop for fit="crop" (center crop if the analysis fails), letterboxing for fit="pad".
+    """
+    profile = DOWNLOAD_PROFILE
+    if profile.fit != "crop":
+        return pad_filter(profile.width, profile.height)
+    width, height = media["width"], media["height"]
+    crop_w, crop_h = crop_window(width, height, profile.width / profile.height)
+    try:
+        track = compute_crop_track(video_path, job.start, job.end, width, height, crop_w)
+    except Exception as e:
+        print(f"Subject tracking failed for segment {job.index+1} ('{job.topic}'), using a center crop: {e}")
+        track = [(0.0, (width - crop_w) / 2.0)]
+    return reframe_filter(
+        track, crop_w, crop_h, profile.width, profile.height,
+        os.path.join(work_dir, f"c{job.index}.cmd"), job.end - job.start, f"c{job.index}",
+    )
+
+
+def _render_jobs(
+    ffmpeg: Optional[str],
+    video_path: str,
+    jobs: List[ClipJob],
+    media: dict,
+    use_copy: bool,
+    frame_accurate: bool,
+    max_workers: int,
+    encoder_threads: int,
+    manifest: Optional[JobManifest] = None,
+    clip_inputs: Optional[dict] = None,
+) -> list:
+    """
+    Renders planned clips with the fastest engine available, falling back from stream
+    copy to a single-pass encode to MoviePy. Every saved clip is checkpointed in
+    `manifest` under its inputs from `clip_inputs` (by job index).
+    """
+    saved = set()
+
+    def save(job: ClipJob) -> None:
+        if job.output_path in saved:
+            return
+        saved.add(job.output_path)
+        # Record where every clip came from so subtitles can be cut from the source transcript
+        write_clip_metadata(job, video_path, manifest.job_id if manifest else None)
+        record(bytes_written=os.path.getsize(job.output_path), media_seconds=job.end - job.start)
+        if manifest is not None and clip_inputs and job.index in clip_inputs:
+            inputs = clip_inputs[job.index]
+            outputs = {"path": os.path.abspath(job.output_path), "topic": job.topic, "start": job.start, "end": job.end}
+            manifest.complete(_clip_stage(inputs), inputs, outputs, files=[job.output_path])
+        print(f"Saved: {job.output_path}")
+
+    def finish(paths: List[str]) -> list:
+        written = set(paths)
+        for job in jobs:
+            if job.output_path in written:
+                save(job)
+        report_progress(f"saved {len(paths)} clips", force=True, done=len(paths), total=len(jobs))
+        return paths
+
+    # Parallel rendering: one ffmpeg process per clip, at most max_workers at a time
+    if ffmpeg and max_workers > 1:
+        outcomes = run_clip_jobs(
+            ffmpeg, video_path, jobs, media["has_audio"], max_workers,
+            mode="copy" if use_copy else "encode",
+            frame_accurate=frame_accurate,
+            keyframes=probe_keyframes(video_path) if use_copy else None,
+            threads=encoder_threads,
+        )
+        results = []
+        for job, path, error in outcomes:
+            if path:
+                results.append(path)
+            else:
+                print(f"FFmpeg failed for segment {job.index+1} ('{job.topic}'): {error}")
+        if not results:
+            raise RuntimeError("All clip jobs failed. Cannot perform video splitting.")
+        return finish(results)
+
+    # Keyframe-aware stream copy: no decode at all, or only the GOP head in smart-cut mode
+    if use_copy:
+        try:
+            if frame_accurate:
+                keyframes = probe_keyframes(video_path)
+                results = [smart_cut_segment(ffmpeg, video_path, job, keyframes, media["has_audio"]) for job in jobs]
+            else:
+                results = copy_segments(ffmpeg, video_path, jobs)
+            return finish(results)
+        except subprocess.CalledProcessError as err:
+            print(f"FFmpeg stream copy failed: {err.stderr.decode(errors='replace')}")
+            traceback.print_exc()
+        except Exception as err:
+            print(f"Unexpected error during FFmpeg stream copy: {err}")
+            traceback.print_exc()
+        print("🔄 Falling back to re-encoding...")
+
+    # Single-pass FFmpeg cut: one process, each clip decoded from its own seeked input
+    if ffmpeg:
+        try:
+            results = cut_segments(ffmpeg, video_path, jobs, media["has_audio"], encoder_threads)
+            return finish(results)
+        except subprocess.CalledProcessError as err:
+            print(f"FFmpeg single-pass cut failed: {err.stderr.decode(errors='replace')}")
+            traceback.print_exc()
+        except Exception as err:
+            print(f"Unexpected error during FFmpeg single-pass cut: {err}")
+            traceback.print_exc()
+        print("🔄 Trying fallback with MoviePy...")
+    else:
+        print("FFmpeg not installed or not found in PATH. Using MoviePy.")
+
+    return finish(_split_with_moviepy(video_path, jobs, on_saved=save))
+
+
+def _split_fragments(segments: List[Segment], index_path: str, **options) -> list:
+    """
+    Cuts segments from ranged-download fragments: each segment is rebased onto the
+    fragment that contains it, and runs of segments sharing a fragment are cut together.
+    """
+    fragments = read_fragment_index(index_path)
+    groups = []
+    for i, segment in enumerate(segments):
+        start, end = time_to_seconds(segment.start_time), time_to_seconds(segment.end_time)
+        fragment = find_fragment(fragments, start, end)
+        if fragment is None:
+            print(f"Skipping segment {i+1}: {segment.start_time}-{segment.end_time} was not downloaded.")
+            continue
+        rebased = segment.model_copy(update={
+            "start_time": seconds_to_time(start - fragment.start),
+            "end_time": seconds_to_time(end - fragment.start),
+        })
+        if groups and groups[-1][0] is fragment:
+            groups[-1][1].append(rebased)
+        else:
+            groups.append((fragment, [rebased]))
+
+    results = []
+    for fragment, group in groups:
+        results.extend(split_video(group, video_path=fragment.path, **options))
+    return results
+
+
+def _split_with_moviepy(video_path: str, jobs: List[ClipJob], on_saved: Optional[Callable[[ClipJob], None]] = None) -> list:
+    """
+    Fallback cutting engine: decodes the source through MoviePy and encodes each clip in
+    turn. `on_saved` is called after every clip, so the clips before a failing one are
+    kept.
+    """
+    try:
+        video_clip = VideoFileClip(video_path)
     except Exception as e:
         print(f"ERROR: Failed to load video clip: {e}")
         traceback.print_exc()
@@ -108,97 +684,34 @@ def split_video(segments: List[Segment], base_filename: str = "") -> list:
 
     results = []
 
-    for i, segment in enumerate(segments):
+    for job in jobs:
+        check_cancelled()
         try:
-            start = time_to_seconds(segment.start_time)
-            end = time_to_seconds(segment.end_time)
-            
-            start = max(0, start - 3)
-            end = end + 3
-
-            # Skip invalid segments
-            if start >= end:
-                print(f"Skipping segment {i+1}: start_time >= end_time (start={start}, end={end})")
-                continue
-
-            if start >= video_clip.duration:
-                print(f"Skipping segment {i+1}: start_time beyond video length (start={start}, video_duration={video_clip.duration})")
-                continue
-
-            # Adjust end time if it exceeds video duration
-            if end > video_clip.duration:
-                print(f"Adjusting end_time to video length (original_end={end}, new_end={video_clip.duration})")
-                end = video_clip.duration
-
-            # Create output filename from segment properties
-            filename_parts = [
-                segment.topic,
-                segment.content_type or '',
-                segment.viral_potential or ''
-            ]
-            filename = sanitize_filename("_".join(filter(None, filename_parts)))
-            output_dir = os.path.join(os.getcwd(), "downloads")
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-            output_path = os.path.join(output_dir, f"{filename}.mp4")
-
-            # Handle duplicate filenames
-            counter = 1
-            base_output = output_path
-            while os.path.exists(output_path):
-                output_path = f"{os.path.splitext(base_output)[0]}_{counter}.mp4"
-                counter += 1
-
-            clip = video_clip.subclip(start, end)
-            try:
-                # Try MoviePy first
-                clip.write_videofile(
-                    output_path,
-                    codec="libx264", # Common and standard H.264 codec
-                    audio_codec="aac",
-                    temp_audiofile=f"temp_audio_{i}.m4a",
-                    remove_temp=True,
-                    verbose=False,
-                    logger=None
-                )
-                print(f"Saved: {output_path}")
-                results.append(output_path)
-            except Exception as e:
-                print(f"MoviePy failed for segment '{segment.topic}': {e}")
-                traceback.print_exc()
-                print("🔄 Trying fallback with FFmpeg...")
-
-                # FFmpeg fallback
-                ffmpeg = find_ffmpeg()
-                if ffmpeg:
-                    cmd = [
-                        ffmpeg, '-i', video_path,
-                        '-ss', str(start),
-                        '-t', str(end - start),
-                        '-c:v', 'libx264',
-                        '-c:a', 'aac',
-                        '-y', output_path
-                    ]
-                    try:
-                        subprocess.run(cmd, check=True, capture_output=True)
-                        print(f"Fallback success for segment '{segment.topic}': {output_path}")
-                        results.append(output_path)
-                    except subprocess.CalledProcessError as err:
-                        print(f"FFmpeg failed for segment '{segment.topic}': {err.stderr.decode()}")
-                        traceback.print_exc()
-                        raise
-                    except Exception as err:
-                        print(f"Unexpected error during FFmpeg fallback for segment '{segment.topic}': {err}")
-                        traceback.print_exc()
-                        raise
-                else:
-                    print("FFmpeg not installed or not found in PATH. Cannot proceed with fallback.")
-                    raise RuntimeError("FFmpeg not found. Cannot perform video splitting.")
+            clip = video_clip.subclip(job.start, min(job.end, video_clip.duration))
+            clip.write_videofile(
+                job.output_path,
+                codec="libx264", # Common and standard H.264 codec
+                audio_codec="aac",
+                temp_audiofile=f"temp_audio_{job.index}.m4a",
+                remove_temp=True,
+                verbose=False,
+                logger=None
+            )
+            results.append(job.output_path)
+            if on_saved is not None:
+                on_saved(job)
         except Exception as err:
-            # Catch-all for unexpected errors
-            print(f"Unexpected error processing segment {i+1} ('{segment.topic if isinstance(segment, Segment) else 'Unknown' }'): {err}")
+            print(f"Unexpected error processing segment {job.index+1} ('{job.topic}'): {err}")
             traceback.print_exc()
+            video_clip.close()
             raise
 
     video_clip.close()
-    return results
\ No newline at end of file
+    return results
+
+
+# Non-blocking versions for the ADK runtime: the work runs on each tool's own executor,
+# limited by TOOL_CONCURRENCY_<TOOL>, and is cancelled with the calling task
+download_video_async = async_tool(download_video)
+download_video_ranges_async = async_tool(download_video_ranges)
+split_video_async = async_tool(split_video)
@@ -15,8 +15,8 @@ groq_llm = LiteLlm(
 )
 
 from .tools import (
-    download_video,
-    split_video,
+    download_video_async,
+    split_video_async,
 )
 
 from .instructions import (
@@ -30,7 +30,7 @@ video_download_agent = Agent(
     model=groq_llm,
     description="Fetches the video and downloads it to the system.",
     instruction=DOWNLOAD_PROMPT,
-    tools=[download_video],
+    tools=[download_video_async],
     output_key="video_data"
 )
 
@@ -39,13 +39,13 @@ video_clip_agent = Agent(
     model="gemini-2.0-flash",
     description="Breaks down the downloaded video into the required segments using the start and end timestamps.",
     instruction=CLIPPING_PROMPT,
-    tools=[split_video],
+    tools=[split_video_async],
     output_key="clipped_videos"
 )
 
 video_processing_agent = Agent(
     name="video_processing_agent",
-    description="Downloads and preprocesses the videos.",
+    description="Clips the downloaded video and subtitles the clips.",
     instruction=VIDEO_PROCESSING_PROMPT,
     model="gemini-2.0-flash",
     tools=[
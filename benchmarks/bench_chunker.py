@@ -0,0 +1,81 @@
+"""
+Measures how many tokens (and estimated LLM seconds) the deterministic transcript
+pre-chunker saves compared to handing the per-snippet transcript to the LLM.
+
+Usage:
+    python -m benchmarks.bench_chunker --hours 0.5 1 3
+    python -m benchmarks.bench_chunker --transcript saved_transcript.json
+"""
+import argparse
+import json
+import random
+import time
+
+from agents.transcript_agent.chunker import chunk_transcript, estimate_tokens
+from agents.transcript_agent.transcript import Transcript
+
+WORDS = (
+    "so the thing nobody tells you about building a company is that you will fail "
+    "many times and that is fine because every failure teaches you something new "
+    "um you know I think the biggest mistake people make is waiting too long"
+).split()
+
+
+def synthetic_transcript(hours: float, punctuated: bool, seed: int = 0) -> Transcript:
+    """
+    Auto-caption style transcript: 2-3 s snippets of 5-9 words with occasional pauses.
+    """
+    rng = random.Random(seed)
+    snippets = []
+    t = 0.0
+    while t < hours * 3600:
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 9)))
+        if punctuated and rng.random() < 0.3:
+            text += rng.choice([".", "?", "!"])
+        duration = rng.uniform(2.0, 3.2)
+        snippets.append({"text": text, "start": round(t, 2), "duration": round(duration, 2)})
+        t += duration + (rng.uniform(0.8, 2.0) if rng.random() < 0.15 else 0.0)
+    return Transcript.from_snippets(snippets)
+
+
+def measure(name: str, transcript: Transcript, token_budget, prefill_tps: float) -> dict:
+    legacy = json.dumps([view.to_dict() for view in transcript])
+    started = time.perf_counter()
+    condensed = chunk_transcript(transcript, token_budget=token_budget)
+    chunk_seconds = time.perf_counter() - started
+
+    before = estimate_tokens(legacy)
+    after = estimate_tokens(condensed)
+    return {
+        "sample": name,
+        "snippets": len(transcript),
+        "tokens_before": before,
+        "tokens_after": after,
+        "token_reduction": round(1 - after / before, 3) if before else 0.0,
+        "chunker_seconds": round(chunk_seconds, 4),
+        "est_llm_seconds_saved": round((before - after) / prefill_tps - chunk_seconds, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, nargs="+", default=[0.5, 1.0, 3.0])
+    parser.add_argument("--transcript", nargs="*", default=[], help="Columnar transcript JSON files (youtube_transcript output)")
+    parser.add_argument("--token-budget", type=int, default=None)
+    parser.add_argument("--prefill-tps", type=float, default=4000.0, help="Assumed LLM input tokens per second")
+    args = parser.parse_args()
+
+    samples = []
+    for hours in args.hours:
+        samples.append((f"synthetic_{hours}h_autocaption", synthetic_transcript(hours, punctuated=False)))
+        samples.append((f"synthetic_{hours}h_punctuated", synthetic_transcript(hours, punctuated=True)))
+    for path in args.transcript:
+        with open(path, "r", encoding="utf-8") as f:
+            samples.append((path, Transcript.from_dict(json.load(f))))
+
+    for name, transcript in samples:
+        print(json.dumps(measure(name, transcript, args.token_budget, args.prefill_tps)))
+
+
+if __name__ == "__main__":
+    main()
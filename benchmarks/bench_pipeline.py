@@ -0,0 +1,281 @@
+"""
+Runs the full root_agent flow offline and reports per-stage latency, clips per minute
+and peak memory for synthetic 10 min / 1 h / 3 h sources.
+
+Nothing touches the network: every LLM is replaced by a scripted fake that returns
+canned segments and tool calls, the transcript comes from a StaticTranscriptFetcher,
+and the "download" is a testsrc/sine video generated with ffmpeg and seeded into a
+temporary media store. split_video and generate_subtitles run for real (Whisper is
+faked unless --real-whisper is given and the model is available locally).
+
+Every duration runs in its own process, so peak RSS is per run.
+
+Usage:
+    python -m benchmarks.bench_pipeline --durations 600 3600 10800
+    python -m benchmarks.bench_pipeline --durations 600 --segments 8 --workers 4 --output results.json
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+# The agent modules read these at import time; no request ever leaves the machine
+os.environ.setdefault("GROQ_API_KEY", "offline-benchmark")
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+from .bench_chunker import synthetic_transcript
+from .bench_split_video import make_segments, make_source
+
+_project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MEDIA_CACHE_DIR = os.path.join(_project_root, ".cache", "bench_media")
+
+
+def source_video(ffmpeg: str, duration: int, size: str) -> str:
+    """
+    Synthetic source of the given length, generated once and kept in .cache/bench_media.
+    """
+    os.makedirs(MEDIA_CACHE_DIR, exist_ok=True)
+    path = os.path.join(MEDIA_CACHE_DIR, f"testsrc_{duration}s_{size}.mp4")
+    if not os.path.exists(path):
+        print(f"Generating {duration}s synthetic source ({size})...", file=sys.stderr)
+        partial = f"{path}.part.mp4"
+        make_source(ffmpeg, partial, duration, size)
+        os.replace(partial, path)
+    return path
+
+
+class FakeWhisperModel:
+    """
+    Stands in for a faster-whisper model: one 3 s segment per 3 s of audio.
+    """
+
+    def transcribe(self, audio, beam_size: int = 5, word_timestamps: bool = False, **kwargs):
+        seconds = len(audio) / 16000
+        segments = [
+            SimpleNamespace(start=t, end=min(t + 3.0, seconds), text=f" caption at {t:.0f} seconds", words=None)
+            for t in range(0, int(seconds), 3)
+        ]
+        return iter(segments), SimpleNamespace(language="en", duration=seconds)
+
+
+def scripted_llm(role: str, plan: dict):
+    """
+    Fake LLM for one agent of the tree, replaying the tool calls the real model is asked
+    to make (see the agent instructions).
+    """
+    from google.adk.models.base_llm import BaseLlm
+    from google.adk.models.llm_response import LlmResponse
+    from google.genai import types
+
+    def called(llm_request) -> list:
+        return [
+            part.function_response.name
+            for content in llm_request.contents
+            for part in content.parts or []
+            if part.function_response
+        ]
+
+    def call(name: str, args: dict) -> LlmResponse:
+        return LlmResponse(content=types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))]))
+
+    def text(value: str) -> LlmResponse:
+        return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=value)]))
+
+    class ScriptedLlm(BaseLlm):
+        async def generate_content_async(self, llm_request, stream: bool = False):
+            done = called(llm_request)
+            if role == "segmentation_agent":
+                yield text(json.dumps(plan["segments"]))
+            elif role == "video_processing_agent":
+                if "video_clip_agent" not in done:
+                    yield call("video_clip_agent", {"request": "Clip the segments."})
+                elif "subtitles_agent" not in done:
+                    yield call("subtitles_agent", {"request": f"Subtitle the clips in {plan['clips_dir']}."})
+                else:
+                    yield text("All clips are cut and subtitled.")
+            elif role == "video_clip_agent" and "split_video" not in done:
+                yield call("split_video", {
+                    "segments": plan["segments"],
+                    "video_id": plan["video_id"],
+                    "output_dir": plan["clips_dir"],
+                    "max_workers": plan["workers"],
+                })
+            elif role == "subtitles_agent" and "generate_subtitles" not in done:
+                yield call("generate_subtitles", {"input_shorts_dir": plan["clips_dir"], "output_dir": plan["output_dir"]})
+            elif role == "video_download_agent" and "download_video" not in done:
+                yield call("download_video", {"video_id": plan["video_id"]})
+            else:
+                yield text("Done.")
+
+    return ScriptedLlm(model=f"scripted/{role}")
+
+
+def _llm_agents(agent):
+    if hasattr(agent, "model"):
+        yield agent
+    for sub_agent in agent.sub_agents:
+        yield from _llm_agents(sub_agent)
+    for tool in getattr(agent, "tools", None) or []:
+        if hasattr(tool, "agent"):
+            yield from _llm_agents(tool.agent)
+
+
+def summarize(metrics_path: str) -> dict:
+    """
+    Number of calls and summed wall/CPU seconds per stage, from the stage metrics.
+    """
+    stages = {}
+    with open(metrics_path, "r", encoding="utf-8") as f:
+        for line in f:
+            data = json.loads(line)
+            key = f"{data['kind']}:{data['stage']}"
+            entry = stages.setdefault(key, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "child_cpu_seconds": 0.0})
+            entry["calls"] += 1
+            for field in ("wall_seconds", "cpu_seconds", "child_cpu_seconds"):
+                entry[field] = round(entry[field] + data[field], 3)
+    return stages
+
+
+def run_once(args, duration: int) -> dict:
+    """
+    One end-to-end run through root_agent with InMemoryRunner, in this process.
+    """
+    import asyncio
+    import resource
+
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+
+    from agents import instrumentation, job_manifest
+    from agents.agent import root_agent
+    from agents.subtitles_agent import tools as subtitle_tools
+    from agents.transcript_agent import tools as transcript_tools
+    from agents.transcript_agent.cache import StaticTranscriptFetcher
+    from agents.video_editor_agent import tools as video_tools
+    from agents.video_editor_agent.clipper import find_ffmpeg
+    from agents.video_editor_agent.media_store import MediaStore
+
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        raise SystemExit("ffmpeg is required for this benchmark.")
+    source = source_video(ffmpeg, duration, args.size)
+
+    work_dir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    try:
+        video_id = f"bench{duration:06d}"[-11:].rjust(11, "0")
+        clips_dir = os.path.join(work_dir, "clips")
+        os.makedirs(clips_dir)
+        segments = make_segments(duration, args.segments, args.length)
+        for n, segment in enumerate(segments):
+            # Clip names are derived from the topic; unique ones keep the output folders apart
+            segment["topic"] = f"{video_id}_{n}"
+            segment["description"] = f"Synthetic segment {n}"
+        # generate_subtitles moves every subtitled clip into <output_dir>/<clip>_output
+        output_dir = os.path.join(work_dir, "out")
+        output_dirs = [os.path.join(output_dir, f"{segment['topic']}_output") for segment in segments]
+        plan = {
+            "segments": segments,
+            "video_id": video_id,
+            "clips_dir": clips_dir,
+            "output_dir": output_dir,
+            "workers": args.workers,
+        }
+
+        # "Download": the source is already in the media store, as after a real download
+        video_tools.media_store = MediaStore(os.path.join(work_dir, "media"), quota_bytes=None)
+        video_tools.media_store.fetch(video_id, video_tools.DOWNLOAD_PROFILE.key, lambda scratch: shutil.copy(source, scratch))
+        snippets = [view.to_dict() for view in synthetic_transcript(duration / 3600, punctuated=True)]
+        transcript_tools.transcript_fetcher = StaticTranscriptFetcher({video_id: snippets})
+        if not args.real_whisper:
+            subtitle_tools.get_whisper_model = lambda *key: FakeWhisperModel()
+        for agent in _llm_agents(root_agent):
+            agent.model = scripted_llm(agent.name, plan)
+
+        metrics_path = os.path.join(work_dir, "stage_metrics.jsonl")
+        instrumentation.STAGE_METRICS_PATH = metrics_path
+        # Fresh checkpoints, so every run does the full work
+        job_manifest.JOB_MANIFEST_DIR = os.path.join(work_dir, "jobs")
+
+        async def run():
+            runner = InMemoryRunner(agent=root_agent, app_name="bench_pipeline")
+            session = await runner.session_service.create_session(app_name="bench_pipeline", user_id="bench")
+            message = types.Content(role="user", parts=[types.Part(text=f"Make shorts from https://youtu.be/{video_id}")])
+            async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+                pass
+            return await runner.session_service.get_session(app_name="bench_pipeline", user_id="bench", session_id=session.id)
+
+        started = time.perf_counter()
+        session = asyncio.run(run())
+        elapsed = time.perf_counter() - started
+
+        stages = summarize(metrics_path)
+        subtitled = sum(1 for path in output_dirs if os.path.isdir(path))
+        clip_count = subtitled + sum(1 for name in os.listdir(clips_dir) if name.endswith(".mp4"))
+        self_usage = resource.getrusage(resource.RUSAGE_SELF)
+        child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        rss_scale = 1024 ** 2 if sys.platform == "darwin" else 1024
+        return {
+            "duration_seconds": duration,
+            "size": args.size,
+            "segments": len(segments),
+            "clip_seconds": args.length,
+            "workers": args.workers,
+            "clips": clip_count,
+            "subtitled_clips": subtitled,
+            "wall_seconds": round(elapsed, 3),
+            "clips_per_minute": round(clip_count / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            "peak_rss_mb": round(self_usage.ru_maxrss / rss_scale, 1),
+            "peak_child_rss_mb": round(child_usage.ru_maxrss / rss_scale, 1),
+            "realtime_factor": round(duration / elapsed, 1) if elapsed > 0 else 0.0,
+            "stages": stages,
+            "state_keys": sorted(session.state),
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=int, nargs="+", default=[600, 3600, 10800], help="Source lengths in seconds")
+    parser.add_argument("--size", default="640x360", help="Source resolution")
+    parser.add_argument("--segments", type=int, default=6)
+    parser.add_argument("--length", type=int, default=45, help="Clip length in seconds")
+    parser.add_argument("--workers", type=int, default=1, help="split_video max_workers")
+    parser.add_argument("--real-whisper", action="store_true", help="Use the configured Whisper model (must be cached locally)")
+    parser.add_argument("--output", default="", help="Also write all results to this JSON file")
+    parser.add_argument("--single", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single is not None:
+        print(json.dumps(run_once(args, args.single)))
+        return
+
+    results = []
+    for duration in args.durations:
+        command = [
+            sys.executable, "-m", "benchmarks.bench_pipeline", "--single", str(duration),
+            "--size", args.size, "--segments", str(args.segments), "--length", str(args.length),
+            "--workers", str(args.workers),
+        ]
+        if args.real_whisper:
+            command.append("--real-whisper")
+        completed = subprocess.run(command, cwd=_project_root, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(completed.stdout[-2000:] + completed.stderr[-2000:], file=sys.stderr)
+            raise SystemExit(f"Benchmark run for {duration}s failed.")
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(json.dumps(result))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmarks split_video with 1/2/4/8 workers on a synthetic testsrc/sine video.
+
+Usage:
+    python -m benchmarks.bench_split_video --duration 600 --segments 8 --workers 1 2 4 8
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from agents.video_editor_agent.clipper import find_ffmpeg
+from agents.video_editor_agent.tools import split_video
+
+
+def make_source(ffmpeg: str, path: str, duration: int, size: str) -> None:
+    subprocess.run([
+        ffmpeg, '-hide_banner', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', f"testsrc=size={size}:rate=30",
+        '-f', 'lavfi', '-i', "sine=frequency=440:sample_rate=44100",
+        '-t', str(duration), '-c:v', 'libx264', '-preset', 'ultrafast', '-g', '60',
+        '-c:a', 'aac', '-shortest', '-y', path,
+    ], check=True, capture_output=True)
+
+
+def make_segments(duration: int, count: int, length: int) -> list:
+    step = max(length + 10, duration // count)
+    segments = []
+    for n in range(count):
+        start = min(n * step + 5, max(0, duration - length - 5))
+        end = start + length
+        segments.append({
+            "topic": f"bench_{n}",
+            "start_time": f"{start // 60}:{start % 60:02d}",
+            "end_time": f"{end // 60}:{end % 60:02d}",
+        })
+    return segments
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=int, default=600, help="Source length in seconds")
+    parser.add_argument("--size", default="1280x720", help="Source resolution")
+    parser.add_argument("--segments", type=int, default=8)
+    parser.add_argument("--length", type=int, default=60, help="Clip length in seconds")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--encoder-threads", type=int, default=0)
+    args = parser.parse_args()
+
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        raise SystemExit("ffmpeg is required for this benchmark.")
+
+    work_dir = tempfile.mkdtemp(prefix="bench_split_")
+    cwd = os.getcwd()
+    try:
+        downloads = os.path.join(work_dir, "downloads")
+        os.makedirs(downloads)
+        source = os.path.join(downloads, "source.mp4")
+        make_source(ffmpeg, source, args.duration, args.size)
+        segments = make_segments(args.duration, args.segments, args.length)
+
+        os.chdir(work_dir)
+        for workers in args.workers:
+            started = time.perf_counter()
+            outputs = split_video(segments, max_workers=workers, encoder_threads=args.encoder_threads)
+            elapsed = time.perf_counter() - started
+            print(json.dumps({
+                "workers": workers,
+                "encoder_threads": args.encoder_threads,
+                "clips": len(outputs),
+                "seconds": round(elapsed, 3),
+                "clips_per_minute": round(len(outputs) / elapsed * 60, 2),
+            }))
+            for path in outputs:
+                os.remove(path)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
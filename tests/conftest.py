@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The agent modules read these at import time; no request ever leaves the machine
+os.environ.setdefault("GROQ_API_KEY", "offline-tests")
+os.environ.setdefault("GOOGLE_API_KEY", "offline-tests")
+os.environ.setdefault("STAGE_METRICS_PATH", "")
+os.environ.setdefault("TRANSCRIPT_CACHE_PATH", ":memory:")
+
+
+def make_snippets(count: int, seconds: float = 3.0, text=None) -> list:
+    """
+    Raw {"text", "start", "duration"} snippets, one every `seconds`; `text(i)` gives the
+    text of snippet i (a plain numbered sentence by default).
+    """
+    return [
+        {
+            "text": text(i) if text else f"this is snippet number {i} of the talk.",
+            "start": i * seconds,
+            "duration": seconds,
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def job_manifest_dir(tmp_path, monkeypatch):
+    from agents import job_manifest
+
+    directory = str(tmp_path / "jobs")
+    monkeypatch.setattr(job_manifest, "JOB_MANIFEST_DIR", directory)
+    return directory
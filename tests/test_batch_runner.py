@@ -0,0 +1,158 @@
+import asyncio
+import json
+
+import pytest
+
+from agents import batch_runner
+from agents.batch_runner import BatchRunner, resolve_video_ids
+from agents.transcript_agent.transcript import Transcript
+from conftest import make_snippets
+
+PLAYLIST_ID = "PLabcdefghij0123456789"
+CHANNEL_ID = "UC" + "a" * 22
+
+
+@pytest.fixture
+def listings(monkeypatch):
+    expanded = []
+
+    def expand(url):
+        expanded.append(url)
+        if "broken" in url:
+            raise RuntimeError("listing unavailable")
+        return ["aaaaaaaaaaa", "bbbbbbbbbbb"]
+
+    monkeypatch.setattr(batch_runner, "_expand_listing", expand)
+    return expanded
+
+
+def test_inputs_resolve_to_unique_video_ids_in_order(listings):
+    video_ids = resolve_video_ids([
+        "https://youtu.be/bbbbbbbbbbb",
+        "",
+        "# a comment",
+        PLAYLIST_ID,
+        "cccccccccc1",
+        "https://www.youtube.com/watch?v=cccccccccc1&t=30",
+    ])
+    assert video_ids == ["bbbbbbbbbbb", "aaaaaaaaaaa", "cccccccccc1"]
+    assert listings == [f"https://www.youtube.com/playlist?list={PLAYLIST_ID}"]
+
+
+@pytest.mark.parametrize("value, listing", [
+    (CHANNEL_ID, f"https://www.youtube.com/channel/{CHANNEL_ID}/videos"),
+    ("@somecreator", "https://www.youtube.com/@somecreator/videos"),
+    ("https://www.youtube.com/c/somecreator", "https://www.youtube.com/c/somecreator/videos"),
+    (f"https://www.youtube.com/playlist?list={PLAYLIST_ID}", f"https://www.youtube.com/playlist?list={PLAYLIST_ID}"),
+])
+def test_channels_and_playlists_are_expanded(listings, value, listing):
+    assert resolve_video_ids([value]) == ["aaaaaaaaaaa", "bbbbbbbbbbb"]
+    assert listings == [listing]
+
+
+def test_watch_urls_with_a_playlist_stay_single_videos_unless_asked(listings):
+    url = f"https://www.youtube.com/watch?v=ccccccccccc&list={PLAYLIST_ID}"
+    assert resolve_video_ids([url]) == ["ccccccccccc"]
+    assert listings == []
+    assert resolve_video_ids([url], expand_playlists=True) == ["aaaaaaaaaaa", "bbbbbbbbbbb"]
+
+
+def test_bad_inputs_are_reported_and_skipped(listings, capsys):
+    video_ids = resolve_video_ids([
+        "https://vimeo.com/12345",
+        "not a video",
+        "https://www.youtube.com/playlist?list=",
+        "https://www.youtube.com/@broken",
+        "ccccccccccc",
+    ])
+    assert video_ids == ["ccccccccccc"]
+    output = capsys.readouterr().out
+    assert "Skipping unrecognised input: https://vimeo.com/12345" in output
+    assert "Skipping unrecognised input: not a video" in output
+    assert "Skipping malformed input: no playlist ID" in output
+    assert "Failed to expand https://www.youtube.com/@broken: listing unavailable" in output
+
+
+@pytest.fixture
+def fake_pipeline(monkeypatch, tmp_path):
+    calls = {"download": [], "clip": []}
+    state = {"in_flight": 0, "peak": 0}
+    source = tmp_path / "source.mp4"
+    source.write_bytes(b"video bytes")
+
+    def download_video(video_id):
+        calls["download"].append(video_id)
+        return str(source)
+
+    async def split_video(segments, video_path, output_dir, video_id, **options):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        calls["clip"].append(video_id)
+        return [f"{output_dir}/clip.mp4"]
+
+    monkeypatch.setattr(batch_runner, "fetch_transcript", lambda video_id: Transcript.from_snippets(make_snippets(40)))
+    monkeypatch.setattr(batch_runner, "stored_audio_energy", lambda video_id: None)
+    monkeypatch.setattr(batch_runner, "download_video", download_video)
+    monkeypatch.setattr(batch_runner, "split_video", split_video)
+    monkeypatch.setattr(batch_runner, "generate_subtitles", lambda clips_dir, **options: {"srt_paths": [f"{clips_dir}.srt"]})
+    return calls, state, source
+
+
+async def generate(prompt: str) -> str:
+    return json.dumps([{"start_time": "00:10", "end_time": "00:40", "score": 90, "topic": "a moment"}])
+
+
+def run(runner: BatchRunner, video_ids: list) -> list:
+    return asyncio.run(runner.run(video_ids))
+
+
+def test_a_rerun_reuses_the_checkpointed_download(fake_pipeline, job_manifest_dir, tmp_path):
+    calls, _, source = fake_pipeline
+    options = {"manifest_path": str(tmp_path / "batch.jsonl"), "work_dir": str(tmp_path / "work"), "generate": generate}
+    first = run(BatchRunner(**options), ["aaaaaaaaaaa"])
+    second = run(BatchRunner(**options), ["aaaaaaaaaaa"])
+    assert first[0]["status"] == second[0]["status"] == "ok"
+    assert calls["download"] == ["aaaaaaaaaaa"]
+    assert second[0]["source"] == str(source)
+    assert "download" not in second[0]["stage_seconds"]
+
+    source.write_bytes(b"a different video")
+    run(BatchRunner(**options), ["aaaaaaaaaaa"])
+    assert calls["download"] == ["aaaaaaaaaaa", "aaaaaaaaaaa"]
+
+
+def test_in_flight_caps_the_videos_between_download_and_subtitles(fake_pipeline, tmp_path, monkeypatch):
+    calls, state, _ = fake_pipeline
+    monkeypatch.setattr(batch_runner.JobManifest, "for_job", classmethod(lambda cls, job_id: None))
+    runner = BatchRunner(
+        manifest_path=str(tmp_path / "batch.jsonl"),
+        work_dir=str(tmp_path / "work"),
+        concurrency={"clip": 4},
+        max_in_flight=2,
+        generate=generate,
+    )
+    video_ids = [f"video{i:06d}" for i in range(6)]
+    records = run(runner, video_ids)
+    assert [record["status"] for record in records] == ["ok"] * 6
+    assert sorted(calls["clip"]) == video_ids
+    assert state["peak"] == 2
+    lines = (tmp_path / "batch.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 6
+
+
+def test_a_failing_video_is_recorded_without_stopping_the_batch(fake_pipeline, tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_runner.JobManifest, "for_job", classmethod(lambda cls, job_id: None))
+
+    def fetch_transcript(video_id):
+        if video_id == "bad":
+            raise RuntimeError("no transcript")
+        return Transcript.from_snippets(make_snippets(40))
+
+    monkeypatch.setattr(batch_runner, "fetch_transcript", fetch_transcript)
+    runner = BatchRunner(manifest_path=str(tmp_path / "batch.jsonl"), work_dir=str(tmp_path / "work"), generate=generate)
+    good, bad = run(runner, ["good", "bad"])
+    assert good["status"] == "ok"
+    assert bad["status"] == "error"
+    assert bad["error"] == "RuntimeError: no transcript"
@@ -0,0 +1,78 @@
+from agents.transcript_agent.cache import CachedTranscriptFetcher, StaticTranscriptFetcher, TranscriptCache
+from agents.transcript_agent.chunker import chunk_transcript, estimate_tokens, merge_snippets
+from agents.transcript_agent.transcript import Transcript
+from conftest import make_snippets
+
+
+def fetch(snippets) -> Transcript:
+    fetcher = CachedTranscriptFetcher(StaticTranscriptFetcher({"video": snippets}), TranscriptCache(":memory:"))
+    return Transcript.from_snippets(fetcher.fetch("video"))
+
+
+def dense_and_sparse(paragraphs: int = 20) -> list:
+    """
+    Five 3 s snippets per paragraph; odd paragraphs are dense speech, even ones a few
+    hesitant words.
+    """
+    def text(i):
+        paragraph, last = divmod(i, 5)[0], i % 5 == 4
+        if paragraph % 2:
+            words = " ".join(f"dense{paragraph}w{n}" for n in range(12))
+        else:
+            words = f"um well sparse{paragraph}"
+        return words + ("." if last else "")
+
+    return make_snippets(paragraphs * 5, text=text)
+
+
+def test_snippets_merge_into_paragraphs_at_sentence_ends():
+    paragraphs = merge_snippets(fetch(make_snippets(20)), min_paragraph_seconds=15.0)
+    assert [(start, end) for start, end, _ in paragraphs] == [(0.0, 15.0), (15.0, 30.0), (30.0, 45.0), (45.0, 60.0)]
+
+
+def test_paragraphs_are_force_closed_at_the_maximum_length():
+    snippets = make_snippets(40, text=lambda i: f"no punctuation {i}")
+    paragraphs = merge_snippets(fetch(snippets), max_paragraph_seconds=45.0)
+    assert all(end - start <= 45.0 for start, end, _ in paragraphs)
+    assert paragraphs[-1][1] == 120.0
+
+
+def test_output_is_one_timestamped_line_per_paragraph():
+    text = chunk_transcript(fetch(make_snippets(10)))
+    lines = text.splitlines()
+    assert lines[0].startswith("[0:00-0:15] this is snippet number 0")
+    assert lines[1].startswith("[0:15-0:30] ")
+
+
+def test_under_budget_the_transcript_is_unchanged():
+    transcript = fetch(dense_and_sparse())
+    assert chunk_transcript(transcript, token_budget=10 ** 6) == chunk_transcript(transcript)
+
+
+def test_over_budget_whole_low_value_paragraphs_are_dropped():
+    transcript = fetch(dense_and_sparse())
+    full = chunk_transcript(transcript).splitlines()
+    budget = estimate_tokens("\n".join(full)) // 2
+    condensed = chunk_transcript(transcript, token_budget=budget)
+    lines = condensed.splitlines()
+
+    assert estimate_tokens(condensed) <= budget
+    # Kept paragraphs are intact, in timeline order, and the hesitant ones went first
+    assert all(line in full for line in lines)
+    assert lines == sorted(lines, key=full.index)
+    assert not any("sparse" in line for line in lines)
+    assert any("dense" in line for line in lines)
+
+
+def test_a_single_paragraph_over_budget_is_cut_to_the_budget():
+    condensed = chunk_transcript(fetch(dense_and_sparse(2)), token_budget=20)
+    assert estimate_tokens(condensed) <= 20
+    assert condensed.endswith("…")
+
+
+def test_only_disfluencies_are_removed_when_condensing():
+    snippets = make_snippets(10, text=lambda i: "um so it is kind of uh like I mean the point." if i == 0 else "x " * 40)
+    condensed = chunk_transcript(fetch(snippets), token_budget=estimate_tokens(chunk_transcript(fetch(snippets))) - 1)
+    assert "so it is kind of like I mean the point." in condensed
+    assert "um " not in condensed and "uh " not in condensed
+
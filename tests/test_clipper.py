@@ -0,0 +1,89 @@
+import pytest
+
+from agents.video_editor_agent import clipper
+from agents.video_editor_agent.clipper import (
+    ClipJob,
+    build_copy_command,
+    copy_segments,
+    next_keyframe,
+    plan_smart_cut,
+    snap_to_keyframe,
+)
+
+# A 2 s GOP with one irregular keyframe, as probe_keyframes would return it
+KEYFRAMES = [0.0, 2.0, 4.0, 6.0, 7.5, 9.5]
+
+
+def job(index: int, start: float, end: float) -> ClipJob:
+    return ClipJob(index=index, topic=f"clip {index}", start=start, end=end, output_path=f"/out/clip{index}.mp4")
+
+
+@pytest.mark.parametrize("t, snapped", [
+    (0.0, 0.0),
+    (1.99, 0.0),
+    (2.0, 2.0),
+    # Float noise just under a keyframe still counts as on it
+    (3.9999999, 4.0),
+    (7.4, 6.0),
+    (100.0, 9.5),
+])
+def test_snap_to_keyframe(t, snapped):
+    assert snap_to_keyframe(KEYFRAMES, t) == snapped
+
+
+def test_snap_without_keyframes_falls_back_to_the_start():
+    assert snap_to_keyframe([], 12.0) == 0.0
+    assert snap_to_keyframe([5.0], 3.0) == 0.0
+
+
+@pytest.mark.parametrize("t, following", [
+    (0.0, 0.0),
+    (0.1, 2.0),
+    (4.0, 4.0),
+    (4.0000001, 4.0),
+    (6.5, 7.5),
+    (9.6, None),
+])
+def test_next_keyframe(t, following):
+    assert next_keyframe(KEYFRAMES, t) == following
+
+
+@pytest.mark.parametrize("start, end, plan", [
+    # Starts on a keyframe: a plain stream copy is already frame-accurate
+    (4.0, 8.0, ("copy", None)),
+    (4.0004, 8.0, ("copy", None)),
+    # Clip inside one GOP: nothing to copy
+    (2.5, 3.5, ("encode", None)),
+    (2.5, 4.0, ("encode", None)),
+    # Past the last keyframe
+    (9.6, 12.0, ("encode", None)),
+    # Re-encode the head up to the next keyframe, copy the rest
+    (2.5, 8.0, ("split", 4.0)),
+    (6.2, 9.0, ("split", 7.5)),
+])
+def test_plan_smart_cut(start, end, plan):
+    assert plan_smart_cut(KEYFRAMES, start, end) == plan
+
+
+def test_copy_segments_seeks_every_clip_to_its_preceding_keyframe(monkeypatch):
+    commands = []
+    monkeypatch.setattr(clipper, "run_process", commands.append)
+    jobs = [job(0, 3.0, 10.0), job(1, 6.0, 9.0)]
+    assert copy_segments("ffmpeg", "/src.mp4", jobs, KEYFRAMES) == ["/out/clip0.mp4", "/out/clip1.mp4"]
+
+    [cmd] = commands
+    seeks = [(cmd[i + 1], cmd[i + 3]) for i, arg in enumerate(cmd) if arg == "-ss"]
+    # The start moves back to the keyframe, the end stays where it was
+    assert seeks == [("2.000", "8.000"), ("6.000", "3.000")]
+    assert cmd.count("-i") == 2
+    assert [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-map"] == ["0:v:0", "0:a?", "1:v:0", "1:a?"]
+    # The jobs themselves are not modified
+    assert jobs[0].start == 3.0
+
+
+def test_copy_command_without_clips_runs_nothing(monkeypatch):
+    commands = []
+    monkeypatch.setattr(clipper, "run_process", commands.append)
+    assert copy_segments("ffmpeg", "/src.mp4", [], KEYFRAMES) == []
+    assert commands == []
+    assert build_copy_command("ffmpeg", "/src.mp4", [job(0, 1.0, 2.5)])[-1] == "/out/clip0.mp4"
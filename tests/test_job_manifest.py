@@ -0,0 +1,82 @@
+import os
+import shutil
+
+from agents import job_manifest
+from agents.job_manifest import JobManifest, media_fingerprint, text_hash
+
+INPUTS = {"source": "abc", "start": 10.0, "end": 40.0, "mode": "encode"}
+
+
+def write(path, content: bytes) -> str:
+    with open(path, "wb") as f:
+        f.write(content)
+    return str(path)
+
+
+def test_disabled_without_a_directory(monkeypatch):
+    monkeypatch.setattr(job_manifest, "JOB_MANIFEST_DIR", "")
+    assert JobManifest.for_job("abc") is None
+
+
+def test_job_ids_become_safe_file_names(job_manifest_dir):
+    manifest = JobManifest.for_job("source/../x y")
+    assert os.path.dirname(manifest.path) == job_manifest_dir
+    assert os.path.basename(manifest.path) == "source_.._x_y.json"
+
+
+def test_completed_stage_is_reused_with_the_same_inputs(job_manifest_dir, tmp_path):
+    clip = write(tmp_path / "clip.mp4", b"clip bytes")
+    JobManifest.for_job("abc").complete("clip:1", INPUTS, {"path": clip}, files=[clip])
+    # A fresh instance, as in a rerun
+    assert JobManifest.for_job("abc").completed("clip:1", dict(INPUTS)) == {"path": clip}
+
+
+def test_changed_inputs_invalidate_the_stage(job_manifest_dir, tmp_path):
+    manifest = JobManifest.for_job("abc")
+    manifest.complete("clip:1", INPUTS, {"path": "x"})
+    assert manifest.completed("clip:1", {**INPUTS, "end": 41.0}) is None
+    assert manifest.completed("clip:2", INPUTS) is None
+
+
+def test_changed_or_missing_files_invalidate_the_stage(job_manifest_dir, tmp_path):
+    manifest = JobManifest.for_job("abc")
+    clip = write(tmp_path / "clip.mp4", b"clip bytes")
+    manifest.complete("clip:1", INPUTS, files=[clip])
+
+    write(clip, b"other, longer clip bytes")
+    assert manifest.completed("clip:1", INPUTS) is None
+
+    manifest.complete("clip:1", INPUTS, files=[clip])
+    assert manifest.completed("clip:1", INPUTS) == {}
+    os.remove(clip)
+    assert manifest.completed("clip:1", INPUTS) is None
+
+
+def test_invalidate_drops_only_that_stage(job_manifest_dir):
+    manifest = JobManifest.for_job("abc")
+    manifest.complete("segments", {"transcript": "t"}, {"segments": [1]})
+    manifest.complete("clip:1", INPUTS, {"path": "x"})
+    manifest.invalidate("segments")
+    assert manifest.completed("segments", {"transcript": "t"}) is None
+    assert manifest.completed("clip:1", INPUTS) == {"path": "x"}
+
+
+def test_relocated_files_stay_valid(job_manifest_dir, tmp_path):
+    manifest = JobManifest.for_job("abc")
+    clip = write(tmp_path / "clip.mp4", b"clip bytes")
+    manifest.complete("clip:1", INPUTS, {"path": os.path.abspath(clip)}, files=[clip])
+
+    moved = str(tmp_path / "moved.mp4")
+    shutil.move(clip, moved)
+    assert manifest.completed("clip:1", INPUTS) is None
+    manifest.relocate(clip, moved)
+    assert manifest.completed("clip:1", INPUTS) == {"path": os.path.abspath(moved)}
+
+
+def test_hashes_follow_content(tmp_path):
+    assert text_hash({"a": 1, "b": 2}) == text_hash({"b": 2, "a": 1})
+    first = write(tmp_path / "a.bin", b"x" * 100)
+    second = write(tmp_path / "b.bin", b"x" * 100)
+    assert media_fingerprint(first) == media_fingerprint(second)
+    write(second, b"y" * 101)
+    assert media_fingerprint(first) != media_fingerprint(second)
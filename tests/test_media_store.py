@@ -0,0 +1,105 @@
+import os
+
+import pytest
+
+from agents.video_editor_agent.media_store import ENTRY_FILE, MediaStore, format_key
+
+
+class FakeFetch:
+    """
+    Stands in for a yt-dlp download: writes `size` bytes into the scratch dir.
+    """
+
+    def __init__(self, size: int = 100, fail: bool = False):
+        self.size = size
+        self.fail = fail
+        self.calls = 0
+
+    def __call__(self, scratch_dir: str) -> str:
+        self.calls += 1
+        path = os.path.join(scratch_dir, "video.mp4")
+        with open(path, "wb") as f:
+            f.write(b"x" * self.size)
+        if self.fail:
+            raise RuntimeError("connection reset")
+        return path
+
+
+def set_last_used(store: MediaStore, video_id: str, fmt: str, when: float) -> None:
+    os.utime(os.path.join(store.root, video_id, format_key(fmt), ENTRY_FILE), (when, when))
+
+
+def test_a_hit_does_not_fetch_again(tmp_path):
+    store = MediaStore(str(tmp_path))
+    fetch = FakeFetch()
+    first = store.fetch("abc", "720p", fetch)
+    second = store.fetch("abc", "720p", fetch)
+    assert first == second == store.lookup("abc", "720p")
+    assert fetch.calls == 1
+    with open(first, "rb") as f:
+        assert len(f.read()) == 100
+
+
+def test_formats_are_stored_separately(tmp_path):
+    store = MediaStore(str(tmp_path))
+    fetch = FakeFetch()
+    assert store.fetch("abc", "720p", fetch) != store.fetch("abc", "1080p", fetch)
+    assert fetch.calls == 2
+    assert store.lookup("abc", "480p") is None
+
+
+def test_the_quota_evicts_the_least_recently_used_entries(tmp_path):
+    store = MediaStore(str(tmp_path), quota_bytes=250)
+    for n, video_id in enumerate(("old", "used", "new")):
+        store.fetch(video_id, "720p", FakeFetch())
+        set_last_used(store, video_id, "720p", 1000.0 + n)
+    # Over the quota with three: the oldest one went when the third arrived
+    assert store.lookup("old", "720p") is None
+    assert not os.path.exists(os.path.join(str(tmp_path), "old"))
+
+    set_last_used(store, "new", "720p", 2000.0)
+    set_last_used(store, "used", "720p", 3000.0)
+    store.fetch("newest", "720p", FakeFetch())
+    assert [entry["video_id"] for entry in store.entries()] == ["used", "newest"]
+
+
+def test_the_entry_just_fetched_is_kept_even_over_the_quota(tmp_path):
+    store = MediaStore(str(tmp_path), quota_bytes=50)
+    path = store.fetch("big", "720p", FakeFetch(size=100))
+    assert os.path.exists(path)
+    assert store.evict() == 100
+    assert store.lookup("big", "720p") is None
+
+
+def test_a_locked_entry_is_not_evicted(tmp_path):
+    store = MediaStore(str(tmp_path), quota_bytes=None)
+    store.fetch("busy", "720p", FakeFetch())
+    store.quota_bytes = 0
+    with store._lock("busy", "720p"):
+        assert store.evict() == 0
+    assert store.lookup("busy", "720p") is not None
+
+
+def test_a_partial_download_is_not_published(tmp_path):
+    store = MediaStore(str(tmp_path))
+    with pytest.raises(RuntimeError, match="connection reset"):
+        store.fetch("abc", "720p", FakeFetch(fail=True))
+    assert store.lookup("abc", "720p") is None
+    assert store.entries() == []
+    assert os.listdir(os.path.join(str(tmp_path), ".tmp")) == []
+
+    fetch = FakeFetch()
+    assert os.path.exists(store.fetch("abc", "720p", fetch))
+    assert fetch.calls == 1
+
+
+def test_a_leftover_without_entry_file_is_replaced(tmp_path):
+    store = MediaStore(str(tmp_path))
+    leftover = os.path.join(str(tmp_path), "abc", format_key("720p"))
+    os.makedirs(leftover)
+    with open(os.path.join(leftover, "video.mp4.part"), "wb") as f:
+        f.write(b"half")
+    assert store.lookup("abc", "720p") is None
+    path = store.fetch("abc", "720p", FakeFetch())
+    assert sorted(os.listdir(leftover)) == [ENTRY_FILE, "video.mp4"]
+    assert os.path.dirname(path) == leftover
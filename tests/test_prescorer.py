@@ -0,0 +1,117 @@
+import wave
+
+import numpy as np
+
+from agents.segmentation_agent.prescorer import (
+    HOOK_PATTERN,
+    audio_energy_per_second,
+    decode_audio_energy,
+    score_windows,
+    shortlist_text,
+    shortlist_windows,
+    slice_transcript,
+)
+from agents.segmentation_agent.windowed import split_blocks
+from agents.transcript_agent.transcript import Transcript
+from conftest import make_snippets
+
+
+def transcript_with(lines: dict, count: int = 100) -> Transcript:
+    """
+    A plain 3 s-per-snippet talk with the snippets in `lines` (index -> text) replaced.
+    """
+    return Transcript.from_snippets(make_snippets(count, text=lambda i: lines.get(i, f"we talk about topic {i} today")))
+
+
+def test_hooks_match_whole_words_only():
+    assert HOOK_PATTERN.findall("Nevertheless it is always-on, imagine that") == ["always", "imagine"]
+    assert HOOK_PATTERN.findall("the reasoning is crazyish") == []
+
+
+def test_hook_phrases_outrank_a_pile_of_questions():
+    transcript = transcript_with({
+        10: "what? why? how? who? when? where?",
+        60: "here's why the biggest mistake is one nobody talks about",
+    })
+    (start, end, _), = shortlist_windows(transcript, top_k=1, window_lengths=(30.0,))
+    assert start <= 180.0 < end
+
+
+def test_a_question_still_counts_as_a_hook():
+    plain = transcript_with({})
+    asking = transcript_with({40: "so do you know what happened next?"})
+    _, _, plain_scores = score_windows(plain, window_lengths=(30.0,))
+    starts, _, asking_scores = score_windows(asking, window_lengths=(30.0,))
+    opening = int(np.searchsorted(starts, 120.0))
+    assert asking_scores[opening] > plain_scores[opening]
+
+
+def test_windows_without_speech_are_never_shortlisted():
+    snippets = make_snippets(40) + [{"text": "", "start": 200.0 + i * 3, "duration": 3.0} for i in range(40)]
+    _, _, scores = score_windows(Transcript.from_snippets(snippets), window_lengths=(30.0,))
+    assert np.isneginf(scores).any()
+    for start, end, _ in shortlist_windows(Transcript.from_snippets(snippets), top_k=20, window_lengths=(30.0,)):
+        assert start < 120.0
+
+
+def test_shortlisted_windows_do_not_overlap_much():
+    candidates = shortlist_windows(transcript_with({}, count=400), top_k=6, max_overlap=0.3)
+    for i, (a_start, a_end, _) in enumerate(candidates):
+        for b_start, b_end, _ in candidates[i + 1:]:
+            shared = min(a_end, b_end) - max(a_start, b_start)
+            assert shared <= 0.3 * min(a_end - a_start, b_end - b_start) + 1e-9
+
+
+def test_shortlist_text_is_one_block_per_candidate_in_timeline_order():
+    transcript = transcript_with({30: "the truth is nobody talks about this", 300: "imagine you never had to stop doing it"}, count=400)
+    blocks = split_blocks(shortlist_text(transcript, top_k=2))
+    assert len(blocks) == 2
+    assert blocks[0][0][0] < blocks[1][0][0]
+
+
+def test_slice_keeps_the_rows_starting_in_range():
+    sliced = slice_transcript(transcript_with({}), 30.0, 60.0)
+    assert list(sliced.starts) == [30.0 + 3 * i for i in range(10)]
+
+
+def test_energy_is_the_rms_of_every_full_second():
+    samples = np.concatenate((np.full(4, 0.5), np.full(4, -0.25), np.full(3, 1.0)))
+    assert audio_energy_per_second(samples, 4).tolist() == [0.5, 0.25]
+    assert len(audio_energy_per_second(samples[:3], 4)) == 0
+
+
+def test_loud_stretch_wins_when_the_words_are_alike():
+    transcript = transcript_with({})
+    energy = np.full(300, 0.05)
+    energy[150:180] = 0.6
+    best = shortlist_windows(transcript, top_k=1, window_lengths=(30.0,), audio_energy=energy)[0]
+    assert best[0] == 150.0
+    silent_weight = shortlist_windows(
+        transcript, top_k=1, window_lengths=(30.0,), audio_energy=energy, weights={"energy": 0.0},
+    )[0]
+    assert silent_weight[0] != 150.0
+
+
+def test_energy_breaks_a_tie_between_equal_hooks():
+    transcript = transcript_with({10: "the truth is nobody talks about this", 70: "the truth is nobody talks about this"})
+    energy = np.full(300, 0.05)
+    energy[210:240] = 0.6
+    best = shortlist_windows(transcript, top_k=1, window_lengths=(30.0,), audio_energy=energy)[0]
+    assert best[0] <= 210.0 < best[1]
+
+
+def test_audio_energy_is_decoded_from_the_media_file(tmp_path):
+    rate = 8000
+    quiet = np.full(rate * 2, 1000, dtype=np.int16)
+    loud = np.full(rate, 16000, dtype=np.int16)
+    path = str(tmp_path / "tone.wav")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(np.concatenate((quiet, loud, quiet)).tobytes())
+
+    energy = decode_audio_energy(path)
+    assert len(energy) == 5
+    assert np.argmax(energy) == 2
+    assert energy[2] > 10 * energy[0]
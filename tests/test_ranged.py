@@ -0,0 +1,75 @@
+import pytest
+
+from agents.video_editor_agent.ranged import (
+    Fragment,
+    find_fragment,
+    match_fragments,
+    merge_ranges,
+    read_fragment_index,
+    write_fragment_index,
+)
+
+
+@pytest.mark.parametrize("ranges, options, merged", [
+    ([], {}, []),
+    ([(10.2, 20.7)], {"padding": 0.0}, [(10.0, 21.0)]),
+    ([(10.0, 20.0)], {"padding": 3.0}, [(7.0, 23.0)]),
+    ([(1.0, 5.0)], {"padding": 3.0}, [(0.0, 8.0)]),
+    # Overlapping, then nearby (gap below join_gap), then far apart
+    ([(100.0, 130.0), (10.0, 40.0), (30.0, 60.0), (65.0, 80.0)], {"padding": 0.0, "join_gap": 10.0}, [(10.0, 80.0), (100.0, 130.0)]),
+    ([(10.0, 20.0), (31.0, 40.0)], {"padding": 0.0, "join_gap": 10.0}, [(10.0, 20.0), (31.0, 40.0)]),
+    ([(10.0, 20.0), (30.0, 40.0)], {"padding": 0.0, "join_gap": 10.0}, [(10.0, 40.0)]),
+    # Contained ranges do not shrink the outer one
+    ([(0.0, 100.0), (10.0, 20.0)], {"padding": 0.0}, [(0.0, 100.0)]),
+    # Clamped to the duration; ranges past the end vanish
+    ([(50.0, 58.0), (70.0, 80.0)], {"padding": 3.0, "duration": 59.5}, [(47.0, 60.0)]),
+    ([(5.0, 5.0)], {"padding": 0.0}, []),
+])
+def test_merge_ranges(ranges, options, merged):
+    assert merge_ranges(ranges, **options) == merged
+
+
+def test_merged_ranges_cover_every_padded_segment():
+    segments = [(12.5, 40.0), (41.0, 43.0), (300.0, 345.5), (600.0, 610.0)]
+    merged = merge_ranges(segments, padding=3.0)
+    for start, end in segments:
+        assert any(m_start <= start - 3.0 and end + 3.0 <= m_end for m_start, m_end in merged)
+    assert all(a[1] < b[0] for a, b in zip(merged, merged[1:]))
+
+
+def section(tmp_path, start: float, end: float, exists: bool = True) -> dict:
+    path = tmp_path / f"abc.{int(start)}-{int(end)}.mp4"
+    if exists:
+        path.write_bytes(b"fragment")
+    return {"section_start": start, "section_end": end, "filepath": str(path)}
+
+
+def test_sections_are_matched_to_ranges_by_their_bounds(tmp_path):
+    ranges = [(0.0, 30.0), (100.0, 140.0)]
+    # yt-dlp does not promise to report the sections in request order
+    fragments = match_fragments([section(tmp_path, 100.0, 140.0), section(tmp_path, 0.0, 30.0)], ranges)
+    assert fragments == [
+        Fragment(path="abc.0-30.mp4", start=0.0, end=30.0),
+        Fragment(path="abc.100-140.mp4", start=100.0, end=140.0),
+    ]
+
+
+@pytest.mark.parametrize("sections, message", [
+    (lambda tmp: [section(tmp, 0.0, 30.0)], "1 sections for 2 ranges"),
+    (lambda tmp: [section(tmp, 0.0, 30.0), section(tmp, 100.0, 140.0), section(tmp, 200.0, 210.0)], "3 sections for 2 ranges"),
+    (lambda tmp: [section(tmp, 0.0, 30.0), section(tmp, 100.0, 150.0)], "no section for 100-140s"),
+    (lambda tmp: [section(tmp, 0.0, 30.0), section(tmp, 0.0, 30.0)], "section 0-30s twice"),
+    (lambda tmp: [section(tmp, 0.0, 30.0), section(tmp, 100.0, 140.0, exists=False)], "100-140s was not downloaded"),
+])
+def test_sections_that_do_not_pair_up_raise(tmp_path, sections, message):
+    with pytest.raises(RuntimeError, match=message):
+        match_fragments(sections(tmp_path), [(0.0, 30.0), (100.0, 140.0)])
+
+
+def test_fragment_index_round_trip_and_lookup(tmp_path):
+    index_path = str(tmp_path / "abc.fragments.json")
+    write_fragment_index(index_path, "abc", [Fragment(path="b.mp4", start=100.0, end=140.0), Fragment(path="a.mp4", start=0.0, end=30.0)])
+    fragments = read_fragment_index(index_path)
+    assert [fragment.path for fragment in fragments] == [str(tmp_path / "a.mp4"), str(tmp_path / "b.mp4")]
+    assert find_fragment(fragments, 105.0, 140.0).start == 100.0
+    assert find_fragment(fragments, 25.0, 35.0) is None
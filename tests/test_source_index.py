@@ -0,0 +1,85 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from agents.subtitles_agent import source_index
+from agents.subtitles_agent.source_index import SourceTranscript, load_source_transcript
+
+
+def words(start: float, *texts: str) -> list:
+    return [(start + i, start + i + 1.0, f" {text}") for i, text in enumerate(texts)]
+
+
+@pytest.fixture
+def transcript() -> SourceTranscript:
+    return SourceTranscript([
+        (10.0, 13.0, "three words here", words(10.0, "three", "words", "here")),
+        (0.0, 2.0, "hello there", words(0.0, "hello", "there")),
+        (4.0, 20.0, "a long overlapping line", words(4.0, "a", "long", "overlapping", "line")),
+        (30.0, 31.0, "much later", words(30.0, "much later")),
+    ])
+
+
+def test_whole_segments_inside_the_window_are_rebased(transcript):
+    assert transcript.cues_between(9.0, 14.0) == [(1.0, 4.0, "three words here")]
+    assert transcript.cues_between(0.0, 2.0) == [(0.0, 2.0, "hello there")]
+
+
+def test_cut_segments_keep_the_words_whose_midpoint_is_inside(transcript):
+    # "a" 4-5 and "long" 5-6 have their midpoints before the window start
+    assert transcript.cues_between(5.75, 9.0) == [(0.25, 2.25, "overlapping line")]
+    # "hello" 0-1 is in, "there" 1-2 has its midpoint past the end
+    assert transcript.cues_between(0.0, 1.4) == [(0.0, 1.0, "hello")]
+
+
+def test_windows_without_speech_are_empty(transcript):
+    assert transcript.cues_between(21.0, 29.0) == []
+    assert transcript.cues_between(40.0, 50.0) == []
+
+
+def test_a_long_earlier_segment_is_found_past_shorter_ones():
+    transcript = SourceTranscript([
+        (0.0, 30.0, "long talk", [(0.0, 1.0, " long"), (11.0, 12.0, " talk")]),
+        (5.0, 6.0, "short", words(5.0, "short")),
+    ])
+    assert transcript.cues_between(10.0, 13.0) == [(1.0, 2.0, "talk")]
+
+
+def test_segments_between_rebases_word_timings(transcript):
+    [(_, _, _, timed)] = transcript.segments_between(9.0, 14.0)
+    assert timed == [(1.0, 2.0, " three"), (2.0, 3.0, " words"), (3.0, 4.0, " here")]
+
+
+def test_dict_round_trip(transcript):
+    restored = SourceTranscript.from_dict(transcript.to_dict())
+    assert restored.cues_between(0.0, 40.0) == transcript.cues_between(0.0, 40.0)
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, **options):
+        self.calls.append(audio)
+        segment = SimpleNamespace(start=0.0, end=1.0, text=" hi ", words=[SimpleNamespace(start=0.0, end=1.0, word=" hi")])
+        return iter([segment]), None
+
+
+def test_sources_are_transcribed_once_from_their_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(source_index, "_index_cache", source_index.OrderedDict())
+    monkeypatch.setattr(source_index, "SOURCE_INDEX_CACHE_SIZE", 2)
+    model = FakeModel()
+    paths = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / f"{name}.mp4"
+        path.write_bytes(b"not really a video")
+        paths.append(str(path))
+        assert load_source_transcript(str(path), model).cues_between(0.0, 1.0) == [(0.0, 1.0, "hi")]
+
+    assert model.calls == paths
+    assert list(source_index._index_cache) == [os.path.abspath(path) for path in paths[1:]]
+    # The evicted index comes back from its file next to the source, not a new transcription
+    load_source_transcript(paths[0], model)
+    assert model.calls == paths
+    assert len(source_index._index_cache) == 2
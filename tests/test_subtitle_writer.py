@@ -0,0 +1,130 @@
+import asyncio
+import threading
+
+import pytest
+
+from agents.subtitles_agent.writer import (
+    SubtitleWriter,
+    format_timestamp,
+    reflow,
+    srt_to_vtt,
+    stream_subtitles,
+    wrap_lines,
+)
+
+
+@pytest.mark.parametrize("seconds, srt, vtt", [
+    (0.0, "00:00:00,000", "00:00:00.000"),
+    (-1.0, "00:00:00,000", "00:00:00.000"),
+    (1.9996, "00:00:02,000", "00:00:02.000"),
+    (61.25, "00:01:01,250", "00:01:01.250"),
+    (3723.004, "01:02:03,004", "01:02:03.004"),
+])
+def test_timestamps(seconds, srt, vtt):
+    assert format_timestamp(seconds) == srt
+    assert format_timestamp(seconds, separator=".") == vtt
+
+
+def test_writer_numbers_srt_cues_and_writes_matching_webvtt(tmp_path):
+    srt_path, vtt_path = tmp_path / "clip.srt", tmp_path / "clip.vtt"
+    with SubtitleWriter(str(srt_path), str(vtt_path)) as writer:
+        assert writer.write_all([(0.0, 1.5, "Hello there"), (1.5, 3.0, "second\nline")]) == 2
+
+    assert srt_path.read_text(encoding="utf-8") == (
+        "1\n00:00:00,000 --> 00:00:01,500\nHello there\n\n"
+        "2\n00:00:01,500 --> 00:00:03,000\nsecond\nline\n\n"
+    )
+    assert vtt_path.read_text(encoding="utf-8") == (
+        "WEBVTT\n\n"
+        "00:00:00.000 --> 00:00:01.500\nHello there\n\n"
+        "00:00:01.500 --> 00:00:03.000\nsecond\nline\n\n"
+    )
+
+
+def test_srt_to_vtt_matches_the_writer(tmp_path):
+    cues = [(0.0, 1.0, "one"), (1.0, 2.5, "two\nlines"), (3600.0, 3601.0, "an hour in")]
+    with SubtitleWriter(str(tmp_path / "a.srt"), str(tmp_path / "a.vtt")) as writer:
+        writer.write_all(cues)
+    assert srt_to_vtt(str(tmp_path / "a.srt"), str(tmp_path / "b.vtt")) == 3
+    assert (tmp_path / "b.vtt").read_text(encoding="utf-8") == (tmp_path / "a.vtt").read_text(encoding="utf-8")
+
+
+def test_wrap_lines_keeps_long_words_whole():
+    assert wrap_lines("a quick brown fox", 7) == ["a quick", "brown", "fox"]
+    assert wrap_lines("supercalifragilistic is long", 10) == ["supercalifragilistic", "is long"]
+
+
+def test_reflow_splits_long_cues_into_two_line_captions():
+    text = "one two three four five six seven eight nine ten eleven twelve"
+    cues = list(reflow([(0.0, 12.0, text)], max_line_chars=10, max_lines=2))
+    assert len(cues) > 1
+    assert all(len(cue[2].split("\n")) <= 2 for cue in cues)
+    assert all(len(line) <= 10 for cue in cues for line in cue[2].split("\n"))
+    assert cues[0][0] == 0.0 and cues[-1][1] == pytest.approx(12.0)
+    assert all(a[1] == pytest.approx(b[0]) for a, b in zip(cues, cues[1:]))
+    assert " ".join(" ".join(cue[2].split("\n")) for cue in cues) == text
+
+
+def test_reflow_keeps_fast_captions_up_longer_but_not_past_the_next_one():
+    cues = list(reflow([(0.0, 0.5, "twenty characters!!!"), (1.0, 2.0, "next"), (5.0, 5.1, "last one")], max_cps=10.0))
+    assert cues[0] == (0.0, 1.0, "twenty characters!!!")
+    assert cues[1] == (1.0, 2.0, "next")
+    assert cues[2] == (5.0, 5.1, "last one")
+
+
+def test_reflow_drops_empty_cues_and_normalises_spaces():
+    assert list(reflow([(0.0, 1.0, "  "), (1.0, 2.0, " a   b ")])) == [(1.0, 2.0, "a b")]
+
+
+def test_stream_subtitles_yields_cues_while_they_are_decoded(tmp_path):
+    first_seen = threading.Event()
+    waited = []
+
+    def decode():
+        # Stands in for faster-whisper: the rest is only decoded once the first cue arrived
+        yield (0.0, 1.0, "cue 0")
+        waited.append(first_seen.wait(timeout=5))
+        yield (1.0, 2.0, "cue 1")
+        yield (2.0, 3.0, "cue 2")
+
+    async def collect():
+        seen = []
+        async for cue in stream_subtitles(decode(), str(tmp_path / "live.srt"), str(tmp_path / "live.vtt")):
+            seen.append(cue)
+            first_seen.set()
+        return seen
+
+    assert asyncio.run(collect()) == [(0.0, 1.0, "cue 0"), (1.0, 2.0, "cue 1"), (2.0, 3.0, "cue 2")]
+    assert waited == [True]
+    assert (tmp_path / "live.srt").read_text(encoding="utf-8").count(" --> ") == 3
+    assert (tmp_path / "live.vtt").read_text(encoding="utf-8").startswith("WEBVTT\n\n")
+
+
+def test_stream_subtitles_stops_decoding_when_the_consumer_stops(tmp_path):
+    decoded = []
+
+    def decode():
+        for i in range(1000):
+            decoded.append(i)
+            yield (float(i), i + 1.0, f"cue {i}")
+
+    async def first_two():
+        stream = stream_subtitles(decode(), str(tmp_path / "live.srt"))
+        seen = [await stream.__anext__(), await stream.__anext__()]
+        await stream.aclose()
+        return seen
+
+    assert len(asyncio.run(first_two())) == 2
+    assert len(decoded) < 1000
+
+
+def test_stream_subtitles_reraises_decoder_errors(tmp_path):
+    def decode():
+        yield (0.0, 1.0, "fine")
+        raise RuntimeError("decoder failed")
+
+    async def drain():
+        return [cue async for cue in stream_subtitles(decode(), str(tmp_path / "live.srt"))]
+
+    with pytest.raises(RuntimeError, match="decoder failed"):
+        asyncio.run(drain())
@@ -0,0 +1,159 @@
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from agents.tool_runtime import (
+    ToolCancelled,
+    async_tool,
+    cancel_all,
+    cancel_job,
+    check_cancelled,
+    get_job,
+    report_progress,
+    run_process,
+    running_jobs,
+    subscribe_progress,
+    unsubscribe_progress,
+)
+
+SLEEP = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+async def first_event(queue: asyncio.Queue) -> dict:
+    return await asyncio.wait_for(queue.get(), timeout=5)
+
+
+async def drain(queue: asyncio.Queue):
+    await asyncio.sleep(0)
+    while not queue.empty():
+        yield queue.get_nowait()
+
+
+def test_calls_beyond_the_limit_wait_their_turn():
+    lock = threading.Lock()
+    in_flight, peak = 0, 0
+
+    def work(i: int) -> int:
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight -= 1
+        return i
+
+    tool = async_tool(work, concurrency=2)
+
+    async def main():
+        return await asyncio.gather(*(tool(i) for i in range(6)))
+
+    assert asyncio.run(main()) == list(range(6))
+    assert peak == 2
+    assert running_jobs() == []
+
+
+def test_cancel_job_kills_the_subprocess_and_raises_tool_cancelled():
+    def slow_encode() -> None:
+        report_progress("encoding", force=True)
+        run_process(SLEEP)
+
+    tool = async_tool(slow_encode, concurrency=1)
+
+    async def main():
+        queue = subscribe_progress()
+        try:
+            task = asyncio.ensure_future(tool())
+            event = await first_event(queue)
+            assert get_job(event["job"]) is not None
+            await asyncio.sleep(0.2)  # let the subprocess start
+            started = time.monotonic()
+            assert cancel_job(event["job"])
+            with pytest.raises(ToolCancelled):
+                await task
+            return event["job"], time.monotonic() - started
+        finally:
+            unsubscribe_progress(queue)
+
+    job_id, seconds = asyncio.run(main())
+    assert seconds < 5
+    assert get_job(job_id) is None
+    assert not cancel_job(job_id)
+
+
+def test_cancelled_task_cancels_its_job():
+    processes = []
+
+    def slow_encode() -> None:
+        report_progress("encoding", force=True)
+        try:
+            run_process(SLEEP)
+        except Exception:
+            pytest.fail("ToolCancelled must not be caught by `except Exception`")
+
+    tool = async_tool(slow_encode, concurrency=1)
+
+    async def main():
+        queue = subscribe_progress()
+        try:
+            task = asyncio.ensure_future(tool())
+            event = await first_event(queue)
+            await asyncio.sleep(0.2)
+            processes.extend(get_job(event["job"])._processes)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return [e["message"] async for e in drain(queue)]
+        finally:
+            unsubscribe_progress(queue)
+
+    messages = asyncio.run(main())
+    assert "cancelled" in messages
+    assert processes and all(process.poll() is not None for process in processes)
+    assert running_jobs() == []
+
+
+def test_cancel_all_stops_every_job_and_subscriptions_filter_by_job():
+    started = threading.Barrier(3)
+
+    def wait_for_cancel(name: str) -> None:
+        started.wait(timeout=5)
+        report_progress(name, force=True)
+        while True:
+            check_cancelled()
+            time.sleep(0.01)
+
+    tool = async_tool(wait_for_cancel, concurrency=2)
+
+    async def main():
+        every = subscribe_progress()
+        try:
+            tasks = [asyncio.ensure_future(tool(name)) for name in ("a", "b")]
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+            first = await first_event(every)
+            only_first = subscribe_progress(job_id=first["job"])
+            await first_event(every)
+            assert cancel_all() == 2
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            messages = [event["message"] async for event in drain(only_first)]
+            unsubscribe_progress(only_first)
+            return results, messages
+        finally:
+            unsubscribe_progress(every)
+
+    results, messages = asyncio.run(main())
+    assert all(isinstance(result, ToolCancelled) for result in results)
+    assert messages == ["cancelled"]
+    assert running_jobs() == []
+
+
+def test_synchronous_calls_run_outside_any_job():
+    check_cancelled()
+    report_progress("ignored")
+    assert run_process([sys.executable, "-c", "print('ok')"]).stdout.strip() == b"ok"
+    with pytest.raises(subprocess.CalledProcessError):
+        run_process([sys.executable, "-c", "raise SystemExit(3)"])
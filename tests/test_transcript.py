@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from agents.transcript_agent.transcript import Transcript
+from conftest import make_snippets
+
+
+def test_columns_accept_numpy_arrays():
+    transcript = Transcript(np.arange(3.0), np.ones(3), np.array(["a", "b", "c"]))
+    assert list(transcript.starts) == [0.0, 1.0, 2.0]
+    assert len(transcript) == 3
+
+
+def test_missing_columns_make_an_empty_transcript():
+    assert len(Transcript()) == 0
+
+
+def test_columns_must_have_the_same_length():
+    with pytest.raises(ValueError):
+        Transcript([0.0, 1.0], [1.0], ["a", "b"])
+
+
+def test_dict_round_trip_keeps_the_columns():
+    transcript = Transcript.from_snippets(make_snippets(4))
+    restored = Transcript.from_dict(transcript.to_dict())
+    assert list(restored.starts) == list(transcript.starts)
+    assert restored.texts == transcript.texts
+    assert restored.duration == pytest.approx(12.0)
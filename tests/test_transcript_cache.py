@@ -0,0 +1,53 @@
+import pytest
+
+from agents.transcript_agent.cache import (
+    CachedTranscriptFetcher,
+    StaticTranscriptFetcher,
+    TranscriptCache,
+    TranscriptUnavailable,
+)
+from conftest import make_snippets
+
+
+def make_fetcher(**cache_options):
+    static = StaticTranscriptFetcher({"abc": make_snippets(3)})
+    return static, CachedTranscriptFetcher(static, TranscriptCache(":memory:", **cache_options))
+
+
+def test_hit_is_served_from_the_cache():
+    static, fetcher = make_fetcher()
+    first = fetcher.fetch("abc")
+    second = fetcher.fetch("abc")
+    assert first == second == make_snippets(3)
+    assert static.calls == [("abc", "en")]
+
+
+def test_languages_are_cached_separately():
+    static, fetcher = make_fetcher()
+    for language in ("en", "de", "en", "de"):
+        fetcher.fetch("abc", language)
+    assert static.calls == [("abc", "en"), ("abc", "de")]
+
+
+def test_missing_transcript_is_cached_and_reraised():
+    static, fetcher = make_fetcher()
+    for _ in range(2):
+        with pytest.raises(TranscriptUnavailable):
+            fetcher.fetch("missing")
+    assert static.calls == [("missing", "en")]
+
+
+def test_expired_entries_are_fetched_again():
+    static, fetcher = make_fetcher(ttl=-1)
+    fetcher.fetch("abc")
+    fetcher.fetch("abc")
+    assert len(static.calls) == 2
+
+
+def test_least_recently_read_entries_are_evicted():
+    cache = TranscriptCache(":memory:", max_entries=2)
+    for video_id in ("a", "b", "c"):
+        cache.put(video_id, "en", "static", payload=[])
+    assert len(cache) == 2
+    assert cache.get("a", "en", "static") is None
+    assert cache.get("c", "en", "static") == {"payload": []}
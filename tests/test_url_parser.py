@@ -0,0 +1,65 @@
+import pytest
+
+from agents.url_parser_agent.tools import extract_video_id, find_video_id
+
+VIDEO_ID = "dQw4w9WgXcQ"
+
+
+@pytest.mark.parametrize("url", [
+    f"https://www.youtube.com/watch?v={VIDEO_ID}",
+    f"http://youtube.com/watch?v={VIDEO_ID}",
+    f"www.youtube.com/watch?v={VIDEO_ID}",
+    f"https://m.youtube.com/watch?v={VIDEO_ID}",
+    f"https://music.youtube.com/watch?v={VIDEO_ID}",
+    f"https://www.youtube.com/watch?feature=share&v={VIDEO_ID}&t=42s",
+    f"https://www.youtube.com/watch?v={VIDEO_ID}&list=PLabcdefghij0123456789&index=3",
+    f"https://youtu.be/{VIDEO_ID}",
+    f"https://youtu.be/{VIDEO_ID}?t=10&si=abcdef",
+    f"youtu.be/{VIDEO_ID}/",
+    f"https://www.youtube.com/shorts/{VIDEO_ID}",
+    f"https://youtube.com/shorts/{VIDEO_ID}?feature=share",
+    f"https://www.youtube.com/embed/{VIDEO_ID}?start=30",
+    f"https://www.youtube-nocookie.com/embed/{VIDEO_ID}",
+    f"https://www.youtube.com/live/{VIDEO_ID}",
+    f"https://www.youtube.com/v/{VIDEO_ID}",
+    f"<https://www.youtube.com/watch?v={VIDEO_ID}>",
+    f"  https://WWW.YOUTUBE.COM/watch?v={VIDEO_ID}  ",
+])
+def test_video_urls(url):
+    assert extract_video_id(url) == VIDEO_ID
+
+
+@pytest.mark.parametrize("url", [
+    "",
+    "not a url",
+    VIDEO_ID,
+    f"https://vimeo.com/watch?v={VIDEO_ID}",
+    f"https://notyoutube.com/watch?v={VIDEO_ID}",
+    f"https://youtube.com.evil.example/watch?v={VIDEO_ID}",
+    "https://www.youtube.com/watch?v=tooshort",
+    f"https://www.youtube.com/watch?v={VIDEO_ID}x",
+    "https://www.youtube.com/watch?list=PLabcdefghij0123456789",
+    "https://www.youtube.com/playlist?list=PLabcdefghij0123456789",
+    "https://www.youtube.com/@somecreator",
+    "https://www.youtube.com/channel/UCaaaaaaaaaaaaaaaaaaaaaa",
+    "https://www.youtube.com/embed/",
+    "https://youtu.be/",
+    f"https://www.youtube.com/watchlater?v={VIDEO_ID}",
+])
+def test_invalid_urls(url):
+    assert extract_video_id(url) is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    (f"Make shorts from https://youtu.be/{VIDEO_ID} please", VIDEO_ID),
+    (f"clip this (https://www.youtube.com/watch?v={VIDEO_ID}).", VIDEO_ID),
+    (f"see youtube.com/shorts/{VIDEO_ID} and youtu.be/aaaaaaaaaaa", VIDEO_ID),
+    (f"https://www.youtube.com/@somecreator then youtu.be/{VIDEO_ID}", VIDEO_ID),
+    (f"  {VIDEO_ID}  ", VIDEO_ID),
+    (f"the ID is {VIDEO_ID}", None),
+    ("no link here", None),
+    ("", None),
+    (None, None),
+])
+def test_find_video_id_in_text(text, expected):
+    assert find_video_id(text) == expected
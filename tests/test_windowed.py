@@ -0,0 +1,110 @@
+import asyncio
+import json
+import re
+
+from agents.segmentation_agent.windowed import (
+    clock_to_seconds,
+    make_windows,
+    parse_candidates,
+    parse_condensed,
+    reduce_candidates,
+    segment_transcript,
+    seconds_to_clock,
+)
+from agents.transcript_agent.chunker import chunk_transcript
+from agents.transcript_agent.transcript import Transcript
+from conftest import make_snippets
+
+
+def condensed(minutes: int) -> str:
+    return chunk_transcript(Transcript.from_snippets(make_snippets(minutes * 20)))
+
+
+def candidate(start: float, end: float, score: float, topic: str = "") -> dict:
+    return {
+        "start_time": seconds_to_clock(start),
+        "end_time": seconds_to_clock(end),
+        "score": score,
+        "topic": topic or f"at {start}",
+    }
+
+
+def window_start(prompt: str) -> float:
+    """
+    Start of the first transcript line in a window prompt.
+    """
+    return clock_to_seconds(re.search(r"^\[(\d+:\d+)-", prompt, re.MULTILINE).group(1))
+
+
+def test_windows_overlap_and_cover_every_paragraph():
+    paragraphs = parse_condensed(condensed(30))
+    windows = make_windows(paragraphs, window_seconds=600.0, overlap_seconds=90.0)
+    assert len(windows) > 1
+    assert {p for window in windows for p in window} == set(paragraphs)
+    for previous, following in zip(windows, windows[1:]):
+        assert set(previous) & set(following)
+
+
+def test_candidates_are_parsed_from_fenced_json_and_invalid_items_skipped():
+    response = "Here you go:\n```json\n" + json.dumps([
+        candidate(10, 40, 80),
+        {"start_time": "00:50", "score": 90},
+        {"start_time": "01:30", "end_time": "01:10", "score": 70},
+        "not a segment",
+    ]) + "\n```"
+    parsed = parse_candidates(response)
+    assert [(c["_start"], c["_end"], c["score"]) for c in parsed] == [(10.0, 40.0, 80.0)]
+    assert parse_candidates("no json here") == []
+
+
+def test_reduce_keeps_the_best_of_overlapping_candidates_in_timeline_order():
+    candidates = parse_candidates(json.dumps([
+        candidate(600, 640, 70, "late"),
+        candidate(100, 140, 60, "weaker duplicate"),
+        candidate(105, 145, 90, "best"),
+        candidate(300, 330, 80, "middle"),
+    ]))
+    reduced = reduce_candidates(candidates, min_segments=1, max_segments=8)
+    assert [c["topic"] for c in reduced] == ["best", "middle", "late"]
+    assert not any(key.startswith("_") for c in reduced for key in c)
+
+
+def test_low_scores_only_fill_up_to_the_minimum():
+    candidates = parse_candidates(json.dumps([candidate(i * 100, i * 100 + 30, 10 + i) for i in range(6)]))
+    assert len(reduce_candidates(candidates, min_segments=3, min_score=30.0)) == 3
+    assert len(reduce_candidates(candidates, min_segments=3, max_segments=2, min_score=0.0)) == 2
+
+
+def test_segment_transcript_merges_windows_and_survives_a_failing_one():
+    prompts = []
+
+    async def generate(prompt: str) -> str:
+        prompts.append(prompt)
+        start = window_start(prompt)
+        if len(prompts) == 2:
+            raise RuntimeError("model unavailable")
+        # Every window proposes the same moment, plus one of its own
+        return json.dumps([candidate(500, 540, 95, "shared"), candidate(start + 10, start + 40, 60, f"window {start}")])
+
+    segments = asyncio.run(segment_transcript(condensed(30), generate, concurrency=2, min_segments=3))
+    topics = [segment["topic"] for segment in segments]
+    assert len(prompts) > 2
+    assert topics.count("shared") == 1
+    assert len(segments) >= 3
+    starts = [segment["start_time"] for segment in segments]
+    assert starts == sorted(starts)
+
+
+def test_concurrency_caps_the_calls_in_flight():
+    in_flight, peak = 0, 0
+
+    async def generate(prompt: str) -> str:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return "[]"
+
+    asyncio.run(segment_transcript(condensed(60), generate, concurrency=2))
+    assert peak == 2